@@ -0,0 +1,20 @@
+#!/bin/sh
+# postgres/replica-entrypoint.sh
+# Réplica en streaming del servicio db. La primera vez copia el primario con
+# pg_basebackup (-R deja standby.signal y primary_conninfo en el directorio
+# de datos); después arranca siempre como hot standby de solo lectura.
+set -e
+
+PGDATA=${PGDATA:-/var/lib/postgresql/data}
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -q -h "$PRIMARY_HOST" -U "$PGUSER"; do
+        sleep 1
+    done
+    mkdir -p "$PGDATA"
+    pg_basebackup -h "$PRIMARY_HOST" -U "$PGUSER" -D "$PGDATA" -R -X stream -c fast
+    chown -R postgres:postgres "$PGDATA"
+    chmod 700 "$PGDATA"
+fi
+
+exec su-exec postgres postgres -c hot_standby=on
@@ -0,0 +1,8 @@
+# src/apps/changefeed/apps.py
+from django.apps import AppConfig
+
+class ChangefeedConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.changefeed'
+    label = 'changefeed'
+    verbose_name = 'Canal de cambios'
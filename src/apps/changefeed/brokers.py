@@ -0,0 +1,264 @@
+# src/apps/changefeed/brokers.py
+"""
+Distribución de eventos del canal de cambios a los clientes conectados.
+
+Cada conexión SSE registra una ``Subscription`` (cola acotada y filtros) en
+el broker del proceso. Hay dos brokers:
+
+* ``LocalBroker``: reparte los eventos dentro del mismo proceso al confirmar
+  la transacción. Sirve para desarrollo y para despliegues de un solo
+  proceso.
+* ``PostgresBroker``: publica con ``pg_notify`` dentro de la transacción
+  (PostgreSQL solo entrega la notificación si se confirma) y cada proceso
+  escucha el canal con un hilo y una conexión propios, así que un cambio
+  hecho en cualquier worker llega a los clientes de todos los demás. Ocupa
+  el lugar de un broker externo (Redis) sin añadir servicios.
+
+Si un cliente no consume a tiempo y su cola se llena, se marca como
+desbordado: el stream le envía un evento ``resync`` para que recargue el
+estado completo en lugar de perder cambios en silencio. Lo mismo ocurre al
+reconectar el hilo de escucha.
+"""
+import asyncio
+import json
+import logging
+import queue
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+RESYNC = {'type': 'resync'}
+
+
+class Subscription:
+    """Filtros de un cliente; las subclases implementan la cola."""
+
+    def __init__(self, products=None, warehouse=None, types=None):
+        self.products = products    # set de ids o None (todos)
+        self.warehouse = warehouse  # id de almacén o None (todos)
+        self.types = types          # set de tipos de evento o None (todos)
+        self.overflowed = False
+
+    def select(self, event):
+        """``event`` reducido a lo que pidió el cliente, o ``None`` si no le interesa."""
+        if event['type'] == 'resync':
+            return event
+        if self.types and event['type'] not in self.types:
+            return None
+        if event['type'] == 'stock' and (self.products is not None or self.warehouse is not None):
+            changes = [
+                change for change in event['changes']
+                if (self.products is None or change['product_id'] in self.products)
+                and (self.warehouse is None or change['warehouse_id'] == self.warehouse)
+            ]
+            if not changes:
+                return None
+            event = {**event, 'changes': changes}
+        return event
+
+
+class SyncSubscription(Subscription):
+    """Cola bloqueante, para streams servidos por WSGI (un hilo por cliente)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queue = queue.Queue(settings.CHANGEFEED_QUEUE_SIZE)
+
+    def deliver(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+
+class AsyncSubscription(Subscription):
+    """Cola de asyncio, para streams servidos por ASGI; se crea dentro del event loop."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(settings.CHANGEFEED_QUEUE_SIZE)
+
+    def deliver(self, event):
+        # Se llama desde otros hilos (peticiones, hilo de escucha)
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # Loop cerrado: el cliente ya se desconectó
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def clear(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+
+class BaseBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self, subscription):
+        self.start()
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def start(self):
+        """Prepara el broker para recibir eventos; no hace nada por defecto."""
+
+    def publish(self, event):
+        raise NotImplementedError
+
+    def fan_out(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            selected = subscription.select(event)
+            if selected is not None:
+                subscription.deliver(selected)
+
+
+class LocalBroker(BaseBroker):
+    """Eventos dentro del proceso, entregados al confirmar la transacción."""
+
+    def publish(self, event):
+        transaction.on_commit(lambda: self.fan_out(event))
+
+
+class PostgresBroker(BaseBroker):
+    """
+    Eventos entre procesos con ``LISTEN``/``NOTIFY`` sobre ``channel``
+    (``settings.CHANGEFEED_CHANNEL`` por defecto). ``apps.httpcache.bus``
+    reutiliza el hilo de escucha con su propio canal.
+    """
+
+    # pg_notify admite cargas de hasta 8000 bytes
+    MAX_PAYLOAD = 7900
+    thread_name = 'changefeed-listener'
+    log_prefix = 'changefeed'
+
+    def __init__(self, channel=None):
+        super().__init__()
+        self.channel = channel or settings.CHANGEFEED_CHANNEL
+        self._thread = None
+
+    @property
+    def idle_timeout(self):
+        """Segundos de espera sin notificaciones antes de llamar a ``on_idle``."""
+        return settings.CHANGEFEED_HEARTBEAT
+
+    def publish(self, event):
+        payload = json.dumps(event, separators=(',', ':'))
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            # El evento no cabe: los clientes recargan el estado completo
+            payload = json.dumps(RESYNC)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def start(self):
+        # Tras un fork el hilo del proceso padre no existe en el hijo: se arranca otro
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        delay, reconnect = 1, False
+        while True:
+            db = connections.create_connection('default')
+            try:
+                db.ensure_connection()
+                db.set_autocommit(True)
+                raw = db.connection
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN {db.ops.quote_name(self.channel)}')
+                logger.info(f'{self.log_prefix}.listening', extra={'channel': self.channel})
+                self.on_listen(raw, reconnect)
+                delay, reconnect = 1, True
+
+                while True:
+                    if select.select([raw], [], [], self.idle_timeout) == ([], [], []):
+                        self.on_idle(raw)
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        notify = raw.notifies.pop(0)
+                        try:
+                            event = json.loads(notify.payload)
+                        except ValueError:
+                            logger.warning(f'{self.log_prefix}.bad_payload', extra={'payload': notify.payload[:200]})
+                            continue
+                        self.fan_out(event)
+            except Exception:
+                self.on_disconnect()
+                logger.exception(f'{self.log_prefix}.listener_error', extra={'retry_in': delay})
+                reconnect = True
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    db.close()
+                except Exception:
+                    pass
+
+    def on_listen(self, raw, reconnect):
+        """Se llama con ``LISTEN`` ya activo sobre la conexión ``raw`` (psycopg2)."""
+        if reconnect:
+            # Pudieron perderse notificaciones mientras no había conexión
+            self.fan_out(RESYNC)
+
+    def on_idle(self, raw):
+        """Pasaron ``idle_timeout`` segundos sin notificaciones."""
+
+    def on_disconnect(self):
+        """Falló la conexión de escucha; se reintenta tras una espera."""
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Broker del proceso según ``settings.CHANGEFEED_BROKER`` (``'postgres'`` o
+    ``'local'``). Con una base de datos que no es PostgreSQL se usa el local.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if settings.CHANGEFEED_BROKER == 'postgres' and connection.vendor == 'postgresql':
+                    _broker = PostgresBroker()
+                else:
+                    _broker = LocalBroker()
+    return _broker
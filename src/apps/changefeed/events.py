@@ -0,0 +1,45 @@
+# src/apps/changefeed/events.py
+"""
+Eventos del canal de cambios. Los publican las rutas de mutación:
+
+* ``adjust_stock`` (todas las entradas y salidas de stock)::
+
+    {"type": "stock", "changes": [{"product_id": 7, "current_stock": 12,
+                                   "min_stock": 5, "warehouse_id": 1}, ...]}
+
+* ``transition`` y la conversión de cotizaciones (cambios de estado)::
+
+    {"type": "document", "model": "dispatch_notes.dispatchnote",
+     "status": "DISPATCHED", "ids": [42]}
+
+Se entregan solo si la transacción se confirma.
+"""
+from .brokers import get_broker
+
+# Elementos por evento: mantiene cada carga por debajo del límite de pg_notify
+STOCK_CHUNK = 50
+DOCUMENT_CHUNK = 500
+
+
+def publish_stock(rows):
+    """``rows``: iterable de ``(product_id, current_stock, min_stock, warehouse_id)``."""
+    changes = [
+        {'product_id': pk, 'current_stock': stock, 'min_stock': minimum, 'warehouse_id': warehouse_id}
+        for pk, stock, minimum, warehouse_id in rows
+    ]
+    broker = get_broker()
+    for start in range(0, len(changes), STOCK_CHUNK):
+        broker.publish({'type': 'stock', 'changes': changes[start:start + STOCK_CHUNK]})
+
+
+def publish_documents(model, ids, status):
+    """Documentos ``ids`` de ``model`` que pasaron a ``status``."""
+    ids = list(ids)
+    broker = get_broker()
+    for start in range(0, len(ids), DOCUMENT_CHUNK):
+        broker.publish({
+            'type': 'document',
+            'model': model._meta.label_lower,
+            'status': status,
+            'ids': ids[start:start + DOCUMENT_CHUNK],
+        })
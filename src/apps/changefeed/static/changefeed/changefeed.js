@@ -0,0 +1,65 @@
+// apps/changefeed/static/changefeed/changefeed.js
+//
+// Cliente del canal de cambios (/cambios/, Server-Sent Events). El navegador
+// reconecta solo si se corta la conexión; tras reconectar, o si el servidor
+// envía "resync", la página debe recargar el estado que muestra.
+//
+//   const feed = ChangeFeed.connect({
+//       url: '/cambios/',
+//       types: ['stock'],            // opcional: 'stock', 'document'
+//       products: [1, 2, 3],         // opcional: solo estos productos
+//       warehouse: 1,                // opcional: solo este almacén
+//       onStock: change => ...,      // {product_id, current_stock, min_stock, warehouse_id}
+//       onDocument: event => ...,    // {model, status, ids}
+//       onResync: () => ...,
+//   });
+//   feed.close();
+(function (window) {
+    'use strict';
+
+    function connect(options) {
+        if (!window.EventSource) {
+            return {close() {}};
+        }
+        const params = new URLSearchParams();
+        if (options.types) {
+            params.set('types', options.types.join(','));
+        }
+        if (options.products) {
+            params.set('products', options.products.join(','));
+        }
+        if (options.warehouse) {
+            params.set('warehouse', options.warehouse);
+        }
+        const query = params.toString();
+        const source = new EventSource(query ? `${options.url}?${query}` : options.url);
+        let opened = false;
+
+        source.addEventListener('open', () => {
+            // Los eventos emitidos mientras no hubo conexión se perdieron
+            if (opened && options.onResync) {
+                options.onResync();
+            }
+            opened = true;
+        });
+        source.addEventListener('stock', message => {
+            if (options.onStock) {
+                JSON.parse(message.data).changes.forEach(options.onStock);
+            }
+        });
+        source.addEventListener('document', message => {
+            if (options.onDocument) {
+                options.onDocument(JSON.parse(message.data));
+            }
+        });
+        source.addEventListener('resync', () => {
+            if (options.onResync) {
+                options.onResync();
+            }
+        });
+
+        return {close: () => source.close()};
+    }
+
+    window.ChangeFeed = {connect};
+})(window);
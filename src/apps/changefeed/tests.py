@@ -0,0 +1,86 @@
+import asyncio
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import brokers
+
+
+class StreamDisconnectTests(TransactionTestCase):
+    """El stream servido por ``core.asgi`` termina cuando el cliente cierra la conexión."""
+
+    def setUp(self):
+        # Broker local: sin hilo de escucha ni conexiones que sobrevivan a la prueba
+        self.broker = brokers.LocalBroker()
+        patcher = mock.patch.object(brokers, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client.force_login(User.objects.create_user('lector'))
+        self.cookie = f'{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+    def scope(self):
+        path = reverse('changefeed:stream')
+        return {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', self.cookie.encode())],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+
+    async def test_disconnect_unsubscribes(self):
+        from core.asgi import application
+
+        communicator = ApplicationCommunicator(application, self.scope())
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(5)
+        self.assertEqual(start['status'], 200)
+        first = await communicator.receive_output(5)
+        self.assertEqual(first['body'], f'retry: {settings.CHANGEFEED_RETRY_MS}\n\n'.encode())
+        self.assertEqual(len(self.broker._subscriptions), 1)
+
+        await communicator.send_input({'type': 'http.disconnect'})
+        # La aplicación debe terminar por sí sola (wait() la cancelaría al agotar el tiempo)
+        done, _ = await asyncio.wait({communicator.future}, timeout=5)
+        self.assertTrue(done)
+        self.assertIsNone(communicator.future.exception())
+        self.assertEqual(self.broker._subscriptions, set())
+
+    async def test_regular_requests_complete(self):
+        from core.asgi import application
+
+        scope = {**self.scope(), 'query_string': b'types=otro'}
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(5)
+        self.assertEqual(start['status'], 400)
+        await communicator.wait(5)
+        self.assertEqual(self.broker._subscriptions, set())
+
+
+class WsgiStreamTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('lector'))
+
+    def test_wsgi_refuses_stream(self):
+        response = self.client.get(reverse('changefeed:stream'))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('core.asgi', response.json()['error'])
+
+    @override_settings(CHANGEFEED_WSGI_STREAM=True, CHANGEFEED_HEARTBEAT=0.01)
+    def test_wsgi_stream_when_enabled(self):
+        broker = brokers.LocalBroker()
+        with mock.patch.object(brokers, '_broker', broker):
+            response = self.client.get(reverse('changefeed:stream'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            content = iter(response.streaming_content)
+            self.assertEqual(next(content), f'retry: {settings.CHANGEFEED_RETRY_MS}\n\n'.encode())
+            self.assertEqual(next(content), b': ping\n\n')
+            response.close()
+        self.assertEqual(broker._subscriptions, set())
@@ -0,0 +1,9 @@
+# src/apps/changefeed/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'changefeed'
+
+urlpatterns = [
+    path('', views.stream, name='stream'),
+]
@@ -0,0 +1,97 @@
+# src/apps/changefeed/views.py
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from core.json import FastJsonResponse, dumps
+from .brokers import AsyncSubscription, SyncSubscription, get_broker
+
+EVENT_TYPES = ('stock', 'document')
+
+
+def _format(event):
+    return f'event: {event["type"]}\ndata: {dumps(event).decode()}\n\n'
+
+
+def _filters(request):
+    """Filtros del cliente desde ``?products=1,2&warehouse=3&types=stock,document``."""
+    products = request.GET.get('products', '')
+    warehouse = request.GET.get('warehouse', '')
+    types = {name for name in request.GET.get('types', '').split(',') if name.strip()}
+    unknown = sorted(types - set(EVENT_TYPES))
+    if unknown:
+        raise ValueError(f'Tipos de evento no disponibles: {", ".join(unknown)}')
+    try:
+        return {
+            'products': {int(value) for value in products.split(',') if value.strip()} or None,
+            'warehouse': int(warehouse) if warehouse else None,
+            'types': types or None,
+        }
+    except ValueError:
+        raise ValueError('products y warehouse deben ser ids enteros')
+
+
+def _stream_sync(filters):
+    """Stream para WSGI: ocupa un hilo del servidor mientras el cliente está conectado."""
+    broker = get_broker()
+    subscription = broker.subscribe(SyncSubscription(**filters))
+    try:
+        yield f'retry: {settings.CHANGEFEED_RETRY_MS}\n\n'
+        while True:
+            event = subscription.get(settings.CHANGEFEED_HEARTBEAT)
+            if subscription.overflowed:
+                subscription.clear()
+                subscription.overflowed = False
+                event = {'type': 'resync'}
+            yield _format(event) if event else ': ping\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def _stream_async(filters):
+    """Stream para ASGI: los clientes conectados esperan en el event loop, sin hilos."""
+    broker = get_broker()
+    subscription = broker.subscribe(AsyncSubscription(**filters))
+    try:
+        yield f'retry: {settings.CHANGEFEED_RETRY_MS}\n\n'
+        while True:
+            event = await subscription.get(settings.CHANGEFEED_HEARTBEAT)
+            if subscription.overflowed:
+                subscription.clear()
+                subscription.overflowed = False
+                event = {'type': 'resync'}
+            yield _format(event) if event else ': ping\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def stream(request):
+    """
+    Canal de cambios en Server-Sent Events. Eventos ``stock``, ``document`` y
+    ``resync`` (el cliente debe recargar el estado completo); un comentario
+    ``: ping`` cada ``CHANGEFEED_HEARTBEAT`` segundos mantiene viva la conexión.
+
+    Con ``core.asgi`` cada cliente es una corrutina. Con WSGI (runserver,
+    gunicorn síncrono) cada cliente ocuparía un hilo del servidor mientras la
+    página esté abierta: responde 503 (el navegador no reintenta y la página
+    queda sin actualizaciones en vivo) salvo con ``CHANGEFEED_WSGI_STREAM``.
+    """
+    if request.method != 'GET':
+        return FastJsonResponse({'error': 'Método no permitido'}, status=405)
+    if not request.user.is_authenticated:
+        return FastJsonResponse({'error': 'Autenticación requerida'}, status=403)
+    try:
+        filters = _filters(request)
+    except ValueError as exc:
+        return FastJsonResponse({'error': str(exc)}, status=400)
+
+    if isinstance(request, ASGIRequest):
+        events = _stream_async(filters)
+    elif settings.CHANGEFEED_WSGI_STREAM:
+        events = _stream_sync(filters)
+    else:
+        return FastJsonResponse({'error': 'El canal de cambios requiere el servidor ASGI (core.asgi)'}, status=503)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx entrega cada evento sin acumularlo
+    return response
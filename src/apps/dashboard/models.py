@@ -7,8 +7,8 @@ class ProductManager(models.Manager):
         Obtiene los productos cuyo stock actual es menor que el stock mínimo.
         """
         return self.get_queryset().annotate(
-            difference=F('stock_minimo') - F('cantidad')
-        ).filter(cantidad__lt=F('stock_minimo')).order_by('difference')[:limit]
+            difference=F('current_stock') - F('min_stock')
+        ).filter(current_stock__lt=F('min_stock')).order_by('difference')[:limit]
 
 class DashboardSetting(models.Model):
     name = models.CharField(max_length=100, unique=True)
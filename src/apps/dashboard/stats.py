@@ -0,0 +1,158 @@
+# src/apps/dashboard/stats.py
+"""
+Indicadores del panel de control sobre ``Product`` y ``Movement``.
+
+El panel se divide en secciones independientes (una consulta cada una) que
+se guardan en caché ``DASHBOARD_CACHE_TIMEOUT`` segundos. Además se guarda
+una copia duradera de cada sección: si al calcular el panel se agota el
+presupuesto ``DASHBOARD_LATENCY_BUDGET_MS``, las secciones restantes se
+sirven desde esa copia (marcadas en ``stale``) en lugar de hacer esperar a
+la petición.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from apps.inventory.models import Category, Product
+from apps.movements.models import Movement
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_LIMIT = 10
+SEARCH_LIMIT = 10
+STALE_TIMEOUT = 24 * 60 * 60
+
+
+def product_totals():
+    """Total de productos y con stock crítico (``current_stock <= min_stock``), en una consulta."""
+    return Product.objects.aggregate(
+        total_products=Count('pk'),
+        critical_stock=Count('pk', filter=Q(current_stock__lte=F('min_stock'))),
+        out_of_stock=Count('pk', filter=Q(current_stock=0)),
+    )
+
+
+def today_movements():
+    """
+    Entradas y salidas de hoy. El día se filtra como rango ``[00:00, 00:00 del
+    día siguiente)`` sobre ``date`` (``Movement.objects.in_period``), que usa
+    el índice ``(movement_type, date)``; ``date__date`` obligaría a convertir
+    la fecha de cada fila.
+    """
+    today = timezone.localdate()
+    counts = dict(
+        Movement.objects.in_period(today, today)
+        .filter(movement_type__in=['IN', 'OUT'])
+        .values_list('movement_type')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    return {'today_entries': counts.get('IN', 0), 'today_exits': counts.get('OUT', 0)}
+
+
+def low_stock_products(limit=LOW_STOCK_LIMIT):
+    """Productos bajo el mínimo, primero los de mayor faltante (``difference`` negativa)."""
+    return list(
+        Product.objects.filter(current_stock__lt=F('min_stock'))
+        .annotate(difference=F('current_stock') - F('min_stock'))
+        .order_by('difference', 'product_code')
+        .values('id', 'product_code', 'description', 'current_stock', 'min_stock', 'difference')[:limit]
+    )
+
+
+def categories():
+    """Categorías con productos, desde la dimensión ``Category``."""
+    return list(
+        Category.objects.filter(product_count__gt=0)
+        .values('name', 'product_count', 'stock_units', 'stock_value')
+    )
+
+
+SECTIONS = {
+    'totals': product_totals,
+    'movements': today_movements,
+    'low_stock': low_stock_products,
+    'categories': categories,
+}
+
+
+def _cache_key(name):
+    # Los movimientos del día cambian de clave a medianoche
+    if name == 'movements':
+        return f'dashboard:{name}:{timezone.localdate().isoformat()}'
+    return f'dashboard:{name}'
+
+
+def get_section(name):
+    """Una sección desde la caché, calculándola si expiró."""
+    key = _cache_key(name)
+    value = cache.get(key)
+    if value is None:
+        value = SECTIONS[name]()
+        cache.set(key, value, settings.DASHBOARD_CACHE_TIMEOUT)
+        cache.set(f'{key}:stale', value, STALE_TIMEOUT)
+    return value
+
+
+def get_dashboard(sections=None, budget_ms=None):
+    """
+    Secciones del panel: ``{'sections': {...}, 'stale': [...], 'timings_ms': {...}, 'duration_ms': ...}``.
+
+    Las secciones se calculan en el orden pedido; cuando el tiempo consumido
+    supera ``budget_ms`` las siguientes que no estén en caché se sirven desde
+    la última copia conocida.
+    """
+    names = list(sections or SECTIONS)
+    budget_ms = settings.DASHBOARD_LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+    started = time.perf_counter()
+    result, stale, timings = {}, [], {}
+
+    for name in names:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= budget_ms:
+            key = _cache_key(name)
+            value = cache.get(key)
+            if value is None:
+                value = cache.get(f'{key}:stale')
+                if value is None:
+                    value = get_section(name)  # Nunca se calculó: no hay copia que servir
+                else:
+                    stale.append(name)
+            result[name] = value
+            continue
+        section_started = time.perf_counter()
+        result[name] = get_section(name)
+        timings[name] = round((time.perf_counter() - section_started) * 1000, 2)
+
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+    if stale:
+        logger.warning(
+            'dashboard.over_budget',
+            extra={'budget_ms': budget_ms, 'duration_ms': total_ms, 'stale': stale, 'timings_ms': timings},
+        )
+    return {'sections': result, 'stale': stale, 'timings_ms': timings, 'duration_ms': total_ms}
+
+
+def search_products(query, limit=SEARCH_LIMIT):
+    """Búsqueda del panel por código o descripción; los resultados se guardan en caché brevemente."""
+    query = query.strip()
+    key = f'dashboard:search:{hashlib.md5(query.lower().encode()).hexdigest()}'
+    results = cache.get(key)
+    if results is None:
+        results = [
+            {**row, 'unit_price': str(row['unit_price'])}
+            for row in Product.objects.filter(
+                Q(product_code__icontains=query) | Q(description__icontains=query),
+                is_active=True,
+            ).values(
+                'id', 'product_code', 'description', 'unit', 'unit_price',
+                'current_stock', 'min_stock', 'category',
+            )[:limit]
+        ]
+        cache.set(key, results, settings.DASHBOARD_CACHE_TIMEOUT)
+    return results
@@ -1,134 +1,86 @@
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
-from apps.inventory.models import Product, Movimiento, TipoMovimiento
-from django.db.models import F, Q
-from django.utils import timezone
+from apps.inventory.models import Product
 from django.shortcuts import get_object_or_404, redirect
-from django.http import JsonResponse
 from django.contrib import messages
+import logging
 
-class DashboardView(LoginRequiredMixin, TemplateView):
+from core.db_router import ReplicaReadMixin, replica_reads
+from core.json import FastJsonResponse
+from core.log import timed
+from .stats import SECTIONS, get_dashboard, get_section, search_products
+
+logger = logging.getLogger(__name__)
+
+class DashboardView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     template_name = 'dashboard/index.html'
-    
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        try:
-            # Productos con stock crítico
-            low_stock_products = Product.objects.annotate(
-                diferencia=F('stock_minimo') - F('cantidad')
-            ).filter(cantidad__lt=F('stock_minimo')).order_by('diferencia')[:10]
-            
-            context['low_stock_products'] = low_stock_products
-            
-            # Estadísticas
-            context['total_products'] = Product.objects.count()
-            context['critical_stock'] = Product.objects.filter(
-                cantidad__lt=F('stock_minimo')
-            ).count()
-            
-            # Movimientos del día
-            today = timezone.now().date()
-            context['today_entries'] = Movimiento.objects.filter(
-                fecha__date=today,
-                tipo_movimiento__es_salida=False
-            ).count()
-            context['today_exits'] = Movimiento.objects.filter(
-                fecha__date=today,
-                tipo_movimiento__es_salida=True
-            ).count()
-            
-            # Categorías para filtros
-            from apps.inventory.models import Categoria
-            context['categories'] = Categoria.objects.all()[:10]
-            
-        except Exception as e:
-            # Manejo de errores en caso de que los modelos no existan
-            context['low_stock_products'] = []
-            context['total_products'] = 0
-            context['critical_stock'] = 0
-            context['today_entries'] = 0
-            context['today_exits'] = 0
-            context['categories'] = []
-            print(f"Error en dashboard: {e}")
-        
+        dashboard = get_dashboard()
+        sections = dashboard['sections']
+        context.update(sections['totals'])
+        context.update(sections['movements'])
+        context['low_stock_products'] = sections['low_stock']
+        context['categories'] = sections['categories']
+        context['stale_sections'] = dashboard['stale']
         return context
 
+@replica_reads
 @login_required
 def product_search_api(request):
     """
-    API endpoint para buscar productos por nombre, código o descripción.
+    API endpoint para buscar productos por código o descripción.
     Devuelve los resultados en formato JSON.
     """
     query = request.GET.get('query', '')
-    if not query or len(query) < 2:
-        return JsonResponse([], safe=False)
-    
-    try:
-        products = Product.objects.filter(
-            Q(nombre__icontains=query) |
-            Q(codigo__icontains=query) |
-            Q(descripcion__icontains=query)
-        ).select_related('unidad_medida', 'categoria')[:10]
-        
-        results = []
-        for p in products:
-            results.append({
-                'id': p.id,
-                'nombre': p.nombre,
-                'codigo': p.codigo,
-                'cantidad': float(p.cantidad) if p.cantidad else 0,
-                'precio_unitario': str(p.precio_unitario) if p.precio_unitario else '0.00',
-                'descripcion': p.descripcion or '',
-                'unidad_medida_abreviatura': p.unidad_medida.abreviatura if p.unidad_medida else '',
-                'categoria_nombre': p.categoria.nombre if p.categoria else '',
-                'stock_minimo': float(p.stock_minimo) if p.stock_minimo else 0
-            })
-        
-        return JsonResponse(results, safe=False)
-    
-    except Exception as e:
-        print(f"Error en búsqueda de productos: {e}")
-        return JsonResponse([], safe=False)
+    if not query or len(query.strip()) < 2:
+        return FastJsonResponse([], safe=False)
+    with timed(logger, 'dashboard.search', level=logging.DEBUG) as fields:
+        results = search_products(query)
+        fields['results'] = len(results)
+    return FastJsonResponse(results, safe=False)
 
 @login_required
 def request_replenishment(request, pk):
     product = get_object_or_404(Product, pk=pk)
-    
+
     # Lógica para manejar la solicitud de reposición
     # Aquí podrías crear una notificación, enviar email, etc.
-    
+
     messages.success(
-        request, 
-        f'Solicitud de reposición enviada para {product.nombre}. Stock actual: {product.cantidad}'
+        request,
+        f'Solicitud de reposición enviada para {product.description}. Stock actual: {product.current_stock}'
     )
-    
+
     return redirect('dashboard:index')
 
-# Vista adicional para estadísticas del dashboard
+@replica_reads
 @login_required
 def dashboard_stats_api(request):
     """
     API para obtener estadísticas actualizadas del dashboard
+    (se conserva por compatibilidad; ``dashboard_data_api`` devuelve el panel completo).
     """
-    try:
-        today = timezone.now().date()
-        
-        stats = {
-            'total_products': Product.objects.count(),
-            'critical_stock': Product.objects.filter(cantidad__lt=F('stock_minimo')).count(),
-            'today_entries': Movimiento.objects.filter(
-                fecha__date=today, 
-                tipo_movimiento__es_salida=False
-            ).count(),
-            'today_exits': Movimiento.objects.filter(
-                fecha__date=today, 
-                tipo_movimiento__es_salida=True
-            ).count(),
-        }
-        
-        return JsonResponse(stats)
-    
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+    return FastJsonResponse({**get_section('totals'), **get_section('movements')})
+
+@replica_reads
+@login_required
+def dashboard_data_api(request):
+    """
+    Todos los indicadores del panel en una respuesta. ``?sections=totals,movements``
+    limita las secciones; las que se sirvieron desde la última copia por
+    exceder ``DASHBOARD_LATENCY_BUDGET_MS`` se listan en ``stale``.
+    """
+    sections = [name for name in request.GET.get('sections', '').split(',') if name.strip()]
+    unknown = sorted(set(sections) - set(SECTIONS))
+    if unknown:
+        return FastJsonResponse({'error': f'Secciones no disponibles: {", ".join(unknown)}'}, status=400)
+    dashboard = get_dashboard(sections or None)
+    response = FastJsonResponse({**dashboard['sections'], 'stale': dashboard['stale']})
+    response['Server-Timing'] = ', '.join(
+        [f'{name};dur={duration}' for name, duration in dashboard['timings_ms'].items()]
+        + [f'total;dur={dashboard["duration_ms"]}']
+    )
+    return response
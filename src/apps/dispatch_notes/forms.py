@@ -3,6 +3,7 @@ from django import forms
 from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
 from .models import DispatchNote, DispatchItem
+from apps.inventory.formsets import BatchedInlineFormSet, BatchedLineForm, PrefetchedModelChoiceField
 from apps.inventory.models import Product
 
 class DispatchNoteForm(forms.ModelForm):
@@ -37,7 +38,7 @@ class DispatchNoteForm(forms.ModelForm):
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         }
 
-class DispatchItemForm(forms.ModelForm):
+class DispatchItemForm(BatchedLineForm):
     # Campo para la búsqueda que no está en el modelo
     product_search = forms.CharField(
         label='Buscar Producto',
@@ -72,6 +73,7 @@ class DispatchItemForm(forms.ModelForm):
     class Meta:
         model = DispatchItem
         fields = ['product', 'quantity', 'unit_price', 'brand', 'model']
+        field_classes = {'product': PrefetchedModelChoiceField}
         widgets = {
             'product': forms.HiddenInput(), # Campo oculto para guardar el ID
             'quantity': forms.NumberInput(attrs={
@@ -114,78 +116,37 @@ class DispatchItemForm(forms.ModelForm):
         quantity = cleaned_data.get('quantity')
         unit_price = cleaned_data.get('unit_price')
         
-        print(f"=== CLEAN DEBUG ===")
-        print(f"Product: {product}")
-        print(f"Quantity: {quantity}")
-        print(f"Unit Price: {unit_price}")
-        
         # Validar que el producto sea requerido
         if not product:
             self.add_error('product', 'Este campo es requerido')
             self.add_error('product_search', 'Debe seleccionar un producto')
-            print("❌ Product field is required")
         
         # Validar cantidad
         if quantity is not None:
             if quantity <= 0:
                 self.add_error('quantity', 'La cantidad debe ser mayor a 0')
-                print("❌ Quantity must be greater than 0")
         
         # Validar precio unitario
         if unit_price is not None and unit_price < 0:
             self.add_error('unit_price', 'El precio unitario no puede ser negativo')
-            print("❌ Unit price cannot be negative")
-        
-        # NUEVA VALIDACIÓN: Verificar stock disponible
-        if product and quantity:
-            if hasattr(product, 'current_stock'):
-                current_stock = product.current_stock
-                if current_stock < quantity:
-                    error_msg = f'Stock insuficiente. Disponible: {current_stock}, Solicitado: {quantity}'
-                    self.add_error('quantity', error_msg)
-                    self.add_error('product_search', error_msg)  # También mostrar en búsqueda
-                    print(f"❌ Stock insuficiente: {current_stock} < {quantity}")
-                
-                # Advertencia si el stock es bajo (menos del 10%)
-                elif current_stock > 0 and quantity > current_stock * 0.9:
-                    print(f"⚠️ Stock bajo: {current_stock} unidades disponibles")
-            
-            # Advertencia si el producto no tiene stock definido
-            elif not hasattr(product, 'current_stock'):
-                print(f"⚠️ Producto sin información de stock: {product}")
         
+        # El stock disponible se valida en el formset, sumando todas las líneas de cada producto
         return cleaned_data
-    
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        
-        # Si tenemos un producto pero no precio unitario, usar el precio del producto
-        if instance.product and not instance.unit_price:
-            if hasattr(instance.product, 'unit_price') and instance.product.unit_price:
-                instance.unit_price = instance.product.unit_price
-                print(f"💰 Precio unitario asignado desde producto: {instance.unit_price}")
-            else:
-                instance.unit_price = 0
-                print("⚠️ Precio unitario establecido a 0 (no disponible en producto)")
-        
-        # Calcular subtotal automáticamente
-        if instance.quantity and instance.unit_price:
-            instance.subtotal = instance.quantity * instance.unit_price
-            print(f"🧮 Subtotal calculado: {instance.subtotal}")
-        
-        if commit:
-            instance.save()
-            print(f"✅ Item guardado: {instance.product} x {instance.quantity}")
-        
-        return instance
+
+
+class DispatchItemBaseFormSet(BatchedInlineFormSet):
+    check_stock = True
+    default_price_from_product = True
+
 
 DispatchItemFormSet = inlineformset_factory(
     DispatchNote,
     DispatchItem,
     form=DispatchItemForm,
+    formset=DispatchItemBaseFormSet,
     extra=1,
     can_delete=True,
     max_num=500,
     validate_max=False,
     exclude=[]
-)
\ No newline at end of file
+)
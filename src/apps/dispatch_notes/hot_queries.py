@@ -0,0 +1,13 @@
+# src/apps/dispatch_notes/hot_queries.py
+from core.hot_queries import register
+from .models import DispatchNote
+
+
+@register('dispatch_notes.pending')
+def pending():
+    return DispatchNote.objects.filter(status='PENDING').order_by('-dispatch_date')
+
+
+@register('dispatch_notes.list')
+def latest():
+    return DispatchNote.objects.order_by('-dispatch_date')[:15]
@@ -0,0 +1,65 @@
+# apps/dispatch_notes/management/commands/bench_pdf.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from apps.dispatch_notes.models import DispatchNote
+
+TEMPLATE = 'dispatch_notes/dispatch_print.html'
+STYLESHEET = 'dispatch_notes/pdf/dispatch_note.css'
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de PDF de notas de despacho: renderizados por segundo con el camino anterior '
+        '(hoja de estilo y fuentes analizadas en cada PDF, recursos por HTTP) y con core.pdf'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=20, help='PDFs por modo')
+        parser.add_argument(
+            '--base-url', default=None,
+            help='base_url del modo anterior (p. ej. http://nginx/) para incluir la descarga de recursos por HTTP',
+        )
+
+    def handle(self, *args, **options):
+        from weasyprint import CSS, HTML
+        from weasyprint.text.fonts import FontConfiguration
+
+        from core.pdf import _static_path, render_pdf
+
+        note = (
+            DispatchNote.objects.select_related('client', 'supplier', 'created_by')
+            .prefetch_related('items__product').order_by('-pk').first()
+        )
+        if note is None:
+            raise CommandError('No hay notas de despacho para renderizar.')
+        context = {'object': note, 'dispatch': note}
+        stylesheet = _static_path(STYLESHEET)
+
+        def legacy():
+            html_string = render_to_string(TEMPLATE, context)
+            font_config = FontConfiguration()
+            return HTML(string=html_string, base_url=options['base_url']).write_pdf(
+                stylesheets=[CSS(filename=stylesheet, font_config=font_config)], font_config=font_config,
+            )
+
+        def engine():
+            return render_pdf(TEMPLATE, context, stylesheets=[STYLESHEET])
+
+        engine()  # Carga fuentes y hojas de estilo compartidas antes de medir
+        self.stdout.write(f'Nota {note.dispatch_number}: {note.items.count()} líneas, {options["renders"]} PDFs por modo')
+        self.stdout.write(f'{"modo":<10} {"PDF/s":>8} {"ms/PDF":>8} {"p95 ms":>8} {"bytes":>8}')
+        for mode, render in (('anterior', legacy), ('core.pdf', engine)):
+            timings, size = [], 0
+            for _ in range(options['renders']):
+                started = time.perf_counter()
+                size = len(render())
+                timings.append((time.perf_counter() - started) * 1000)
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            self.stdout.write(
+                f'{mode:<10} {1000 / statistics.mean(timings):>8.2f} {statistics.mean(timings):>8.1f} '
+                f'{p95:>8.1f} {size:>8}'
+            )
+        self.stdout.write(self.style.SUCCESS('Benchmark de PDF finalizado.'))
@@ -0,0 +1,49 @@
+# apps/dispatch_notes/management/commands/print_dispatch_notes.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.dispatch_notes.models import DispatchNote
+from apps.dispatch_notes.printing import FORMATS, batch_filename, batch_queryset, print_batch
+
+class Command(BaseCommand):
+    help = 'Imprime un lote de notas de despacho (rango de fechas y/o estado) en un PDF o ZIP y reporta páginas por segundo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='Fecha inicial AAAA-MM-DD')
+        parser.add_argument('--to', dest='date_to', help='Fecha final AAAA-MM-DD (por defecto, la inicial)')
+        parser.add_argument('--status', choices=[choice for choice, _ in DispatchNote.DISPATCH_STATUS_CHOICES])
+        parser.add_argument('--format', dest='output_format', choices=FORMATS, default='pdf')
+        parser.add_argument('--workers', type=int, default=settings.DISPATCH_BATCH_PRINT_WORKERS,
+                            help='Procesos que maquetan los PDF (1: en este proceso)')
+        parser.add_argument('--output', help='Archivo de salida (por defecto, un nombre según los filtros)')
+
+    def handle(self, *args, **options):
+        date_from = self._date(options['date_from'])
+        date_to = self._date(options['date_to']) or date_from
+        status = options['status']
+        if not date_from and not status:
+            raise CommandError('Indique --from/--to o --status.')
+
+        notes = batch_queryset(date_from, date_to, status)
+        result = print_batch(notes, options['output_format'], workers=max(1, options['workers']))
+        if not result['notes']:
+            raise CommandError('No hay notas de despacho con esos filtros.')
+
+        output = options['output'] or batch_filename(options['output_format'], date_from, date_to, status)
+        with open(output, 'wb') as f:
+            f.write(result['content'])
+
+        self.stdout.write(
+            f"{result['notes']} notas, {result['pages']} páginas en {result['seconds']:.2f} s "
+            f"({result['pages_per_second']:.1f} páginas/s, {options['workers']} procesos)"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Lote guardado en {output}'))
+
+    def _date(self, value):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'Fecha no válida: {value}')
+        return parsed
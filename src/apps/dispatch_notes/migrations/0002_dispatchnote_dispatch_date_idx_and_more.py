@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dispatch_notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dispatchnote',
+            index=models.Index(fields=['-dispatch_date'], name='dispatch_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dispatchnote',
+            index=models.Index(fields=['status', '-dispatch_date'], name='dispatch_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dispatchnote',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-dispatch_date'], name='dispatch_pending_idx'),
+        ),
+    ]
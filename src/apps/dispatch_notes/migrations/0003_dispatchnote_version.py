@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dispatch_notes', '0002_dispatchnote_dispatch_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dispatchnote',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Versión'),
+        ),
+    ]
@@ -3,7 +3,7 @@ from django.db import models
 from django.utils import timezone
 from apps.inventory.models import Product, Client, Supplier
 from django.contrib.auth.models import User
-from django.db.models import F
+from django.db.models import F, Q
 import random
 import string
 
@@ -25,6 +25,7 @@ class DispatchNote(models.Model):
     status = models.CharField(max_length=20, choices=DISPATCH_STATUS_CHOICES, default='PENDING', verbose_name="Estado")
     notes = models.TextField(blank=True, verbose_name="Observaciones")
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False, verbose_name="Total")
+    version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Versión")
     
     # Campos del transporte
     driver_name = models.CharField(max_length=100, blank=True, verbose_name="Nombre del Conductor")
@@ -37,6 +38,12 @@ class DispatchNote(models.Model):
         verbose_name = "Nota de Despacho"
         verbose_name_plural = "Notas de Despacho"
         ordering = ['-dispatch_date']
+        indexes = [
+            models.Index(fields=['-dispatch_date'], name='dispatch_date_idx'),
+            models.Index(fields=['status', '-dispatch_date'], name='dispatch_status_date_idx'),
+            models.Index(fields=['-dispatch_date'], name='dispatch_pending_idx',
+                         condition=Q(status='PENDING')),
+        ]
 
     def __str__(self):
         return f'Nota de Despacho #{self.dispatch_number}'
@@ -49,19 +56,23 @@ class DispatchNote(models.Model):
 
     def generate_dispatch_number(self):
         """Genera un número de despacho automático con formato ND-YYYYMMDD-XXXX"""
+        return self.generate_dispatch_numbers(1)[0]
+
+    @classmethod
+    def generate_dispatch_numbers(cls, count):
+        """Reserva ``count`` números consecutivos del día con una sola consulta (conversiones por lote)"""
         date_str = timezone.now().strftime('%Y%m%d')
         
         # Contar despachos del día
         today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
         today_end = today_start + timezone.timedelta(days=1)
         
-        today_count = DispatchNote.objects.filter(
+        today_count = cls.objects.filter(
             dispatch_date__gte=today_start,
             dispatch_date__lt=today_end
         ).count()
         
-        sequence = today_count + 1
-        return f"ND-{date_str}-{sequence:04d}"
+        return [f"ND-{date_str}-{sequence:04d}" for sequence in range(today_count + 1, today_count + count + 1)]
 
 class DispatchItem(models.Model):
     dispatch_note = models.ForeignKey(DispatchNote, related_name='items', on_delete=models.CASCADE, verbose_name="Nota de Despacho")
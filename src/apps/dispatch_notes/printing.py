@@ -0,0 +1,153 @@
+# src/apps/dispatch_notes/printing.py
+"""
+Impresión por lotes de notas de despacho.
+
+Las notas del lote se leen con una sola precarga (cliente, proveedor,
+usuario, ítems y productos) y sus plantillas se renderizan en este proceso;
+la maquetación y escritura de cada PDF, que es lo costoso, se reparte en un
+pool de procesos que solo recibe el HTML y no abre conexiones a la base de
+datos. El lote se imprime dentro de un worker con hilos, así que el pool
+arranca sus procesos con ``spawn`` y no con ``fork``: un ``fork`` copiaría
+los locks que otros hilos tuvieran tomados en ese momento (logging,
+conexiones, fontconfig) y el hijo podría quedarse bloqueado. El resultado
+es un único PDF (unido con pypdf en el orden del lote) o un ZIP con un PDF
+por nota.
+"""
+import io
+import logging
+import multiprocessing
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import django
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.log import timed
+from .models import DispatchNote
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = 'dispatch_notes/dispatch_print.html'
+STYLESHEET = 'dispatch_notes/pdf/dispatch_note.css'
+FORMATS = ('pdf', 'zip')
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def batch_queryset(date_from=None, date_to=None, status=None):
+    """
+    Notas del lote en orden de fecha. Las fechas se filtran como rango
+    ``[date_from 00:00, date_to + 1 día 00:00)`` para usar los índices de
+    ``dispatch_date``.
+    """
+    queryset = (
+        DispatchNote.objects.select_related('client', 'supplier', 'created_by')
+        .prefetch_related('items__product')
+        .order_by('dispatch_date', 'pk')
+    )
+    if date_from:
+        queryset = queryset.filter(dispatch_date__gte=_day_start(date_from))
+    if date_to:
+        queryset = queryset.filter(dispatch_date__lt=_day_start(date_to + timedelta(days=1)))
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def _render_note(html_string):
+    # Se ejecuta en los procesos del pool: solo WeasyPrint, sin acceso a la base de datos
+    from core.pdf import render_document
+
+    document = render_document(html_string, [STYLESHEET])
+    return document.write_pdf(), len(document.pages)
+
+
+def _render_all(html_strings, workers):
+    if workers <= 1 or len(html_strings) <= 1:
+        return [_render_note(html_string) for html_string in html_strings]
+    # Procesos nuevos (no copias del worker con hilos); cada uno configura Django
+    # antes de recibir la primera nota, que importa este módulo al deserializarse
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as executor:
+        chunksize = max(1, len(html_strings) // (workers * 4))
+        return list(executor.map(_render_note, html_strings, chunksize=chunksize))
+
+
+def _merge(rendered):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for pdf, _ in rendered:
+        writer.append(io.BytesIO(pdf))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _zip(notes, rendered):
+    output = io.BytesIO()
+    # Los PDF ya van comprimidos: se guardan sin volver a comprimir
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+        for note, (pdf, _) in zip(notes, rendered):
+            archive.writestr(f'nota_despacho_{note.dispatch_number}.pdf', pdf)
+    return output.getvalue()
+
+
+def print_batch(notes, output_format='pdf', workers=None, progress=None):
+    """
+    Genera el lote ``notes`` (queryset o lista de notas ya precargadas).
+
+    Devuelve ``{'content', 'notes', 'pages', 'seconds', 'pages_per_second'}``.
+    ``progress(pct, mensaje)`` se llama entre fases (p. ej. ``job.set_progress``).
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f'Formato no soportado: {output_format}')
+    workers = workers or settings.DISPATCH_BATCH_PRINT_WORKERS
+    progress = progress or (lambda pct, message: None)
+
+    with timed(logger, 'dispatch_notes.print_batch', format=output_format, workers=workers) as fields:
+        started = time.perf_counter()
+        notes = list(notes)
+        html_strings = [
+            render_to_string(TEMPLATE, {'object': note, 'dispatch': note}) for note in notes
+        ]
+        progress(20, f'Maquetando {len(notes)} notas')
+
+        rendered = _render_all(html_strings, workers) if notes else []
+        progress(80, 'Uniendo el lote' if output_format == 'pdf' else 'Comprimiendo el lote')
+
+        if not rendered:
+            content = b''
+        elif output_format == 'zip':
+            content = _zip(notes, rendered)
+        else:
+            content = _merge(rendered)
+
+        seconds = time.perf_counter() - started
+        pages = sum(page_count for _, page_count in rendered)
+        result = {
+            'content': content,
+            'notes': len(notes),
+            'pages': pages,
+            'seconds': round(seconds, 3),
+            'pages_per_second': round(pages / seconds, 2) if seconds else 0.0,
+        }
+        fields.update({key: value for key, value in result.items() if key != 'content'}, bytes=len(content))
+    return result
+
+
+def batch_filename(output_format, date_from=None, date_to=None, status=None):
+    parts = ['notas_despacho']
+    if date_from:
+        parts.append(date_from.isoformat())
+    if date_to and date_to != date_from:
+        parts.append(date_to.isoformat())
+    if status:
+        parts.append(status.lower())
+    return f'{"_".join(parts)}.{output_format}'
@@ -0,0 +1,45 @@
+# src/apps/dispatch_notes/tasks.py
+from apps.jobs.queue import JobFailed, task
+from core.db_router import use_replica
+from .models import DispatchNote
+
+@task('dispatch_notes.render_pdf')
+def render_pdf(job, dispatch_note_id, base_url=None):
+    # base_url se acepta por las tareas encoladas antes de core.pdf; ya no se usa
+    from .views import render_dispatch_pdf
+
+    dispatch_note = (
+        DispatchNote.objects.select_related('client', 'supplier', 'created_by')
+        .prefetch_related('items__product')
+        .filter(pk=dispatch_note_id).first()
+    )
+    if dispatch_note is None:
+        raise JobFailed('La nota de despacho ya no existe.')
+
+    job.set_progress(10, 'Generando PDF')
+    pdf = render_dispatch_pdf(dispatch_note)
+    url = job.save_file(f'nota_despacho_{dispatch_note.dispatch_number}.pdf', pdf)
+    return {'file_url': url, 'redirect_url': url}
+
+
+@task('dispatch_notes.print_batch')
+def print_batch(job, date_from=None, date_to=None, status=None, output_format='pdf'):
+    from datetime import date
+
+    from .printing import batch_filename, batch_queryset, print_batch as render_batch
+
+    date_from = date.fromisoformat(date_from) if date_from else None
+    date_to = date.fromisoformat(date_to) if date_to else None
+    notes = batch_queryset(date_from, date_to, status)
+
+    job.set_progress(5, 'Cargando notas de despacho')
+    with use_replica():
+        result = render_batch(notes, output_format, progress=job.set_progress)
+    if not result['notes']:
+        raise JobFailed('No hay notas de despacho con esos filtros.')
+
+    url = job.save_file(batch_filename(output_format, date_from, date_to, status), result['content'])
+    return {
+        'file_url': url, 'redirect_url': url,
+        'notes': result['notes'], 'pages': result['pages'], 'pages_per_second': result['pages_per_second'],
+    }
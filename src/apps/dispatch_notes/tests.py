@@ -1,3 +1,141 @@
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.inventory.models import Product
+
+from .forms import DispatchItemFormSet
+from .models import DispatchItem, DispatchNote
+
+
+def formset_data(lines, initial=0):
+    """Datos POST del formset ``items``; cada línea es un diccionario de campos."""
+    data = {
+        'items-TOTAL_FORMS': str(len(lines)), 'items-INITIAL_FORMS': str(initial),
+        'items-MIN_NUM_FORMS': '0', 'items-MAX_NUM_FORMS': '500',
+    }
+    for index, line in enumerate(lines):
+        for name, value in line.items():
+            data[f'items-{index}-{name}'] = '' if value is None else str(value)
+    return data
+
+
+class BatchedFormSetTests(TestCase):
+
+    def setUp(self):
+        self.products = [
+            Product.objects.create(product_code=f'P{i}', description=f'Producto {i}', unit='UND',
+                                   unit_price=Decimal('1.50') * (i + 1), current_stock=100)
+            for i in range(12)
+        ]
+
+    def note(self):
+        return DispatchNote.objects.create(beneficiary='Beneficiario')
+
+    def lines(self, note):
+        return list(note.items.order_by('product_id', 'quantity')
+                    .values_list('product_id', 'quantity', 'unit_price', 'brand', 'subtotal'))
+
+    def new_lines(self):
+        return [
+            {'product': self.products[0].pk, 'quantity': 3, 'unit_price': '2.25', 'brand': 'Truper'},
+            {'product': self.products[1].pk, 'quantity': 1, 'unit_price': '10.00'},
+            {'product': self.products[0].pk, 'quantity': 2, 'unit_price': '2.25'},
+            # Fila vacía del formulario (extra): se ignora
+            {'product': None, 'quantity': None, 'unit_price': None},
+        ]
+
+    def save_both_ways(self, make_data, batched_note, legacy_note):
+        """Guarda los mismos datos con ``save_lines`` y con el guardado por fila de Django."""
+        batched = DispatchItemFormSet(make_data(batched_note), instance=batched_note)
+        self.assertTrue(batched.is_valid(), batched.errors)
+        _, _, total = batched.save_lines(batched_note)
+
+        legacy = DispatchItemFormSet(make_data(legacy_note), instance=legacy_note)
+        self.assertTrue(legacy.is_valid(), legacy.errors)
+        legacy.save()  # save() de cada DispatchItem
+        return total
+
+    def test_new_lines_match_per_row_save(self):
+        batched_note, legacy_note = self.note(), self.note()
+        total = self.save_both_ways(lambda note: formset_data(self.new_lines()), batched_note, legacy_note)
+
+        self.assertEqual(self.lines(batched_note), self.lines(legacy_note))
+        batched_note.refresh_from_db()
+        legacy_note.refresh_from_db()
+        self.assertEqual(total, Decimal('21.25'))
+        self.assertEqual(batched_note.total, legacy_note.total)
+
+    def test_updates_and_deletes_match_per_row_save(self):
+        notes = self.note(), self.note()
+        for note in notes:
+            for product, quantity in ((0, 1), (1, 2), (2, 3)):
+                DispatchItem.objects.create(dispatch_note=note, product=self.products[product], quantity=quantity,
+                                            unit_price=Decimal('4.00'))
+
+        def edit(note):
+            first, second, third = note.items.order_by('pk')
+            return formset_data([
+                {'id': first.pk, 'product': first.product_id, 'quantity': 5, 'unit_price': '4.00'},
+                {'id': second.pk, 'product': second.product_id, 'quantity': 2, 'unit_price': '4.00', 'DELETE': 'on'},
+                {'id': third.pk, 'product': third.product_id, 'quantity': 3, 'unit_price': '4.00'},
+                {'product': self.products[3].pk, 'quantity': 4, 'unit_price': '0.50'},
+            ], initial=3)
+
+        total = self.save_both_ways(edit, *notes)
+
+        batched_note, legacy_note = notes
+        self.assertEqual(self.lines(batched_note), self.lines(legacy_note))
+        self.assertEqual(len(self.lines(batched_note)), 3)
+        # El guardado por fila no recalcula el total al borrar: se compara con la suma de las líneas
+        batched_note.refresh_from_db()
+        self.assertEqual(total, Decimal('34.00'))
+        self.assertEqual(batched_note.total, sum(line[-1] for line in self.lines(legacy_note)))
+
+    def test_price_defaults_to_product_price(self):
+        note = self.note()
+        formset = DispatchItemFormSet(formset_data([
+            {'product': self.products[2].pk, 'quantity': 2, 'unit_price': '0'},
+        ]), instance=note)
+        self.assertTrue(formset.is_valid(), formset.errors)
+        _, _, total = formset.save_lines(note)
+        self.assertEqual(self.lines(note), [(self.products[2].pk, 2, Decimal('4.50'), '', Decimal('9.00'))])
+        self.assertEqual(total, Decimal('9.00'))
+
+    def test_stock_is_validated_per_product(self):
+        Product.objects.filter(pk=self.products[0].pk).update(current_stock=4)
+        note = self.note()
+        lines = self.new_lines()  # 3 + 2 unidades de products[0]
+
+        formset = DispatchItemFormSet(formset_data(lines), instance=note)
+        self.assertFalse(formset.is_valid())
+        message = 'Stock insuficiente. Disponible: 4, Solicitado: 5'
+        self.assertEqual([form.errors.get('quantity') for form in formset.forms[:3]], [[message], None, [message]])
+
+        # Una línea eliminada no cuenta para el stock
+        lines[2]['DELETE'] = 'on'
+        formset = DispatchItemFormSet(formset_data(lines), instance=note)
+        self.assertTrue(formset.is_valid(), formset.errors)
+
+    def test_unknown_product_is_rejected(self):
+        formset = DispatchItemFormSet(formset_data([
+            {'product': 999999, 'quantity': 1, 'unit_price': '1.00'},
+        ]), instance=self.note())
+        self.assertFalse(formset.is_valid())
+        self.assertIn('product', formset.forms[0].errors)
+
+    def test_queries_do_not_grow_with_lines(self):
+        def count_queries(size):
+            note = self.note()
+            data = formset_data([
+                {'product': product.pk, 'quantity': 1, 'unit_price': '1.00'} for product in self.products[:size]
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                formset = DispatchItemFormSet(data, instance=note)
+                self.assertTrue(formset.is_valid(), formset.errors)
+                formset.save_lines(note)
+            return len(queries)
 
-# Create your tests here.
+        self.assertEqual(count_queries(2), count_queries(12))
@@ -4,22 +4,36 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
-from django.http import JsonResponse, HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils.dateparse import parse_date
+from django.views import View
 from django.db import transaction
-from django.template.loader import render_to_string
-from weasyprint import HTML
 from .models import DispatchNote, DispatchItem
 from .forms import DispatchNoteForm, DispatchItemFormSet
 from apps.inventory.models import Product, Client, Supplier
-from django.db.models import F
+from apps.inventory.stock import InsufficientStock, remove_stock
+from apps.jobs.queue import enqueue
+from apps.jobs.views import async_requested, job_accepted
+from apps.httpcache.decorators import ConditionalMixin, conditional_on
+from apps.workflow.decorators import idempotent
+from apps.workflow.transitions import transition
 from django.contrib import messages
 from django.db.models import Q
 from django.utils import timezone
 from django.db import models  # Para usar models.Sum en las estadísticas
+import logging
+
+from core.db_router import ReplicaReadMixin
+from core.json import FastJsonResponse
+from core.log import timed
+
+logger = logging.getLogger(__name__)
 
 # Vistas de la interfaz de usuario
-class DispatchNoteListView(LoginRequiredMixin, ListView):
+class DispatchNoteListView(LoginRequiredMixin, ReplicaReadMixin, ConditionalMixin, ListView):
     model = DispatchNote
+    cache_models = ('dispatch_notes.DispatchNote', 'inventory.Client')
     template_name = 'dispatch_notes/dispatch_list.html'
     context_object_name = 'dispatches'
     paginate_by = 15
@@ -96,33 +110,8 @@ class DispatchNoteCreateView(LoginRequiredMixin, CreateView):
             return self.form_invalid(form, formset)
 
     def form_valid(self, form, formset):
-        print("=== DEBUG FORM VALIDATION CREATE ===")
-        print(f"Form is valid: {form.is_valid()}")
-        print(f"Formset is valid: {formset.is_valid()}")
-        
-        if not formset.is_valid():
-            print("Formset errors:", formset.errors)
-            print("Formset non-form errors:", formset.non_form_errors())
-            
-            # DEBUG DETALLADO DE CADA FORMULARIO
-            for i, item_form in enumerate(formset):
-                print(f"\n--- Form {i} ---")
-                print(f"Is valid: {item_form.is_valid()}")
-                if not item_form.is_valid():
-                    print(f"Errors: {item_form.errors}")
-                    print(f"Non field errors: {item_form.non_field_errors()}")
-                    if hasattr(item_form, 'cleaned_data'):
-                        print(f"Cleaned data: {item_form.cleaned_data}")
-                    else:
-                        print("Cleaned data: Not available")
-        
-        # Si el formset no es válido, retornar error
-        if not formset.is_valid():
-            messages.error(self.request, "Error en los productos. Por favor revisa los datos.")
-            return self.form_invalid(form, formset)
-        
         try:
-            with transaction.atomic():
+            with timed(logger, 'dispatch_note.create') as fields, transaction.atomic():
                 self.object = form.save(commit=False)
                 self.object.created_by = self.request.user
                 self.object.dispatch_date = timezone.now()  # Establecer fecha actual
@@ -130,49 +119,10 @@ class DispatchNoteCreateView(LoginRequiredMixin, CreateView):
                 # El número se generará automáticamente en el save() del modelo
                 self.object.save()
 
-                # DEBUG: Mostrar lo que se va a guardar
-                print("=== GUARDANDO ITEMS ===")
-                items_to_save = formset.save(commit=False)
-                print(f"Items to save: {len(items_to_save)}")
-                
-                for i, item in enumerate(items_to_save):
-                    print(f"\n--- Guardando item {i} ---")
-                    print(f"Product: {item.product}")
-                    print(f"Quantity: {item.quantity}")
-                    print(f"Unit price: {item.unit_price}")
-                    
-                    # Asegurarse de que el producto esté establecido
-                    if not item.product:
-                        print(f"⚠️  Skipping item without product: {item}")
-                        continue
-                        
-                    item.dispatch_note = self.object
-                    
-                    # Si no hay precio unitario, usar el del producto
-                    if not item.unit_price and hasattr(item.product, 'unit_price'):
-                        item.unit_price = item.product.unit_price
-                    
-                    item.subtotal = item.quantity * (item.unit_price if item.unit_price else 0)
-                    print(f"Subtotal: {item.subtotal}")
-                    item.save()
-                    print(f"✅ Item guardado con ID: {item.id}")
-                
-                # Guardar los elementos eliminados
-                for obj in formset.deleted_objects:
-                    print(f"🗑️  Eliminando objeto: {obj}")
-                    obj.delete()
-                
-                # Recalcular total
-                total = sum(item.subtotal for item in self.object.items.all())
-                self.object.total = total
-                self.object.save()
-                print(f"💰 Total guardado: {self.object.total}")
-                print(f"🔢 Número de despacho generado: {self.object.dispatch_number}")
-                
+                # Líneas en lote: un bulk_create y el total calculado en memoria
+                created, _, _ = formset.save_lines(self.object)
+                fields.update(dispatch_note_id=self.object.pk, lines=len(created))
         except Exception as e:
-            print(f"❌ Error durante el guardado: {str(e)}")
-            import traceback
-            traceback.print_exc()
             messages.error(self.request, f"Error al guardar: {str(e)}")
             return self.form_invalid(form, formset)
         
@@ -180,10 +130,6 @@ class DispatchNoteCreateView(LoginRequiredMixin, CreateView):
         return redirect(self.get_success_url())
     
     def form_invalid(self, form, formset):
-        print("=== FORM INVALID ===")
-        print(f"Form errors: {form.errors}")
-        print(f"Formset errors: {formset.errors}")
-        
         # Agregar clientes y proveedores al contexto incluso en caso de error
         context = self.get_context_data(form=form, formset=formset)
         context['clients'] = Client.objects.filter(is_active=True)
@@ -211,9 +157,6 @@ class DispatchNoteUpdateView(LoginRequiredMixin, UpdateView):
         return context
 
     def post(self, request, *args, **kwargs):
-        print("=== DEBUG UPDATE POST ===")
-        print("POST data keys:", list(request.POST.keys()))
-        
         self.object = self.get_object()
         
         # No permitir edición si ya está despachado
@@ -230,55 +173,16 @@ class DispatchNoteUpdateView(LoginRequiredMixin, UpdateView):
             return self.form_invalid(form, formset)
 
     def form_valid(self, form, formset):
-        print("=== DEBUG FORM VALIDATION UPDATE ===")
-        print(f"Form is valid: {form.is_valid()}")
-        print(f"Formset is valid: {formset.is_valid()}")
-        
-        if not form.is_valid():
-            print("Form errors:", form.errors)
-            
-        if not formset.is_valid():
-            print("Formset errors:", formset.errors)
-            print("Formset non-form errors:", formset.non_form_errors())
-            for i, item_form in enumerate(formset):
-                if not item_form.is_valid():
-                    print(f"Form {i} errors:", item_form.errors)
-        
-        # Si el formset no es válido, retornar error
-        if not formset.is_valid():
-            messages.error(self.request, "Error en los productos. Por favor revisa los datos.")
-            return self.form_invalid(form, formset)
-        
-        with transaction.atomic():
+        with timed(logger, 'dispatch_note.update', dispatch_note_id=self.object.pk) as fields, transaction.atomic():
             self.object = form.save()
-            items_to_save = formset.save(commit=False)
-            
-            for item in items_to_save:
-                item.dispatch_note = self.object
-                
-                # Si no hay precio unitario, usar el del producto
-                if not item.unit_price and hasattr(item.product, 'unit_price'):
-                    item.unit_price = item.product.unit_price
-                
-                item.subtotal = item.quantity * (item.unit_price if item.unit_price else 0)
-                item.save()
-            
-            # Manejar items eliminados
-            for item in formset.deleted_objects:
-                item.delete()
-            
-            # Recalcular total
-            self.object.total = sum(item.subtotal for item in self.object.items.all())
-            self.object.save()
+            # Altas, cambios y bajas de líneas en lote; el total se calcula en memoria
+            created, updated, _ = formset.save_lines(self.object)
+            fields.update(created=len(created), updated=len(updated))
         
         messages.success(self.request, f"Nota de Despacho N°{self.object.dispatch_number} actualizada exitosamente.")
         return redirect(self.get_success_url())
 
     def form_invalid(self, form, formset):
-        print("=== FORM INVALID ===")
-        print(f"Form errors: {form.errors}")
-        print(f"Formset errors: {formset.errors}")
-        
         # Agregar clientes y proveedores al contexto incluso en caso de error
         context = self.get_context_data(form=form, formset=formset)
         context['clients'] = Client.objects.filter(is_active=True)
@@ -286,8 +190,9 @@ class DispatchNoteUpdateView(LoginRequiredMixin, UpdateView):
         
         return self.render_to_response(context)
     
-class DispatchNoteDetailView(LoginRequiredMixin, DetailView):
+class DispatchNoteDetailView(LoginRequiredMixin, ConditionalMixin, DetailView):
     model = DispatchNote
+    cache_models = ('dispatch_notes.DispatchNote', 'inventory.Client', 'inventory.Supplier', 'inventory.Product')
     template_name = 'dispatch_notes/dispatch_detail.html'
     context_object_name = 'dispatch_note'
     
@@ -295,69 +200,116 @@ class DispatchNoteDetailView(LoginRequiredMixin, DetailView):
         return super().get_queryset().select_related('client', 'created_by', 'supplier').prefetch_related('items__product')
 
 
+def render_dispatch_pdf(dispatch_note):
+    """Genera el PDF de la nota de despacho (usado por la vista y por la tarea en segundo plano)."""
+    from core.pdf import render_pdf
+
+    return render_pdf(
+        'dispatch_notes/dispatch_print.html',
+        {'object': dispatch_note, 'dispatch': dispatch_note},
+        stylesheets=['dispatch_notes/pdf/dispatch_note.css'],
+    )
+
+
 class DispatchNotePrintView(LoginRequiredMixin, DetailView):
     model = DispatchNote
     template_name = 'dispatch_notes/dispatch_print.html'
     context_object_name = 'dispatch'
     
+    def get_queryset(self):
+        return super().get_queryset().select_related('client', 'supplier', 'created_by').prefetch_related('items__product')
+
     def get(self, request, *args, **kwargs):
         self.object = self.get_object()
-        context = self.get_context_data(object=self.object)
-        
-        html_string = render_to_string(self.template_name, context)
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        pdf = html.write_pdf()
+
+        # Modo asíncrono: el PDF se genera en el worker y se descarga desde la página de la tarea
+        if async_requested(request):
+            job = enqueue('dispatch_notes.render_pdf', user=request.user, dispatch_note_id=self.object.pk)
+            return job_accepted(request, job, f'Generando el PDF de la nota {self.object.dispatch_number}...')
+
+        pdf = render_dispatch_pdf(self.object)
         
         response = HttpResponse(pdf, content_type='application/pdf')
         response['Content-Disposition'] = f'inline; filename="nota_despacho_{self.object.dispatch_number}.pdf"'
         
         return response
     
+class DispatchNoteBatchPrintView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """
+    Lote de notas en un PDF o ZIP, filtrado por ``date_from``/``date_to``
+    (AAAA-MM-DD) y ``status``. Los lotes pequeños se generan en la petición;
+    los que superan ``DISPATCH_BATCH_PRINT_SYNC_LIMIT`` notas, o con
+    ``async=1``, se encolan y se reparten en el pool de procesos del worker.
+    """
+
+    def get(self, request, *args, **kwargs):
+        from .printing import FORMATS, batch_filename, batch_queryset, print_batch
+
+        date_from = parse_date(request.GET.get('date_from') or request.GET.get('date') or '')
+        date_to = parse_date(request.GET.get('date_to') or '') or date_from
+        status = request.GET.get('status') or None
+        output_format = request.GET.get('format', 'pdf')
+        if output_format not in FORMATS or (status and status not in dict(DispatchNote.DISPATCH_STATUS_CHOICES)):
+            return HttpResponseBadRequest('Filtros de impresión no válidos.')
+        if not date_from and not status:
+            messages.error(request, 'Indique una fecha o un estado para imprimir el lote.')
+            return redirect('dispatch_notes:list')
+
+        notes = batch_queryset(date_from, date_to, status)
+        if async_requested(request) or notes.count() > settings.DISPATCH_BATCH_PRINT_SYNC_LIMIT:
+            job = enqueue(
+                'dispatch_notes.print_batch', user=request.user,
+                date_from=date_from and date_from.isoformat(), date_to=date_to and date_to.isoformat(),
+                status=status, output_format=output_format,
+            )
+            return job_accepted(request, job, 'Generando el lote de notas de despacho...')
+
+        result = print_batch(notes, output_format, workers=1)
+        if not result['notes']:
+            messages.warning(request, 'No hay notas de despacho con esos filtros.')
+            return redirect('dispatch_notes:list')
+
+        content_type = 'application/pdf' if output_format == 'pdf' else 'application/zip'
+        disposition = 'inline' if output_format == 'pdf' else 'attachment'
+        response = HttpResponse(result['content'], content_type=content_type)
+        response['Content-Disposition'] = (
+            f'{disposition}; filename="{batch_filename(output_format, date_from, date_to, status)}"'
+        )
+        response['X-Batch-Pages'] = result['pages']
+        return response
+
 # Vista para confirmar despacho
+@idempotent('dispatch_notes.confirm')
 def dispatch_note_confirm(request, pk):
     dispatch_note = get_object_or_404(DispatchNote, pk=pk)
     
     if request.method == 'POST':
-        if dispatch_note.status == 'PENDING':
-            try:
-                with transaction.atomic():
-                    # 1. Actualizar el estado de la nota de despacho a 'DESPACHADO'
-                    dispatch_note.status = 'DISPATCHED'
-                    dispatch_note.save()
-                    
-                    # 2. Descontar el stock de cada producto
-                    for item in dispatch_note.items.all():
-                        product = item.product
-                        # Verificar stock suficiente
-                        if product.current_stock < item.quantity:
-                            messages.warning(
-                                request, 
-                                f"Stock insuficiente para {product.description}. Stock actual: {product.current_stock}, solicitado: {item.quantity}"
-                            )
-                            continue
-                            
-                        # Utilizamos F() para evitar condiciones de carrera
-                        Product.objects.filter(pk=product.pk).update(
-                            current_stock=F('current_stock') - item.quantity
-                        )
-                        
+        try:
+            with transaction.atomic():
+                # 1. PENDIENTE -> DESPACHADO con compare-and-swap: solo una petición gana
+                if transition(dispatch_note, 'DISPATCHED', ['PENDING']):
+                    # 2. Descontar el stock de todos los productos en un solo lote
+                    #    (si alguno no alcanza no se descuenta ninguno y se revierte el estado)
+                    remove_stock(dispatch_note.items.values_list('product_id', 'quantity'))
                     messages.success(request, f"La Nota de Despacho #{dispatch_note.dispatch_number} ha sido confirmada como 'Despachada'.")
-            except Exception as e:
-                messages.error(request, f"Ocurrió un error al despachar la nota: {e}")
-                
-        else:
-            messages.warning(request, "Esta nota de despacho ya ha sido despachada o cancelada.")
+                else:
+                    messages.warning(request, "Esta nota de despacho ya ha sido despachada o cancelada.")
+        except InsufficientStock as e:
+            for message in e.messages:
+                messages.warning(request, message)
+            messages.error(request, "La nota de despacho no fue despachada por falta de stock.")
+        except Exception as e:
+            messages.error(request, f"Ocurrió un error al despachar la nota: {e}")
     
     return redirect('dispatch_notes:detail', pk=pk)
 
 # Vista para cancelar despacho
+@idempotent('dispatch_notes.cancel')
 def dispatch_note_cancel(request, pk):
     dispatch_note = get_object_or_404(DispatchNote, pk=pk)
     
     if request.method == 'POST':
-        if dispatch_note.status == 'PENDING':
-            dispatch_note.status = 'CANCELLED'
-            dispatch_note.save()
+        if transition(dispatch_note, 'CANCELLED', ['PENDING']):
             messages.success(request, f"Nota de Despacho #{dispatch_note.dispatch_number} cancelada exitosamente.")
         else:
             messages.warning(request, "Solo se pueden cancelar notas de despacho pendientes.")
@@ -366,127 +318,77 @@ def dispatch_note_cancel(request, pk):
     
 # API para búsqueda de productos
 def product_search_api(request):
+    query = request.GET.get('q', '')
+    all_products = request.GET.get('all')
+    mode = 'all' if all_products else 'query' if query else 'none'
+    logger.debug('product_search params', extra={'q': query, 'all': all_products})
+
     try:
-        product_id = request.GET.get('id')
-        query = request.GET.get('q', '')
-        all_products = request.GET.get('all')
-        
-        print(f"DEBUG API: id={product_id}, q={query}, all={all_products}")
-        
-        if all_products:
-            # Devolver todos los productos activos
-            products = Product.objects.filter(is_active=True)[:50]  # Limitar a 50
-            products_data = []
-            for product in products:
-                product_data = {
-                    'id': product.id,
-                    'product_code': getattr(product, 'product_code', ''),
-                    'description': getattr(product, 'description', ''),
-                    'unit_price': float(product.unit_price) if hasattr(product, 'unit_price') and product.unit_price else 0.0,
-                    'current_stock': getattr(product, 'current_stock', 0)
-                }
-                
-                # Campos opcionales
-                if hasattr(product, 'brand'):
-                    product_data['brand'] = product.brand
-                if hasattr(product, 'model'):
-                    product_data['model'] = product.model
-                if hasattr(product, 'category'):
-                    product_data['category'] = str(product.category) if product.category else ''
-                
-                products_data.append(product_data)
-                
-            print(f"DEBUG API: Returning {len(products_data)} products for all=true")
-            return JsonResponse(products_data, safe=False)
-        
-        elif product_id:
-            try:
-                product_id_int = int(product_id)
-                product = Product.objects.filter(pk=product_id_int, is_active=True).first()
-                products_data = []
-                
-                if product:
-                    product_data = {
-                        'id': product.id,
-                        'product_code': getattr(product, 'product_code', ''),
-                        'description': getattr(product, 'description', ''),
-                        'unit_price': float(product.unit_price) if hasattr(product, 'unit_price') and product.unit_price else 0.0,
-                        'current_stock': getattr(product, 'current_stock', 0)
-                    }
-                    
-                    # Campos opcionales
-                    if hasattr(product, 'brand'):
-                        product_data['brand'] = product.brand
-                    if hasattr(product, 'model'):
-                        product_data['model'] = product.model
-                    if hasattr(product, 'category'):
-                        product_data['category'] = str(product.category) if product.category else ''
-                    
-                    products_data.append(product_data)
-                    
-                print(f"Search by ID {product_id_int}: Found {len(products_data)} products")
-                return JsonResponse(products_data, safe=False)
-            except (ValueError, TypeError):
-                # Buscar por código o descripción
-                products = Product.objects.filter(
-                    Q(product_code__iexact=product_id) | Q(description__icontains=product_id),
-                    is_active=True
-                )[:1]
-                products_data = []
-                for product in products:
-                    product_data = {
-                        'id': product.id,
-                        'product_code': getattr(product, 'product_code', ''),
-                        'description': getattr(product, 'description', ''),
-                        'unit_price': float(product.unit_price) if hasattr(product, 'unit_price') and product.unit_price else 0.0,
-                        'current_stock': getattr(product, 'current_stock', 0)
-                    }
-                    
-                    products_data.append(product_data)
-                    
-                return JsonResponse(products_data, safe=False)
-        
-        elif query:
-            # Búsqueda por texto
-            products = Product.objects.filter(
-                Q(product_code__icontains=query) | Q(description__icontains=query),
-                is_active=True
-            )[:10]
-            products_data = []
-            for product in products:
-                product_data = {
-                    'id': product.id,
-                    'product_code': getattr(product, 'product_code', ''),
-                    'description': getattr(product, 'description', ''),
-                    'unit_price': float(product.unit_price) if hasattr(product, 'unit_price') and product.unit_price else 0.0,
-                    'current_stock': getattr(product, 'current_stock', 0)
-                }
-                
-                # Campos opcionales
-                if hasattr(product, 'brand'):
-                    product_data['brand'] = product.brand
-                if hasattr(product, 'model'):
-                    product_data['model'] = product.model
-                if hasattr(product, 'category'):
-                    product_data['category'] = str(product.category) if product.category else ''
-                
-                products_data.append(product_data)
-                
-            print(f"Found {len(products_data)} products for query: {query}")
-            return JsonResponse(products_data, safe=False)
-        
-        else:
-            products_data = []
-            print("No search criteria provided")
-            return JsonResponse(products_data, safe=False)
-            
+        with timed(logger, 'product_search', logging.DEBUG, mode=mode) as fields:
+            products_data = _search_products(query, all_products)
+            fields['count'] = len(products_data)
+        return FastJsonResponse(products_data, safe=False)
     except Exception as e:
-        print(f"ERROR in product_search_api: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return JsonResponse({'error': str(e)}, status=500)
+        return FastJsonResponse({'error': str(e)}, status=500)
+
+
+def _search_products(query, all_products):
+    """Resultados de la búsqueda de productos del formulario de despacho (por id: ``product_lookup``)."""
+    if all_products:
+        # Devolver todos los productos activos
+        products = Product.objects.filter(is_active=True)[:50]  # Limitar a 50
+        products_data = []
+        for product in products:
+            product_data = {
+                'id': product.id,
+                'product_code': getattr(product, 'product_code', ''),
+                'description': getattr(product, 'description', ''),
+                'unit_price': float(product.unit_price) if hasattr(product, 'unit_price') and product.unit_price else 0.0,
+                'current_stock': getattr(product, 'current_stock', 0)
+            }
+            
+            # Campos opcionales
+            if hasattr(product, 'brand'):
+                product_data['brand'] = product.brand
+            if hasattr(product, 'model'):
+                product_data['model'] = product.model
+            if hasattr(product, 'category'):
+                product_data['category'] = str(product.category) if product.category else ''
+            
+            products_data.append(product_data)
+        return products_data
+    
+    elif query:
+        # Búsqueda por texto
+        products = Product.objects.filter(
+            Q(product_code__icontains=query) | Q(description__icontains=query),
+            is_active=True
+        )[:10]
+        products_data = []
+        for product in products:
+            product_data = {
+                'id': product.id,
+                'product_code': getattr(product, 'product_code', ''),
+                'description': getattr(product, 'description', ''),
+                'unit_price': float(product.unit_price) if hasattr(product, 'unit_price') and product.unit_price else 0.0,
+                'current_stock': getattr(product, 'current_stock', 0)
+            }
+            
+            # Campos opcionales
+            if hasattr(product, 'brand'):
+                product_data['brand'] = product.brand
+            if hasattr(product, 'model'):
+                product_data['model'] = product.model
+            if hasattr(product, 'category'):
+                product_data['category'] = str(product.category) if product.category else ''
+            
+            products_data.append(product_data)
+        return products_data
+    
+    return []
 
 # API para obtener datos de cliente
+@conditional_on('inventory.Client', per_user=False)
 def client_data_api(request, client_id):
     try:
         client = get_object_or_404(Client, pk=client_id)
@@ -497,6 +399,6 @@ def client_data_api(request, client_id):
             'email': client.email,
             'address': client.address,
         }
-        return JsonResponse(data)
+        return FastJsonResponse(data)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=404)
\ No newline at end of file
+        return FastJsonResponse({'error': str(e)}, status=404)
\ No newline at end of file
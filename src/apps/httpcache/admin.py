@@ -0,0 +1,8 @@
+# src/apps/httpcache/admin.py
+from django.contrib import admin
+from .models import ModelVersion
+
+@admin.register(ModelVersion)
+class ModelVersionAdmin(admin.ModelAdmin):
+    list_display = ('label', 'version', 'updated_at')
+    readonly_fields = ('label', 'version', 'updated_at')
@@ -0,0 +1,19 @@
+# src/apps/httpcache/apps.py
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+class HttpCacheConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.httpcache'
+    label = 'httpcache'
+    verbose_name = 'Caché HTTP'
+
+    def ready(self):
+        from django.apps import apps
+        from django.conf import settings
+        from .versions import bump_on_change
+
+        for label in settings.HTTP_CACHE_MODELS:
+            model = apps.get_model(label)
+            post_save.connect(bump_on_change, sender=model, dispatch_uid=f'httpcache_save_{label}')
+            post_delete.connect(bump_on_change, sender=model, dispatch_uid=f'httpcache_delete_{label}')
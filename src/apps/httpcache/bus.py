@@ -0,0 +1,180 @@
+# src/apps/httpcache/bus.py
+"""
+Bus de invalidación de las cachés en memoria de cada proceso.
+
+La consulta de productos y la instantánea de stock se guardan por proceso:
+un cambio hecho en otro worker no las invalida. Cada vez que sube la versión
+de un modelo (``versions.bump``, al confirmar la transacción) se publica con
+``pg_notify`` en ``settings.CACHE_BUS_CHANNEL``::
+
+    {"m": "inventory.product", "v": 1234, "ids": [7, 9]}
+
+(sin ``ids``: cualquier instancia del modelo). Solo se publican los modelos
+con manejadores registrados con ``register``. Cada proceso escucha el canal
+con un hilo propio (el de ``PostgresBroker`` del canal de cambios) y llama a
+esos manejadores, que eliminan o marcan para refrescar sus entradas.
+
+Si se pierde una notificación (falla el NOTIFY tras el commit, el hilo está
+reconectando), cada ``CACHE_BUS_POLL_INTERVAL`` segundos el hilo compara las
+versiones de ``ModelVersion`` con las últimas recibidas: un modelo que sigue
+por delante en dos comprobaciones seguidas (en la primera su NOTIFY puede
+estar en camino) se invalida entero. Al conectar y al reconectar también se
+invalida todo.
+
+Con ``CACHE_BUS='local'`` o una base que no es PostgreSQL hay un solo
+proceso: ``LocalBus`` llama a los manejadores al confirmar.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+from apps.changefeed.brokers import PostgresBroker
+
+from . import versions
+from .models import ModelVersion
+
+logger = logging.getLogger(__name__)
+
+# Ids por notificación: mantiene cada carga por debajo del límite de pg_notify
+IDS_CHUNK = 500
+
+_handlers = defaultdict(list)
+
+
+def register(model, handler):
+    """
+    ``handler(ids, version)`` se llama en cada proceso cuando cambia
+    ``model``; ``ids`` es ``None`` si no se sabe qué instancias cambiaron.
+    Corre en el hilo de escucha: debe ser rápido y no consultar la base.
+    """
+    _handlers[versions.model_label(model)].append(handler)
+
+
+def dispatch(label, ids, version):
+    for handler in _handlers.get(label, ()):
+        try:
+            handler(ids, version)
+        except Exception:
+            logger.exception('cache_bus.handler_error', extra={'label': label})
+
+
+class LocalBus:
+    """Un solo proceso: las invalidaciones se aplican directamente."""
+    live = False
+
+    def start(self):
+        pass
+
+    def version(self, label):
+        return None
+
+    def publish(self, label, version, ids=None):
+        if label in _handlers:
+            dispatch(label, ids, version)
+
+
+class PostgresBus(PostgresBroker):
+    """Invalidaciones entre procesos con ``LISTEN``/``NOTIFY``."""
+
+    thread_name = 'cache-bus-listener'
+    log_prefix = 'cache_bus'
+
+    def __init__(self, channel=None):
+        super().__init__(channel or settings.CACHE_BUS_CHANNEL)
+        self.live = False
+        self._versions = {}  # Última versión recibida por etiqueta
+        self._raw = None
+        self._polled_at = 0.0
+        self._ahead = {}  # Versiones de la base por delante de las recibidas en la última comprobación
+
+    @property
+    def idle_timeout(self):
+        return settings.CACHE_BUS_POLL_INTERVAL
+
+    def version(self, label):
+        """Última versión de ``label`` recibida; ``None`` si el hilo no está escuchando."""
+        return self._versions.get(label) if self.live else None
+
+    def publish(self, label, version, ids=None):
+        if label not in _handlers:
+            return
+        if ids is None:
+            chunks = [None]
+        else:
+            ids = sorted(ids)
+            chunks = [ids[start:start + IDS_CHUNK] for start in range(0, len(ids), IDS_CHUNK)] or [[]]
+        with connection.cursor() as cursor:
+            for chunk in chunks:
+                message = {'m': label, 'v': version}
+                if chunk is not None:
+                    message['ids'] = chunk
+                cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps(message, separators=(',', ':'))])
+
+    def fan_out(self, event):
+        label, version = event['m'], event['v']
+        if version > self._versions.get(label, 0):
+            self._versions[label] = version
+        dispatch(label, event.get('ids'), version)
+        # Con el canal siempre ocupado nunca se llega a on_idle
+        if time.monotonic() - self._polled_at >= self.idle_timeout:
+            self.on_idle(self._raw)
+
+    # --- hilo de escucha ------------------------------------------------
+
+    def on_listen(self, raw, reconnect):
+        # Lo cacheado antes de escuchar pudo cambiar sin aviso
+        self._raw = raw
+        for label, version in self._poll().items():
+            self._versions[label] = version
+            dispatch(label, None, version)
+        self.live = True
+
+    def on_idle(self, raw):
+        ahead = {}
+        for label, version in self._poll().items():
+            if version <= self._versions.get(label, 0):
+                continue
+            if label in self._ahead and self._ahead[label] > self._versions.get(label, 0):
+                logger.warning('cache_bus.missed', extra={'label': label, 'version': version})
+                self._versions[label] = version
+                dispatch(label, None, version)
+            else:
+                ahead[label] = version
+        self._ahead = ahead
+
+    def on_disconnect(self):
+        self.live = False
+        self._raw = None
+
+    def _poll(self):
+        labels = list(_handlers)
+        current = dict.fromkeys(labels, 0)
+        self._polled_at = time.monotonic()
+        with self._raw.cursor() as cursor:
+            cursor.execute(
+                f'SELECT label, version FROM {ModelVersion._meta.db_table} WHERE label = ANY(%s)', [labels],
+            )
+            current.update(cursor.fetchall())
+        return current
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """Bus del proceso según ``settings.CACHE_BUS`` (``'postgres'`` o ``'local'``)."""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                if settings.CACHE_BUS == 'postgres' and connection.vendor == 'postgresql':
+                    _bus = PostgresBus()
+                else:
+                    _bus = LocalBus()
+    return _bus
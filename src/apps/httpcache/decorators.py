@@ -0,0 +1,79 @@
+# src/apps/httpcache/decorators.py
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .versions import get_versions, model_label
+
+
+def _validators(request, labels, per_user):
+    """ETag y Last-Modified de la petición, calculados una sola vez con una consulta."""
+    cached = getattr(request, '_httpcache_validators', None)
+    if cached is not None:
+        return cached
+
+    versions = get_versions(labels)
+    parts = [settings.HTTP_CACHE_RELEASE, request.get_full_path()]
+    parts += [f'{label}:{versions[label][0]}' for label in labels]
+    if per_user:
+        # El HTML incluye el usuario, el token CSRF y los mensajes pendientes
+        parts += [
+            str(request.user.pk),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+            request.COOKIES.get('messages', ''),
+        ]
+    etag = f'"{hashlib.md5("|".join(parts).encode()).hexdigest()}"'
+
+    # Last-Modified solo para contenido igual para todos los usuarios
+    changes = [updated_at for _, updated_at in versions.values() if updated_at]
+    last_modified = max(changes) if changes and not per_user else None
+
+    request._httpcache_validators = (etag, last_modified)
+    return request._httpcache_validators
+
+
+def conditional_on(*models, per_user=True):
+    """
+    GET condicional según las versiones de ``models`` (clases o etiquetas
+    ``'app.Model'``): si el cliente envía el ETag vigente se responde 304 sin
+    ejecutar la vista. El navegador revalida en cada uso (``no-cache``).
+
+    ``per_user=False`` para respuestas iguales para todos los usuarios
+    autenticados (las APIs JSON de stock); añade ``Last-Modified``.
+    """
+    labels = sorted(model_label(model) for model in models)
+
+    def decorator(view):
+        def etag_func(request, *args, **kwargs):
+            return _validators(request, labels, per_user)[0]
+
+        def last_modified_func(request, *args, **kwargs):
+            return _validators(request, labels, per_user)[1]
+
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+class ConditionalMixin:
+    """
+    Versión para vistas basadas en clases; va después de ``LoginRequiredMixin``
+    para que la autenticación se compruebe antes de responder 304.
+    """
+    cache_models = ()
+    cache_per_user = True
+
+    def dispatch(self, request, *args, **kwargs):
+        view = conditional_on(*self.cache_models, per_user=self.cache_per_user)(super().dispatch)
+        return view(request, *args, **kwargs)
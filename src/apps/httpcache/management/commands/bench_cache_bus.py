@@ -0,0 +1,113 @@
+# apps/httpcache/management/commands/bench_cache_bus.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.httpcache.bus import PostgresBus
+from apps.httpcache.versions import bump, get_versions, model_label
+from apps.inventory.models import Product
+
+# Canal sin publicaciones: los oyentes solo se enteran por el sondeo de versiones
+SILENT_CHANNEL = 'cache_bus_bench_silent'
+
+
+class BenchBus(PostgresBus):
+    """Oyente que anota cuándo recibe cada versión nueva."""
+
+    def __init__(self, channel, poll_interval):
+        super().__init__(channel)
+        self.label = model_label(Product)
+        self.poll_interval = poll_interval
+        self.arrivals = []
+
+    @property
+    def idle_timeout(self):
+        return self.poll_interval
+
+    def fan_out(self, event):
+        super().fan_out(event)
+        self._arrived()
+
+    def on_idle(self, raw):
+        super().on_idle(raw)
+        self._arrived()
+
+    def _arrived(self):
+        version = self._versions.get(self.label, 0)
+        if not self.arrivals or version > self.arrivals[-1][0]:
+            self.arrivals.append((version, time.perf_counter()))
+
+    def seen_at(self, version):
+        return next((at for seen, at in self.arrivals if seen >= version), None)
+
+
+class Command(BaseCommand):
+    help = (
+        'Latencia de coherencia de las cachés en memoria entre procesos: tiempo desde el commit de un '
+        'cambio de producto hasta que lo recibe cada oyente, con el bus (LISTEN/NOTIFY) y solo con el '
+        'sondeo de versiones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listeners', type=int, default=4, help='Oyentes (uno por worker simulado)')
+        parser.add_argument('--changes', type=int, default=50, help='Cambios medidos con NOTIFY')
+        parser.add_argument('--poll-changes', type=int, default=5, help='Cambios medidos solo con sondeo')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Segundos entre sondeos de versiones')
+        parser.add_argument('--timeout', type=float, default=10, help='Espera máxima por cambio')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El bus de invalidación necesita PostgreSQL.')
+        product = Product.objects.order_by('pk').first()
+        if product is None:
+            raise CommandError('No hay productos.')
+
+        self.stdout.write(f"{options['listeners']} oyentes, sondeo cada {options['poll_interval']:g} s")
+        self.stdout.write(f"{'modo':<10} {'cambios':>8} {'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9}")
+        for mode, channel, changes in (
+            ('NOTIFY', None, options['changes']),
+            ('sondeo', SILENT_CHANNEL, options['poll_changes']),
+        ):
+            listeners = self._start(channel, options)
+            latencies = []
+            for _ in range(changes):
+                latencies += self._change(product, listeners, options['timeout'])
+            latencies.sort()
+            self.stdout.write(
+                f'{mode:<10} {changes:8} {statistics.median(latencies):9.2f} '
+                f'{latencies[int(len(latencies) * 0.95) - 1]:9.2f} {latencies[-1]:9.2f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Latencia desde el commit hasta que cada oyente invalida su copia; '
+            'sin NOTIFY, hasta dos sondeos por cambio'
+        ))
+
+    def _start(self, channel, options):
+        listeners = [BenchBus(channel, options['poll_interval']) for _ in range(options['listeners'])]
+        for listener in listeners:
+            listener.start()
+        deadline = time.monotonic() + options['timeout']
+        while not all(listener.live for listener in listeners):
+            if time.monotonic() > deadline:
+                raise CommandError('Los oyentes no llegaron a conectarse.')
+            time.sleep(0.01)
+        return listeners
+
+    def _change(self, product, listeners, timeout):
+        label = model_label(Product)
+        # El NOTIFY sale al confirmar, dentro del bloque: se mide desde antes del commit
+        started = time.perf_counter()
+        with transaction.atomic():
+            bump(Product, ids=[product.pk])
+        version = get_versions([label])[label][0]
+
+        deadline = started + timeout
+        while True:
+            arrivals = [listener.seen_at(version) for listener in listeners]
+            if all(at is not None for at in arrivals):
+                return [(at - started) * 1000 for at in arrivals]
+            if time.perf_counter() > deadline:
+                raise CommandError(f'Algún oyente no recibió la versión {version} en {timeout:g} s.')
+            time.sleep(0.0005)
@@ -0,0 +1,85 @@
+# apps/httpcache/management/commands/bench_json.py
+import itertools
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from apps.inventory.models import Product
+from apps.inventory.serializers import ProductSerializer
+from apps.movements.models import Movement
+from apps.movements.serializers import MovementSerializer
+from core import json as fast_json
+from core.renderers import ORJSONRenderer
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de serialización JSON: JSONRenderer de DRF y JsonResponse (DjangoJSONEncoder) '
+        'frente a core.renderers.ORJSONRenderer y core.json (orjson), con los listados de la API'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Filas por respuesta (se repiten si faltan)')
+        parser.add_argument('--repeat', type=int, default=20, help='Codificaciones por caso')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        products = self._fill(list(Product.objects.order_by('pk')[:rows]), rows)
+        if not products:
+            raise CommandError('No hay productos para serializar.')
+        movements = self._fill(list(Movement.objects.order_by('-date')[:rows]), rows)
+
+        started = time.perf_counter()
+        product_data = ProductSerializer(products, many=True).data
+        serializer_ms = (time.perf_counter() - started) * 1000
+        cases = [
+            # (nombre, datos, codificador actual, codificador orjson)
+            ('stock (instantánea)', [
+                {'id': p.pk, 'product_code': p.product_code, 'current_stock': p.current_stock,
+                 'min_stock': p.min_stock, 'status': 'OK' if p.current_stock > p.min_stock else 'LOW STOCK'}
+                for p in products
+            ], self._stdlib_compact, fast_json.dumps),
+            ('alertas (DRF)', product_data, JSONRenderer().render, ORJSONRenderer().render),
+            ('búsqueda (JsonResponse)', [
+                {'id': p.pk, 'product_code': p.product_code, 'description': p.description,
+                 'unit_price': p.unit_price, 'current_stock': p.current_stock, 'updated_at': p.updated_at}
+                for p in products
+            ], self._django_encoder, fast_json.dumps),
+        ]
+        if movements:
+            cases.append(('movimientos (DRF)', MovementSerializer(movements, many=True).data,
+                          JSONRenderer().render, ORJSONRenderer().render))
+
+        self.stdout.write(
+            f"{rows} filas, {options['repeat']} repeticiones; ProductSerializer: {serializer_ms:.1f} ms"
+        )
+        self.stdout.write(f"{'caso':<26} {'KB':>8} {'actual ms':>10} {'orjson ms':>10} {'x':>6}")
+        for name, data, current, fast in cases:
+            current_body, current_ms = self._time(current, data, options['repeat'])
+            fast_body, fast_ms = self._time(fast, data, options['repeat'])
+            if json.loads(current_body) != json.loads(fast_body):
+                raise CommandError(f'{name}: la salida de orjson no coincide con la actual')
+            self.stdout.write(
+                f'{name:<26} {len(fast_body) / 1024:8.1f} {current_ms:10.2f} {fast_ms:10.2f} {current_ms / fast_ms:6.1f}'
+            )
+        self.stdout.write(self.style.SUCCESS('Salidas equivalentes en todos los casos'))
+
+    def _fill(self, objects, rows):
+        return list(itertools.islice(itertools.cycle(objects), rows)) if objects else []
+
+    def _stdlib_compact(self, data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+    def _django_encoder(self, data):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+    def _time(self, encode, data, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = encode(data)
+            timings.append(time.perf_counter() - started)
+        return body, statistics.median(timings) * 1000
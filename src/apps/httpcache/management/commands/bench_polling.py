@@ -0,0 +1,74 @@
+# apps/httpcache/management/commands/bench_polling.py
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+DEFAULT_URLS = [
+    '/api/inventario/stock/',
+    '/api/inventario/alertas-stock/',
+    '/inventario/',
+    '/notas-despacho/',
+    '/cotizaciones/',
+    '/pedidos/',
+]
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de sondeo: pide cada URL repetidamente sin validadores (antes) y con '
+        'If-None-Match/If-Modified-Since (después) y compara latencia y consultas por petición'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', help=f'URLs a sondear (por defecto: {", ".join(DEFAULT_URLS)})')
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones por URL y modo')
+        parser.add_argument('--user', help='Usuario con el que se autentican las peticiones (por defecto, el primer superusuario)')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('No hay un usuario para autenticar las peticiones; use --user.')
+
+        client = Client()
+        client.force_login(user)
+        count = options['requests']
+
+        self.stdout.write(f'{"URL":<36} {"modo":<10} {"estado":>6} {"ms/pet":>8} {"p95 ms":>8} {"consultas":>10} {"bytes":>8}')
+        for url in options['urls'] or DEFAULT_URLS:
+            first = client.get(url)
+            if first.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'{url:<36} omitida: respuesta {first.status_code}'))
+                continue
+            validators = {}
+            if first.has_header('ETag'):
+                validators['HTTP_IF_NONE_MATCH'] = first['ETag']
+            if first.has_header('Last-Modified'):
+                validators['HTTP_IF_MODIFIED_SINCE'] = first['Last-Modified']
+            if not validators:
+                self.stdout.write(self.style.WARNING(f'{url:<36} sin ETag ni Last-Modified'))
+
+            for mode, headers in (('completa', {}), ('condicional', validators)):
+                timings, queries, statuses, size = [], 0, set(), 0
+                for _ in range(count):
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = client.get(url, **headers)
+                        timings.append((time.perf_counter() - started) * 1000)
+                    queries += len(captured.captured_queries)
+                    statuses.add(response.status_code)
+                    size = len(response.content)
+
+                p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+                self.stdout.write(
+                    f'{url:<36} {mode:<10} {"/".join(map(str, sorted(statuses))):>6} '
+                    f'{statistics.mean(timings):>8.2f} {p95:>8.2f} {queries / count:>10.1f} {size:>8}'
+                )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark de sondeo finalizado.'))
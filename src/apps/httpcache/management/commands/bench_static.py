@@ -0,0 +1,112 @@
+# apps/httpcache/management/commands/bench_static.py
+import gzip
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STYLESHEET = re.compile(r'<link\b[^>]*rel=["\']stylesheet["\'][^>]*>', re.I)
+SCRIPT = re.compile(r'<script\b[^>]*\bsrc=["\']([^"\']+)["\'][^>]*>', re.I)
+HREF = re.compile(r'href=["\']([^"\']+)["\']', re.I)
+
+class Command(BaseCommand):
+    help = (
+        'Bytes transferidos y tiempo estimado hasta el primer renderizado de las páginas principales: '
+        'HTML, hojas de estilo y scripts sin comprimir, con gzip y con brotli, y dependencias de CDN'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', default='/accounts/login/,/inventario/dashboard/,/notas-despacho/,/panel/',
+                            help='Rutas separadas por comas')
+        parser.add_argument('--user', default='', help='Usuario de la sesión (por defecto, el primero activo)')
+        parser.add_argument('--rtt-ms', type=float, default=80, help='Latencia de ida y vuelta supuesta')
+        parser.add_argument('--bandwidth-kbps', type=float, default=4000, help='Ancho de banda supuesto')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.get(username=options['user']) if options['user'] else users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No hay usuarios activos para la sesión.')
+        client = Client(HTTP_HOST=next((h for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost'))
+        client.force_login(user)
+        self._sizes = {}
+
+        header = f"{'página':<26} {'HTML ms':>8} {'sin comprimir':>14} {'gzip':>10} {'brotli':>10} {'CDN':>5} {'render est.':>16}"
+        self.stdout.write(header)
+        for path in options['paths'].split(','):
+            started = time.perf_counter()
+            response = client.get(path)
+            server_ms = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'{path:<26} respuesta {response.status_code}'))
+                continue
+            html = response.content
+            assets, external = self._blocking_assets(html.decode('utf-8', 'replace'))
+
+            totals = {'raw': len(html), 'gzip': len(gzip.compress(html, 5)),
+                      'br': len(brotli.compress(html)) if brotli else len(gzip.compress(html, 5))}
+            for asset in assets:
+                for encoding, size in self._asset_sizes(asset).items():
+                    totals[encoding] += size
+
+            raw_ms = self._render_ms(server_ms, totals['raw'], external, options)
+            best_ms = self._render_ms(server_ms, totals['br'], external, options)
+            self.stdout.write(
+                f"{path:<26} {server_ms:8.1f} {totals['raw'] / 1024:11.1f} KB {totals['gzip'] / 1024:7.1f} KB "
+                f"{totals['br'] / 1024:7.1f} KB {len(external):5} {raw_ms:6.0f} -> {best_ms:4.0f} ms"
+            )
+            for url in external:
+                self.stdout.write(f'    CDN: {url}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Estimación con RTT {options['rtt_ms']:.0f} ms y {options['bandwidth_kbps']:.0f} kbps: "
+            'HTML + CSS + scripts locales; cada origen externo suma DNS, TCP y TLS (3 RTT), '
+            'sus bytes no se miden'
+        ))
+
+    def _blocking_assets(self, html):
+        """Hojas de estilo y scripts locales (rutas en disco, sin repetir); URLs externas aparte."""
+        urls = [HREF.search(tag).group(1) for tag in STYLESHEET.findall(html) if HREF.search(tag)]
+        urls += SCRIPT.findall(html)
+        local, external = [], []
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.netloc:
+                external.append(url)
+            elif parts.path.startswith(settings.STATIC_URL):
+                path = self._static_file(parts.path[len(settings.STATIC_URL):])
+                if path and path not in local:
+                    local.append(path)
+        return local, external
+
+    def _static_file(self, name):
+        collected = os.path.join(settings.STATIC_ROOT, name)
+        return collected if os.path.isfile(collected) else finders.find(name)
+
+    def _asset_sizes(self, path):
+        """Bytes sin comprimir y con la variante precomprimida (o comprimiendo en el momento)."""
+        if path not in self._sizes:
+            with open(path, 'rb') as f:
+                data = f.read()
+            gz = os.path.getsize(path + '.gz') if os.path.exists(path + '.gz') else len(gzip.compress(data, 5))
+            br = os.path.getsize(path + '.br') if os.path.exists(path + '.br') else (
+                len(brotli.compress(data)) if brotli else gz
+            )
+            self._sizes[path] = {'raw': len(data), 'gzip': min(gz, len(data)), 'br': min(br, len(data))}
+        return self._sizes[path]
+
+    def _render_ms(self, server_ms, size, external, options):
+        transfer_ms = size * 8 / options['bandwidth_kbps']
+        origins = len({urlsplit(url).netloc for url in external})
+        return server_ms + options['rtt_ms'] * (2 + 3 * origins) + transfer_ms
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Modelo')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Versión')),
+                ('updated_at', models.DateTimeField(verbose_name='Último cambio')),
+            ],
+            options={
+                'verbose_name': 'Versión de modelo',
+                'verbose_name_plural': 'Versiones de modelos',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# src/apps/httpcache/models.py
+from django.db import models
+
+class ModelVersion(models.Model):
+    """
+    Contador de cambios de un modelo. Las vistas condicionales derivan su
+    ETag/Last-Modified de estas filas en lugar de consultar los datos.
+    """
+    label = models.CharField(max_length=100, primary_key=True, verbose_name="Modelo")
+    version = models.BigIntegerField(default=0, verbose_name="Versión")
+    updated_at = models.DateTimeField(verbose_name="Último cambio")
+
+    class Meta:
+        verbose_name = "Versión de modelo"
+        verbose_name_plural = "Versiones de modelos"
+
+    def __str__(self):
+        return f'{self.label} v{self.version}'
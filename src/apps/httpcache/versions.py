@@ -0,0 +1,78 @@
+# src/apps/httpcache/versions.py
+"""
+Versiones por modelo para validar cachés HTTP.
+
+Cada modelo de ``settings.HTTP_CACHE_MODELS`` tiene un contador en
+``ModelVersion`` que sube:
+
+* al guardar o eliminar una instancia (señales conectadas en
+  ``HttpCacheConfig.ready``), y
+* en las operaciones por lotes que no disparan señales (servicio de stock,
+  transiciones de estado, guardado de líneas, conversión de cotizaciones),
+  que llaman a ``bump`` explícitamente.
+
+El incremento se aplica al confirmar la transacción: una lectura nunca ve la
+versión nueva antes que los datos nuevos, así que un ETag no puede quedar
+asociado a un contenido anterior al cambio. Después se anuncia en el bus de
+invalidación (``bus``) para las cachés en memoria de los demás procesos.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import bus
+from .models import ModelVersion
+
+
+def model_label(model):
+    """``'app_label.modelname'`` de una clase de modelo, instancia o etiqueta."""
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def _apply(labels, ids=None):
+    table = connection.ops.quote_name(ModelVersion._meta.db_table)
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (label, version, updated_at)
+            VALUES {', '.join(['(%s, 1, %s)'] * len(labels))}
+            ON CONFLICT (label) DO UPDATE
+            SET version = {table}.version + 1, updated_at = EXCLUDED.updated_at
+            RETURNING label, version
+            """,
+            [value for label in labels for value in (label, now)],
+        )
+        rows = cursor.fetchall()
+    invalidation_bus = bus.get_bus()
+    for label, version in rows:
+        invalidation_bus.publish(label, version, ids)
+
+
+def bump(*models, ids=None):
+    """
+    Sube la versión de ``models`` cuando se confirme la transacción actual.
+    ``ids``: claves de las instancias modificadas (con un solo modelo), que
+    viajan en el bus para invalidar solo esas entradas.
+    """
+    labels = sorted({model_label(model) for model in models})
+    if labels:
+        ids = list(ids) if ids is not None else None
+        transaction.on_commit(lambda: _apply(labels, ids))
+
+
+def bump_on_change(sender, instance, **kwargs):
+    """Receptor de ``post_save`` y ``post_delete``."""
+    bump(sender, ids=[instance.pk])
+
+
+def get_versions(labels):
+    """``{label: (versión, último cambio)}``; los modelos sin cambios registrados valen ``(0, None)``."""
+    rows = dict.fromkeys(labels, (0, None))
+    rows.update(
+        (label, (version, updated_at))
+        for label, version, updated_at in ModelVersion.objects.filter(label__in=labels)
+        .values_list('label', 'version', 'updated_at')
+    )
+    return rows
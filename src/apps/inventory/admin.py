@@ -1,6 +1,6 @@
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
-from .models import Client, Supplier, Product, Warehouse
+from .models import Category, Client, Supplier, Product, Warehouse
 from .resources import ProductResource
 
 @admin.register(Client)
@@ -18,6 +18,29 @@ class SupplierAdmin(admin.ModelAdmin):
     list_per_page = 20
     readonly_fields = ('created_at', 'updated_at')
 
+class CategoryListFilter(admin.SimpleListFilter):
+    """Filtro por categoría leído de la dimensión Category, sin DISTINCT sobre los productos."""
+    title = 'categoría'
+    parameter_name = 'category'
+
+    def lookups(self, request, model_admin):
+        return [(name, name) for name in Category.objects.filter(product_count__gt=0).values_list('name', flat=True)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(category=self.value())
+        return queryset
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'product_count', 'stock_units', 'stock_value', 'updated_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'product_count', 'stock_units', 'stock_value', 'updated_at')
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False  # Se crean al guardar productos
+
 @admin.register(Product)
 class ProductAdmin(ImportExportModelAdmin):
     resource_classes = [ProductResource]
@@ -36,7 +59,7 @@ class ProductAdmin(ImportExportModelAdmin):
         'is_active',
         'created_at',
     )
-    list_filter = ('category', 'is_active', 'supplier', 'warehouse')
+    list_filter = (CategoryListFilter, 'is_active', 'supplier', 'warehouse')
     search_fields = ('product_code', 'description')
     list_per_page = 20
 
@@ -12,5 +12,6 @@ urlpatterns = router.urls
 urlpatterns = [
     path('stock/', api_views.StockAPIView.as_view(), name='stock'),
     path('productos/buscar/', api_views.ProductSearchAPI.as_view(), name='product_search'),
+    path('productos/consulta/', api_views.product_lookup, name='product_lookup'),
     path('alertas-stock/', api_views.StockAlertsAPI.as_view(), name='stock_alerts'),
 ] + router.urls
\ No newline at end of file
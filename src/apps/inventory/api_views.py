@@ -6,6 +6,14 @@ from django.db.models import F
 from .models import Product, Supplier, Client, Warehouse
 from .serializers import ProductSerializer, SupplierSerializer, ClientSerializer, WarehouseSerializer
 from django.db.models.functions import Lower
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.decorators import method_decorator
+from apps.httpcache.decorators import conditional_on
+from core.db_router import ReplicaReadMixin
+from core.json import FastJsonResponse
+from .snapshot import get_stock_snapshot
+from .lookup import LOOKUP_FIELDS, MAX_LOOKUP_IDS, get_products, lookup_etag
 
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
@@ -24,21 +32,26 @@ class WarehouseViewSet(viewsets.ModelViewSet):
     serializer_class = WarehouseSerializer
 
 class StockAPIView(views.APIView):
+    """
+    Listado de stock de todos los productos, servido desde la instantánea en
+    memoria del proceso (``apps.inventory.snapshot``) como JSON ya serializado.
+    """
     def get(self, request):
-        products = Product.objects.all().order_by('description')
-        data = [
-            {
-                'product_code': product.product_code,
-                'description': product.description,
-                'current_stock': product.current_stock,
-                'min_stock': product.min_stock,
-                'status': 'OK' if product.current_stock > product.min_stock else 'LOW STOCK'
-            }
-            for product in products
-        ]
-        return Response(data)
+        snapshot = get_stock_snapshot()
+        etag, body = snapshot.current()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                response = HttpResponse(snapshot.gzipped(body), content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
 
-class ProductSearchAPI(views.APIView):
+class ProductSearchAPI(ReplicaReadMixin, views.APIView):
     def get(self, request):
         query = request.query_params.get('q', '')
         if query:
@@ -53,8 +66,51 @@ class ProductSearchAPI(views.APIView):
             data = []
         return Response(data)
 
-class StockAlertsAPI(views.APIView):
+class StockAlertsAPI(ReplicaReadMixin, views.APIView):
+    @method_decorator(conditional_on(Product, per_user=False))
     def get(self, request):
         low_stock_products = Product.objects.filter(current_stock__lte=F('min_stock'))
         serializer = ProductSerializer(low_stock_products, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+def product_lookup(request):
+    """
+    Consulta de productos por id para los formularios:
+    ``?ids=1,2,3&fields=unit_price,current_stock``.
+
+    Responde ``{"products": {id: {...}}, "missing": [ids]}`` desde la caché de
+    ``apps.inventory.lookup`` y admite GET condicional con ETag.
+    """
+    if request.method != 'GET':
+        return FastJsonResponse({'error': 'Método no permitido'}, status=405)
+    if not request.user.is_authenticated:
+        return FastJsonResponse({'error': 'Autenticación requerida'}, status=403)
+
+    try:
+        ids = [int(value) for value in request.GET.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return FastJsonResponse({'error': 'ids debe ser una lista de enteros separados por comas'}, status=400)
+    if not ids:
+        return FastJsonResponse({'error': 'Se requiere el parámetro ids'}, status=400)
+    if len(ids) > MAX_LOOKUP_IDS:
+        return FastJsonResponse({'error': f'Máximo {MAX_LOOKUP_IDS} ids por consulta'}, status=400)
+
+    fields = [name for name in request.GET.get('fields', '').split(',') if name.strip()] or list(LOOKUP_FIELDS)
+    unknown = sorted(set(fields) - set(LOOKUP_FIELDS))
+    if unknown:
+        return FastJsonResponse({'error': f'Campos no disponibles: {", ".join(unknown)}'}, status=400)
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+
+    rows = get_products(ids)
+    etag = lookup_etag(rows, ids, fields)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FastJsonResponse({
+            'products': {pk: {name: row[name] for name in fields} for pk, row in rows.items()},
+            'missing': [pk for pk in ids if pk not in rows],
+        })
+    response['ETag'] = etag
+    # El navegador revalida siempre (el stock cambia), pero sin descargar de nuevo si no cambió
+    response['Cache-Control'] = 'private, no-cache'
+    return response
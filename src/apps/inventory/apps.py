@@ -1,7 +1,28 @@
 # src/apps/inventory/apps.py
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.inventory'  # Full Python path to the app
-    label = 'inventory'  # Optional: explicit label (must be unique)
\ No newline at end of file
+    label = 'inventory'  # Optional: explicit label (must be unique)
+
+    def ready(self):
+        from apps.httpcache import bus
+        from . import categories
+        from .lookup import evict_products, invalidate_product
+        from .models import Product
+        from .snapshot import expire_stock_snapshot
+
+        post_save.connect(invalidate_product, sender=Product, dispatch_uid='product_lookup_save')
+        post_delete.connect(invalidate_product, sender=Product, dispatch_uid='product_lookup_delete')
+
+        # Cachés en memoria de los demás procesos
+        bus.register(Product, evict_products)
+        bus.register(Product, expire_stock_snapshot)
+
+        # Totales de la dimensión Category
+        pre_save.connect(categories.product_pre_save, sender=Product, dispatch_uid='category_pre_save')
+        post_save.connect(categories.product_post_save, sender=Product, dispatch_uid='category_post_save')
+        pre_delete.connect(categories.product_pre_delete, sender=Product, dispatch_uid='category_pre_delete')
+        post_delete.connect(categories.product_post_delete, sender=Product, dispatch_uid='category_post_delete')
@@ -0,0 +1,140 @@
+# src/apps/inventory/categories.py
+"""
+Mantenimiento incremental de ``Category``.
+
+Cada categoría guarda cuántos productos tiene, las unidades en stock y el
+valor del stock (``current_stock * unit_price``). Los totales se ajustan con
+deltas dentro de la misma transacción que el cambio del producto:
+
+* al guardar o eliminar un producto (señales conectadas en
+  ``InventoryConfig.ready``): se resta la fila anterior y se suma la nueva.
+  La fila anterior se lee con ``SELECT ... FOR UPDATE`` dentro de la
+  transacción del guardado (``Product.save`` y ``delete`` son atómicos): un
+  guardado concurrente del mismo producto espera al commit y parte del valor
+  ya guardado, en lugar de restar por segunda vez el mismo valor anterior;
+* en ``adjust_stock``, que mueve stock con SQL directo y no dispara señales:
+  ``apply_stock_deltas`` con las filas que devuelve su ``UPDATE``.
+
+Las operaciones por lotes que no pasan por aquí (``bulk_create``,
+``QuerySet.update``) deben terminar con ``rebuild_categories``; el comando
+``rebuild_categories`` hace lo mismo y sirve para corregir desvíos.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Category, Product
+
+TRACKED_FIELDS = ('category', 'current_stock', 'unit_price')
+
+
+def _apply(deltas):
+    """Suma ``{nombre: [productos, unidades, valor]}`` a las categorías, creándolas si no existen."""
+    rows = [
+        (name, count, units, value)
+        for name, (count, units, value) in sorted(deltas.items())
+        if name and (count or units or value)
+    ]
+    if not rows:
+        return
+    table = connection.ops.quote_name(Category._meta.db_table)
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (name, product_count, stock_units, stock_value, updated_at)
+            VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))}
+            ON CONFLICT (name) DO UPDATE
+            SET product_count = {table}.product_count + EXCLUDED.product_count,
+                stock_units = {table}.stock_units + EXCLUDED.stock_units,
+                stock_value = {table}.stock_value + EXCLUDED.stock_value,
+                updated_at = EXCLUDED.updated_at
+            """,
+            [value for row in rows for value in (*row, now)],
+        )
+
+
+def _add(deltas, row, sign):
+    category, stock, price = row['category'], row['current_stock'] or 0, row['unit_price'] or Decimal('0')
+    totals = deltas[category]
+    totals[0] += sign
+    totals[1] += sign * stock
+    totals[2] += sign * stock * Decimal(str(price))
+
+
+def _stored_row(pk):
+    """Valores persistidos de ``pk``, con la fila bloqueada hasta el fin de la transacción."""
+    return Product.objects.select_for_update().filter(pk=pk).values(*TRACKED_FIELDS).first()
+
+
+def product_pre_save(sender, instance, **kwargs):
+    """Guarda los valores persistidos antes del cambio (una consulta por guardado)."""
+    instance._category_previous = _stored_row(instance.pk) if instance.pk else None
+
+
+def product_post_save(sender, instance, created, update_fields=None, **kwargs):
+    previous = getattr(instance, '_category_previous', None)
+    current = {}
+    for field in TRACKED_FIELDS:
+        # Con update_fields, los campos no guardados conservan el valor persistido
+        if previous is not None and update_fields is not None and field not in update_fields:
+            current[field] = previous[field]
+        else:
+            current[field] = getattr(instance, field)
+
+    deltas = defaultdict(lambda: [0, 0, Decimal('0')])
+    if previous is not None:
+        _add(deltas, previous, -1)
+    _add(deltas, current, 1)
+    _apply(deltas)
+    instance._category_previous = None
+
+
+def product_pre_delete(sender, instance, **kwargs):
+    instance._category_previous = _stored_row(instance.pk)
+
+
+def product_post_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_category_previous', None)
+    if previous is not None:
+        deltas = defaultdict(lambda: [0, 0, Decimal('0')])
+        _add(deltas, previous, -1)
+        _apply(deltas)
+
+
+def apply_stock_deltas(rows, deltas):
+    """
+    Actualiza unidades y valor tras ``adjust_stock``. ``rows``: iterable de
+    ``(product_id, categoría, precio)``; ``deltas``: ``{product_id: delta}``.
+    """
+    totals = defaultdict(lambda: [0, 0, Decimal('0')])
+    for pk, category, price in rows:
+        totals[category][1] += deltas[pk]
+        totals[category][2] += deltas[pk] * Decimal(str(price))
+    _apply(totals)
+
+
+def rebuild_categories():
+    """Recalcula todas las categorías desde los productos (un recorrido completo)."""
+    rows = (
+        Product.objects.exclude(category='')
+        .values('category')
+        .annotate(
+            count=Count('pk'),
+            units=Sum('current_stock'),
+            value=Sum(F('current_stock') * F('unit_price')),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        Category.objects.all().delete()
+        Category.objects.bulk_create([
+            Category(
+                name=row['category'], product_count=row['count'],
+                stock_units=row['units'] or 0, stock_value=row['value'] or 0,
+            )
+            for row in rows
+        ])
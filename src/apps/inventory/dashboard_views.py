@@ -4,7 +4,9 @@ from apps.reception_notes.models import ReceptionNote
 from apps.dispatch_notes.models import DispatchNote
 from apps.returns.models import ReturnNote
 from apps.inventory.models import Product
+from core.db_router import replica_reads
 
+@replica_reads
 @login_required
 def custom_dashboard(request):
     pending_receptions = ReceptionNote.objects.filter(status='PENDING').count()
@@ -0,0 +1,212 @@
+# src/apps/inventory/formsets.py
+"""
+Formsets de líneas de documento (despacho, recepción, orden, cotización)
+con resolución y guardado por lotes.
+
+``BatchedInlineFormSet`` reemplaza el comportamiento por línea de los
+formsets de Django:
+
+* todos los ``product`` enviados se resuelven con un único ``in_bulk``
+  (en lugar de un ``SELECT`` por línea en ``ModelChoiceField.to_python`` y
+  otro en la validación del modelo; ver ``BatchedLineForm``),
+* el campo oculto ``id`` de las líneas existentes se resuelve contra las
+  líneas ya cargadas,
+* las opciones del ``<select>`` de productos se consultan una sola vez para
+  todo el formset,
+* la disponibilidad de stock (opcional) se valida agregando las cantidades
+  por producto sobre los productos ya cargados,
+* ``save_lines`` inserta las líneas nuevas con ``bulk_create``, actualiza
+  las modificadas con ``bulk_update``, borra las eliminadas con un solo
+  ``DELETE`` y calcula el total del documento en memoria.
+
+Las líneas se guardan sin pasar por ``save()`` de cada modelo, así que los
+subtotales y el total se calculan aquí.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet, InlineForeignKeyField
+
+from apps.httpcache.versions import bump
+
+from .models import Product
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """``ModelChoiceField`` que toma el objeto de un diccionario precargado por el formset."""
+    prefetched = None
+
+    def to_python(self, value):
+        if self.prefetched is None or value in self.empty_values:
+            return super().to_python(value)
+        try:
+            obj = self.prefetched.get(int(value))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+            )
+        return obj
+
+
+class BatchedLineForm(forms.ModelForm):
+    """
+    Base de los formularios de línea. Evita que ``full_clean`` del modelo
+    vuelva a comprobar con un ``SELECT`` por línea que existen el producto
+    (ya resuelto en lote por el formset) y el documento padre.
+    """
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        for name, field in self.fields.items():
+            if isinstance(field, InlineForeignKeyField) or getattr(field, 'prefetched', None) is not None:
+                exclude.add(name)
+        return exclude
+
+
+class BatchedInlineFormSet(BaseInlineFormSet):
+    product_field = 'product'
+    price_field = 'unit_price'
+    quantity_field = 'quantity'
+    subtotal_field = 'subtotal'
+    total_field = 'total'
+    # Si es True, la suma de cantidades por producto no puede superar el stock actual
+    check_stock = False
+    # Si la línea no trae precio se usa el precio del producto
+    default_price_from_product = False
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset().select_related(self.product_field)
+        return self._queryset
+
+    @property
+    def products(self):
+        """``{id: Product}`` de todos los productos enviados, resueltos en una consulta."""
+        if not hasattr(self, '_products'):
+            ids = set()
+            if self.is_bound:
+                for i in range(self.total_form_count()):
+                    value = self.data.get(f'{self.add_prefix(i)}-{self.product_field}')
+                    try:
+                        ids.add(int(value))
+                    except (TypeError, ValueError):
+                        continue
+            self._products = Product.objects.in_bulk(ids) if ids else {}
+        return self._products
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # El campo oculto ``id`` también haría un SELECT por línea al validar:
+        # se resuelve contra las líneas existentes, ya cargadas por el formset
+        pk_name = self._pk_field.name
+        field = form.fields.get(pk_name)
+        if self.is_bound and type(field) is forms.ModelChoiceField:
+            if not hasattr(self, '_object_dict'):
+                self._object_dict = {obj.pk: obj for obj in self.get_queryset()}
+            prefetched = PrefetchedModelChoiceField(
+                field.queryset, initial=field.initial, required=False, widget=field.widget,
+            )
+            prefetched.prefetched = self._object_dict
+            form.fields[pk_name] = prefetched
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        field = form.fields.get(self.product_field)
+        if field is None:
+            return form
+        if self.is_bound and isinstance(field, PrefetchedModelChoiceField):
+            field.prefetched = self.products
+        if not isinstance(field.widget, forms.HiddenInput):
+            # Las opciones del <select> se consultan una vez para todo el formset
+            if not hasattr(self, '_product_choices'):
+                self._product_choices = list(field.choices)
+            field.choices = self._product_choices
+        return form
+
+    def clean(self):
+        super().clean()
+        if self.check_stock:
+            self.validate_stock()
+
+    def _kept_forms(self):
+        """Formularios válidos con producto que no están marcados para eliminar."""
+        for form in self.forms:
+            if not hasattr(form, 'cleaned_data') or not form.cleaned_data:
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                continue
+            if form.cleaned_data.get(self.product_field):
+                yield form
+
+    def validate_stock(self):
+        """Valida el stock agregando las cantidades de todas las líneas por producto."""
+        demand = defaultdict(int)
+        forms_by_product = defaultdict(list)
+        for form in self._kept_forms():
+            product = form.cleaned_data[self.product_field]
+            demand[product.pk] += form.cleaned_data.get(self.quantity_field) or 0
+            forms_by_product[product.pk].append(form)
+
+        for product_id, requested in demand.items():
+            product = forms_by_product[product_id][0].cleaned_data[self.product_field]
+            if requested > product.current_stock:
+                message = f'Stock insuficiente. Disponible: {product.current_stock}, Solicitado: {requested}'
+                for form in forms_by_product[product_id]:
+                    form.add_error(self.quantity_field, message)
+
+    def save_lines(self, document):
+        """
+        Guarda las líneas del formset para ``document`` en lote y actualiza su
+        total. Devuelve ``(creadas, actualizadas, total)``.
+        """
+        fk_name = self.fk.name
+        model = self.model
+        model_fields = {field.name for field in model._meta.concrete_fields}
+        created, updated, deleted_ids = [], [], []
+        total = Decimal('0')
+
+        for form in self.forms:
+            if not hasattr(form, 'cleaned_data'):
+                continue
+            instance = form.instance
+            if self.can_delete and self._should_delete_form(form):
+                if instance.pk:
+                    deleted_ids.append(instance.pk)
+                continue
+            product = form.cleaned_data.get(self.product_field)
+            if product is None:
+                continue
+
+            setattr(instance, fk_name, document)
+            price = getattr(instance, self.price_field)
+            if not price and self.default_price_from_product:
+                price = product.unit_price or 0
+                setattr(instance, self.price_field, price)
+            subtotal = getattr(instance, self.quantity_field) * (price or 0)
+            # Se actualizan solo las líneas con cambios en el modelo o un subtotal desactualizado
+            stale = getattr(instance, self.subtotal_field) != subtotal
+            setattr(instance, self.subtotal_field, subtotal)
+            total += subtotal
+
+            if instance.pk is None:
+                created.append(instance)
+            elif stale or model_fields.intersection(form.changed_data):
+                updated.append(instance)
+
+        if deleted_ids:
+            model.objects.filter(pk__in=deleted_ids).delete()
+        if updated:
+            fields = [name for name in self.form._meta.fields if name in model_fields]
+            model.objects.bulk_update(updated, fields + [self.subtotal_field], batch_size=500)
+        if created:
+            model.objects.bulk_create(created, batch_size=500)
+
+        type(document).objects.filter(pk=document.pk).update(**{self.total_field: total})
+        bump(document)
+        setattr(document, self.total_field, total)
+        self.new_objects, self.changed_objects = created, updated
+        return created, updated, total
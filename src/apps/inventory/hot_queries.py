@@ -0,0 +1,31 @@
+# src/apps/inventory/hot_queries.py
+from django.db.models import F
+from django.db.models.functions import Lower
+
+from core.hot_queries import register
+from .models import Product
+
+
+@register('inventory.product_list')
+def product_list():
+    return Product.objects.order_by(Lower('description'))[:25]
+
+
+@register('inventory.product_list_by_category')
+def product_list_by_category():
+    return Product.objects.filter(category='GENERAL').order_by(Lower('description'))[:25]
+
+
+@register('inventory.low_stock')
+def low_stock():
+    return Product.objects.filter(current_stock__lte=F('min_stock'), current_stock__gt=0)
+
+
+@register('inventory.out_of_stock')
+def out_of_stock():
+    return Product.objects.filter(current_stock=0)[:10]
+
+
+@register('inventory.active_products')
+def active_products():
+    return Product.objects.filter(is_active=True)[:50]
@@ -0,0 +1,99 @@
+# src/apps/inventory/lookup.py
+"""
+Consulta de productos por id para los formularios (precio, stock, ubicación).
+
+Cada producto se guarda en caché como el diccionario de ``.values()`` con
+``LOOKUP_FIELDS``, sin instanciar modelos. ``get_products`` resuelve un lote
+de ids con un ``get_many`` y una sola consulta para los que faltan.
+
+La entrada de un producto se invalida al guardarlo o eliminarlo (señales
+conectadas en ``InventoryConfig.ready``) y cuando el servicio de stock
+modifica su existencia (``apps.inventory.stock.adjust_stock``). Con la caché
+por proceso (la ``LocMemCache`` por defecto), los demás procesos se enteran
+por el bus de invalidación (``evict_products``).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.httpcache.bus import get_bus
+
+from .models import Product
+
+LOOKUP_FIELDS = (
+    'id', 'product_code', 'description', 'unit', 'unit_price', 'current_stock',
+    'min_stock', 'max_stock', 'location', 'category', 'is_active', 'updated_at',
+)
+MAX_LOOKUP_IDS = 500
+
+
+# Sube cuando el bus pide invalidar todos los productos: las claves anteriores dejan de leerse
+_generation = 0
+
+
+def _cache_key(product_id):
+    return f'product:lookup:{_generation}:{product_id}'
+
+
+def get_products(ids):
+    """Devuelve ``{id: fila}`` para los ids existentes (los inexistentes se omiten)."""
+    get_bus().start()
+    ids = list(dict.fromkeys(ids))
+    cached = cache.get_many([_cache_key(pk) for pk in ids])
+    rows = {}
+    missing = []
+    for pk in ids:
+        row = cached.get(_cache_key(pk))
+        if row is None:
+            missing.append(pk)
+        elif row:
+            rows[pk] = row
+
+    if missing:
+        fetched = {row['id']: row for row in Product.objects.filter(pk__in=missing).values(*LOOKUP_FIELDS)}
+        # Los ids inexistentes también se cachean (como False) hasta que se cree el producto
+        cache.set_many(
+            {_cache_key(pk): fetched.get(pk, False) for pk in missing},
+            timeout=settings.PRODUCT_LOOKUP_CACHE_TIMEOUT,
+        )
+        rows.update(fetched)
+
+    return {pk: rows[pk] for pk in ids if pk in rows}
+
+
+def lookup_etag(rows, ids, fields):
+    """ETag del resultado: cambia si cambia ``updated_at`` de algún producto o la proyección."""
+    digest = hashlib.md5(','.join(fields).encode())
+    for pk in ids:
+        row = rows.get(pk)
+        digest.update(f'|{pk}:{row["updated_at"].isoformat() if row else "-"}'.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def invalidate_products(ids):
+    """
+    Borra de la caché las entradas de ``ids``. Se repite al confirmar la
+    transacción para que una lectura concurrente no deje cacheado el valor
+    anterior al cambio.
+    """
+    keys = [_cache_key(pk) for pk in ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_product(sender, instance, **kwargs):
+    """Receptor de ``post_save`` y ``post_delete`` de ``Product``."""
+    invalidate_products([instance.pk])
+
+
+def evict_products(ids, version):
+    """Manejador del bus de invalidación para ``inventory.Product``."""
+    global _generation
+    if ids is None:
+        _generation += 1
+    else:
+        cache.delete_many([_cache_key(pk) for pk in ids])
@@ -0,0 +1,55 @@
+# apps/inventory/management/commands/bench_stock_snapshot.py
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.inventory.models import Product
+from apps.inventory.snapshot import StockSnapshot
+from apps.inventory.stock import add_stock
+
+class Command(BaseCommand):
+    help = (
+        'Mide la instantánea de stock con los productos existentes: construcción completa, '
+        'memoria, refresco incremental tras cambios de stock y compresión gzip'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--changes', type=int, default=100, help='Productos a modificar para el refresco incremental')
+
+    def handle(self, *args, **options):
+        snapshot = StockSnapshot()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        snapshot.refresh(force=True)
+        build = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'Construcción: {len(snapshot)} productos en {build:.2f}s, '
+            f'{len(snapshot.body) / 1e6:.1f} MB de JSON, pico de memoria {peak / 1e6:.1f} MB'
+        )
+
+        started = time.perf_counter()
+        compressed = snapshot.gzipped(snapshot.body)
+        self.stdout.write(f'gzip: {len(compressed) / 1e6:.1f} MB en {time.perf_counter() - started:.2f}s')
+
+        ids = list(Product.objects.order_by('?').values_list('pk', flat=True)[:options['changes']])
+        if ids:
+            # Los cambios se revierten al final: no alteran el stock real
+            with transaction.atomic():
+                add_stock((pk, 1) for pk in ids)
+                started = time.perf_counter()
+                snapshot._apply_changes()
+                incremental = time.perf_counter() - started
+                transaction.set_rollback(True)
+            self.stdout.write(f'Refresco incremental ({len(ids)} productos): {incremental * 1000:.1f} ms')
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            snapshot.refresh()
+            snapshot.current()
+        self.stdout.write(f'Servir desde memoria: {(time.perf_counter() - started):.3f} ms por petición')
+        self.stdout.write(self.style.SUCCESS('Benchmark de instantánea finalizado.'))
@@ -0,0 +1,82 @@
+# apps/inventory/management/commands/explain_hot_queries.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.hot_queries import get_hot_queries
+
+class Command(BaseCommand):
+    help = 'Ejecuta EXPLAIN sobre las consultas críticas registradas y señala los escaneos secuenciales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Prefijos de las consultas a revisar (por defecto todas)')
+        parser.add_argument('--analyze', action='store_true', help='Usar EXPLAIN ANALYZE (ejecuta la consulta)')
+        parser.add_argument(
+            '--min-rows', type=int, default=10000,
+            help='Ignorar escaneos secuenciales sobre tablas con menos filas estimadas',
+        )
+        parser.add_argument('--verbose-plan', action='store_true', help='Mostrar el plan completo')
+        parser.add_argument('--fail', action='store_true', help='Terminar con error si hay escaneos señalados')
+
+    def handle(self, *args, **options):
+        queries = get_hot_queries()
+        if options['names']:
+            queries = {
+                name: func for name, func in queries.items()
+                if any(name.startswith(prefix) for prefix in options['names'])
+            }
+
+        flagged = 0
+        for name, func in queries.items():
+            queryset = func()
+            if connection.vendor == 'postgresql':
+                plan, scans = self.explain_postgresql(queryset, options)
+            else:
+                plan, scans = self.explain_generic(queryset, options)
+
+            if scans:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f'[SEQ SCAN] {name}: {", ".join(scans)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'[OK]       {name}'))
+            if options['verbose_plan']:
+                self.stdout.write(plan)
+
+        summary = f'{len(queries)} consultas revisadas, {flagged} con escaneos secuenciales.'
+        if flagged and options['fail']:
+            raise CommandError(summary)
+        self.stdout.write(summary)
+
+    def explain_postgresql(self, queryset, options):
+        raw = queryset.explain(format='json', analyze=options['analyze'])
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        relations = []
+        self.collect_seq_scans(plan[0]['Plan'], relations)
+
+        scans = []
+        for relation in sorted(set(relations)):
+            if self.estimated_rows(relation) >= options['min_rows']:
+                scans.append(relation)
+        return json.dumps(plan, indent=2), scans
+
+    def collect_seq_scans(self, node, relations):
+        if node.get('Node Type') == 'Seq Scan':
+            relations.append(node['Relation Name'])
+        for child in node.get('Plans', []):
+            self.collect_seq_scans(child, relations)
+
+    def estimated_rows(self, relation):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [relation])
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def explain_generic(self, queryset, options):
+        # SQLite y otros: el plan es texto; "SCAN tabla" sin índice equivale a un escaneo completo
+        plan = queryset.explain()
+        scans = [
+            line.strip() for line in plan.splitlines()
+            if 'SCAN ' in line and 'USING' not in line
+        ]
+        return plan, scans
@@ -1,10 +1,542 @@
 # apps/inventory/management/commands/populate_products.py
-from django.core.management.base import BaseCommand
-from apps.inventory.models import Product, Supplier, Warehouse
+import datetime
+import io
+import itertools
+import math
+import random
+import time
+from array import array
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.dispatch_notes.models import DispatchItem, DispatchNote
+from apps.httpcache.versions import bump
+from apps.inventory.categories import rebuild_categories
+from apps.inventory.models import Client, Product, Supplier, Warehouse
+from apps.movements.models import Movement
+from apps.movements.partitions import add_months, create_partition, is_partitioned, month_start
+from apps.orders.models import Order, OrderItem
+from apps.quotations.models import Quotation, QuotationItem
+from apps.reception_notes.models import ReceptionItem, ReceptionNote
+from apps.returns.models import ReturnItem, ReturnNote
+
+# Volúmenes de --production
+PRODUCTION = {
+    'products': 1_000_000, 'movements': 10_000_000, 'documents': 500_000,
+    'suppliers': 5_000, 'clients': 50_000, 'warehouses': 20, 'users': 50,
+}
+
+CATEGORIES = [
+    'Ferretería', 'Electricidad', 'Plomería', 'Pinturas', 'Herramientas', 'Tornillería', 'Limpieza',
+    'Papelería', 'Oficina', 'Informática', 'Redes', 'Iluminación', 'Seguridad industrial', 'Jardinería',
+    'Construcción', 'Adhesivos', 'Lubricantes', 'Repuestos', 'Embalaje', 'Cocina', 'Baño', 'Climatización',
+    'Cerrajería', 'Automotriz', 'Mobiliario',
+]
+NOUNS = [
+    'Tornillo', 'Tuerca', 'Arandela', 'Cable', 'Tubo', 'Codo', 'Llave', 'Martillo', 'Destornillador', 'Cinta',
+    'Pintura', 'Brocha', 'Rodillo', 'Bombillo', 'Interruptor', 'Tomacorriente', 'Guante', 'Casco', 'Resma',
+    'Carpeta', 'Teclado', 'Mouse', 'Conector', 'Manguera', 'Válvula', 'Filtro', 'Silicón', 'Pegamento',
+    'Aceite', 'Grasa', 'Caja', 'Bolsa', 'Candado', 'Bisagra', 'Escoba', 'Detergente', 'Lija', 'Broca',
+]
+QUALIFIERS = [
+    'galvanizado', 'inoxidable', 'de cobre', 'de PVC', 'reforzado', 'industrial', 'doméstico', 'profesional',
+    'económico', 'multiuso', 'blanco', 'negro', 'rojo', 'transparente', 'de alta presión', 'antideslizante',
+]
+SIZES = ['1/4"', '3/8"', '1/2"', '3/4"', '1"', '2"', '10 mm', '12 mm', '20 cm', '1 m', '5 m', '1 L', '4 L', '1 kg']
+BRANDS = ['Stanley', 'Truper', 'Pretul', 'Bosch', 'Makita', '3M', 'Philips', 'Pavco', 'Sika', 'Genérico']
+UNITS = ['UND', 'UND', 'UND', 'CAJA', 'PAQ', 'KG', 'LT', 'MT', 'ROLLO', 'PAR']
+FIRST_NAMES = [
+    'José', 'María', 'Luis', 'Carmen', 'Carlos', 'Ana', 'Juan', 'Rosa', 'Pedro', 'Luisa', 'Miguel', 'Elena',
+    'Jorge', 'Isabel', 'Rafael', 'Patricia', 'Andrés', 'Gabriela', 'Fernando', 'Daniela',
+]
+LAST_NAMES = [
+    'González', 'Rodríguez', 'Pérez', 'Hernández', 'García', 'Martínez', 'López', 'Díaz', 'Sánchez', 'Ramírez',
+    'Torres', 'Flores', 'Rojas', 'Morales', 'Castillo', 'Vargas', 'Mendoza', 'Silva', 'Romero', 'Suárez',
+]
+COMPANY_WORDS = [
+    'Distribuidora', 'Comercial', 'Inversiones', 'Suministros', 'Importadora', 'Ferretería', 'Servicios',
+    'Corporación', 'Grupo', 'Industrias',
+]
+COMPANY_NAMES = [
+    'Andina', 'del Centro', 'Oriental', 'Los Llanos', 'El Progreso', 'La Unión', 'Caribe', 'Atlántico',
+    'Bolívar', 'Miranda', 'Horizonte', 'Del Sur', 'Nacional', 'Continental', 'Sol',
+]
+COMPANY_SUFFIXES = ['C.A.', 'S.A.', 'S.R.L.', 'C.A.', 'Hermanos']
+CITIES = ['Caracas', 'Valencia', 'Maracay', 'Barquisimeto', 'Maracaibo', 'Mérida', 'Puerto La Cruz', 'Cumaná']
+VEHICLES = ['Camión 350', 'Camioneta', 'Furgón', 'Camión cava', 'Moto']
+COLORS = ['Blanco', 'Gris', 'Rojo', 'Azul', 'Negro', 'Plata']
+
+# Precio máximo y cantidad máxima por línea: los totales caben en DecimalField(max_digits=10)
+MAX_PRICE_CENTS = 999_999
+MAX_LINE_QUANTITY = 200
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _money(cents):
+    return f'{cents // 100}.{cents % 100:02d}'
+
+
+# Caracteres con significado en el formato de texto de COPY
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_value(value):
+    """Valor en el formato de texto de COPY: ``\\N`` es NULL y ``''`` un texto vacío."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).translate(COPY_ESCAPES)
+
+
+class Writer:
+    """Inserta filas (diccionarios por ``attname``) por lotes: COPY en PostgreSQL, ``bulk_create`` en el resto."""
+
+    def __init__(self, batch_size, now, stdout):
+        self.batch_size = batch_size
+        self.now = now
+        self.stdout = stdout
+        self.copy = connection.vendor == 'postgresql'
+        self.models = []
+
+    def write(self, model, rows):
+        fields = model._meta.concrete_fields
+        defaults = {field.attname: self._default(field) for field in fields}
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+        started = time.perf_counter()
+        count = 0
+        for batch in _batched(rows, self.batch_size):
+            if self.copy:
+                buffer = io.StringIO()
+                for row in batch:
+                    buffer.write('\t'.join(_copy_value(row.get(name, default)) for name, default in defaults.items()))
+                    buffer.write('\n')
+                buffer.seek(0)
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN', buffer)
+            else:
+                model.objects.bulk_create([model(**row) for row in batch], batch_size=1000)
+            count += len(batch)
+        elapsed = time.perf_counter() - started
+        self.models.append(model)
+        self.stdout.write(
+            f'{model._meta.label:<30} {count:>12,} filas {elapsed:8.1f} s {count / max(elapsed, 1e-9):>12,.0f} filas/s'
+        )
+        return count
+
+    def _default(self, field):
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            return self.now
+        return field.get_default()
+
+    def finish(self):
+        """Ajusta las secuencias de id a las filas insertadas con id explícito y actualiza estadísticas."""
+        if not self.copy:
+            return
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), self.models):
+                cursor.execute(sql)
+            for model in self.models:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
 
 class Command(BaseCommand):
-    help = 'Populate database with sample products'
+    help = (
+        'Genera datos sintéticos a escala de producción para los benchmarks: usuarios, almacenes, proveedores, '
+        'clientes, productos, movimientos y documentos (despachos, recepciones, devoluciones, órdenes y '
+        'cotizaciones) con número de líneas sesgado. Misma semilla y misma --until, mismos datos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--production', action='store_true',
+                            help='1M productos, 10M movimientos, 500k documentos de cada tipo')
+        parser.add_argument('--products', type=int, default=10_000)
+        parser.add_argument('--movements', type=int, default=100_000)
+        parser.add_argument('--documents', type=int, default=5_000, help='Documentos de cada tipo')
+        parser.add_argument('--suppliers', type=int, default=200)
+        parser.add_argument('--clients', type=int, default=2_000)
+        parser.add_argument('--warehouses', type=int, default=5)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--max-items', type=int, default=40, help='Líneas máximas por documento')
+        parser.add_argument('--days', type=int, default=730, help='Días de historia hasta --until')
+        parser.add_argument('--until', type=datetime.date.fromisoformat, default=None,
+                            help='Último día con datos, AAAA-MM-DD (por defecto, hoy)')
+        parser.add_argument('--prefix', default='SYN', help='Prefijo de códigos y números de documento')
+        parser.add_argument('--batch-size', type=int, default=20_000, help='Filas por COPY o bulk_create')
 
     def handle(self, *args, **options):
-        # ... el mismo código de arriba ...
-        self.stdout.write(self.style.SUCCESS('Productos de prueba creados exitosamente!'))
\ No newline at end of file
+        if options['production']:
+            options.update(PRODUCTION)
+        if options['products'] < 1:
+            raise CommandError('Hace falta al menos un producto.')
+        self.options = options
+        self.prefix = options['prefix']
+        if Product.objects.filter(product_code__startswith=f'{self.prefix}-').exists():
+            raise CommandError(f'Ya hay productos con el prefijo {self.prefix}-; use otro --prefix.')
+
+        until = options['until'] or timezone.localdate()
+        self.end = timezone.make_aware(datetime.datetime.combine(until + datetime.timedelta(days=1), datetime.time.min))
+        self.start = self.end - datetime.timedelta(days=options['days'])
+        self.writer = Writer(options['batch_size'], self.end, self.stdout)
+
+        started = time.perf_counter()
+        self.users = self._ids(User, self._users())
+        self.warehouses = self._ids(Warehouse, self._warehouses())
+        self.suppliers = self._ids(Supplier, self._suppliers())
+        self.clients = self._ids(Client, self._clients())
+        self.products = self._products()
+        # Documentos por source_type de Movement; las devoluciones apuntan a despachos ya creados
+        self.documents = {}
+        self.documents['DISPATCH'] = self._dispatch_notes()
+        self.documents['RECEPTION'] = self._reception_notes()
+        self.documents['RETURN'] = self._return_notes()
+        self.documents['ORDER'] = self._orders()
+        self._quotations()
+        self._movements()
+
+        self.writer.finish()
+        rebuild_categories()
+        bump(*self.writer.models)
+        self.stdout.write(self.style.SUCCESS(
+            f'Datos sintéticos generados en {time.perf_counter() - started:.1f} s (semilla {options["seed"]})'
+        ))
+
+    # --- utilidades -----------------------------------------------------
+
+    def _rng(self, stream):
+        # Un generador por tabla: cambiar un volumen no altera las demás tablas
+        return random.Random(f'{self.options["seed"]}:{stream}')
+
+    def _next_id(self, model):
+        return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+    def _ids(self, model, rows):
+        """Escribe ``rows`` (generador de filas con ``id``) y devuelve el rango de ids creado."""
+        first = self._next_id(model)
+        count = self.writer.write(model, rows(first))
+        return range(first, first + count)
+
+    def _pick(self, rng, ids, skew=1.0):
+        """Un id de ``ids``; con ``skew`` > 1 los primeros concentran la mayoría de las elecciones."""
+        if not ids:
+            return None
+        return ids[min(int(len(ids) * rng.random() ** skew), len(ids) - 1)]
+
+    def _dates(self, rng, count):
+        """``count`` fechas crecientes entre el inicio y el fin del periodo (inserción en orden de partición)."""
+        span = (self.end - self.start).total_seconds()
+        for index in range(count):
+            yield self.start + datetime.timedelta(seconds=span * (index + rng.random()) / count)
+
+    def _line_count(self, rng):
+        # Pareto: la mayoría de los documentos tienen 1-3 líneas, unos pocos llegan al máximo
+        return min(self.options['max_items'], int(rng.paretovariate(1.2)))
+
+    def _quantity(self, rng):
+        return min(MAX_LINE_QUANTITY, int(rng.paretovariate(1.1)))
+
+    def _person(self, rng):
+        return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+    def _company(self, rng):
+        return f'{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_NAMES)} {rng.choice(COMPANY_SUFFIXES)}'
+
+    def _phone(self, rng):
+        return f'0{rng.choice((212, 241, 243, 251, 261, 412, 414, 416, 424))}-{rng.randint(1000000, 9999999)}'
+
+    def _email(self, name, index):
+        return f'{name.split()[0].lower()}{index}@ejemplo.com'
+
+    # --- catálogos ------------------------------------------------------
+
+    def _users(self):
+        def rows(first):
+            for index in range(self.options['users']):
+                yield {
+                    'id': first + index, 'username': f'{self.prefix.lower()}_usuario_{first + index}',
+                    'password': '!', 'is_active': True, 'date_joined': self.start,
+                }
+        return rows
+
+    def _warehouses(self):
+        rng = self._rng('warehouses')
+
+        def rows(first):
+            for index in range(self.options['warehouses']):
+                city = rng.choice(CITIES)
+                yield {
+                    'id': first + index, 'name': f'Almacén {city} {index + 1}',
+                    'location': f'Zona industrial de {city}', 'is_main': index == 0,
+                }
+        return rows
+
+    def _suppliers(self):
+        rng = self._rng('suppliers')
+
+        def rows(first):
+            for index in range(self.options['suppliers']):
+                name = self._company(rng)
+                yield {
+                    'id': first + index, 'name': name, 'contact_person': self._person(rng),
+                    'phone': self._phone(rng), 'email': self._email(name.split()[-2], first + index),
+                    'address': f'Av. {rng.choice(LAST_NAMES)}, {rng.choice(CITIES)}',
+                    'is_active': rng.random() < 0.95,
+                }
+        return rows
+
+    def _clients(self):
+        rng = self._rng('clients')
+
+        def rows(first):
+            for index in range(self.options['clients']):
+                name = self._company(rng) if rng.random() < 0.4 else self._person(rng)
+                yield {
+                    'id': first + index, 'name': name, 'phone': self._phone(rng),
+                    'email': self._email(name, first + index) if rng.random() < 0.7 else None,
+                    'is_active': rng.random() < 0.97,
+                }
+        return rows
+
+    def _products(self):
+        """Productos; guarda sus precios en céntimos para las líneas de documentos y movimientos."""
+        rng = self._rng('products')
+        count = self.options['products']
+        self.prices = array('q')
+        # Categorías con peso decreciente (Zipf): unas pocas concentran la mayoría de los productos
+        category_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(CATEGORIES))))
+
+        def rows(first):
+            for index, created in enumerate(self._dates(rng, count)):
+                cents = min(MAX_PRICE_CENTS, max(5, int(math.exp(rng.gauss(7.5, 1.3)))))
+                self.prices.append(cents)
+                min_stock = rng.randint(0, 50)
+                max_stock = min_stock + rng.randint(50, 1000)
+                roll = rng.random()
+                if roll < 0.08:
+                    stock = 0
+                elif roll < 0.2:
+                    stock = rng.randint(1, max(min_stock, 1))
+                else:
+                    stock = rng.randint(min_stock + 1, max_stock)
+                yield {
+                    'id': first + index,
+                    'product_code': f'{self.prefix}-{first + index:08d}',
+                    'description': (
+                        f'{rng.choice(NOUNS)} {rng.choice(QUALIFIERS)} {rng.choice(SIZES)} {rng.choice(BRANDS)}'
+                    ),
+                    'unit': rng.choice(UNITS),
+                    'unit_price': _money(cents),
+                    'min_stock': min_stock, 'max_stock': max_stock, 'current_stock': stock,
+                    'location': f'Pasillo {rng.randint(1, 40)}-{rng.choice("ABCDEF")}{rng.randint(1, 9)}',
+                    'category': rng.choices(CATEGORIES, cum_weights=category_weights)[0],
+                    'supplier_id': self._pick(rng, self.suppliers, skew=2),
+                    'warehouse_id': self._pick(rng, self.warehouses, skew=2),
+                    'is_active': rng.random() < 0.97,
+                    'created_at': created, 'updated_at': created,
+                }
+
+        return self._ids(Product, rows)
+
+    # --- documentos -----------------------------------------------------
+
+    def _lines(self, rng):
+        """Líneas ``(product_id, cantidad, precio en céntimos)``; los productos más vendidos se repiten más."""
+        lines = {}
+        for _ in range(self._line_count(rng)):
+            position = min(int(len(self.products) * rng.random() ** 3), len(self.products) - 1)
+            lines.setdefault(self.products[position], (self._quantity(rng), self.prices[position]))
+        return [(pk, quantity, cents) for pk, (quantity, cents) in lines.items()]
+
+    def _documents(self, model, item_model, stream, header, item):
+        """
+        Escribe ``--documents`` cabeceras de ``model`` y sus líneas. ``header(rng, id, fecha, líneas, total)``
+        devuelve la fila de la cabecera; ``item(id_documento, línea)`` la de cada línea.
+        """
+        rng = self._rng(stream)
+        count = self.options['documents']
+        first = self._next_id(model)
+        lines_by_document = []
+
+        def headers():
+            for index, date in enumerate(self._dates(rng, count)):
+                lines = self._lines(rng)
+                lines_by_document.append(lines)
+                total = sum(quantity * cents for _, quantity, cents in lines)
+                yield header(rng, first + index, date, lines, total)
+
+        written = self.writer.write(model, headers())
+        first_item = self._next_id(item_model)
+
+        def items():
+            pk = first_item
+            for index, lines in enumerate(lines_by_document):
+                for line in lines:
+                    yield {'id': pk, **item(first + index, line)}
+                    pk += 1
+
+        self.writer.write(item_model, items())
+        return range(first, first + written)
+
+    def _status(self, rng, weights):
+        return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _dispatch_notes(self):
+        def header(rng, pk, date, lines, total):
+            status = self._status(rng, {'PENDING': 10, 'DISPATCHED': 85, 'CANCELLED': 5})
+            client = self._pick(rng, self.clients, skew=2)
+            row = {
+                'id': pk, 'dispatch_number': f'{self.prefix}-ND-{pk:08d}', 'client_id': client,
+                'beneficiary': self._person(rng), 'dispatch_date': date, 'status': status,
+                'created_by_id': self._pick(rng, self.users), 'total': _money(total),
+            }
+            if status == 'DISPATCHED':
+                row.update(
+                    driver_name=self._person(rng), driver_id=str(rng.randint(5_000_000, 30_000_000)),
+                    vehicle_type=rng.choice(VEHICLES), vehicle_color=rng.choice(COLORS),
+                    license_plate=f'{rng.choice("ABCDEFGH")}{rng.randint(10, 99)}{rng.choice("KLMNOP")}{rng.randint(100, 999)}',
+                )
+            return row
+
+        def item(document, line):
+            product, quantity, cents = line
+            return {
+                'dispatch_note_id': document, 'product_id': product, 'quantity': quantity,
+                'unit_price': _money(cents), 'subtotal': _money(quantity * cents),
+            }
+
+        return self._documents(DispatchNote, DispatchItem, 'dispatch_notes', header, item)
+
+    def _reception_notes(self):
+        def header(rng, pk, date, lines, total):
+            return {
+                'id': pk, 'receipt_number': f'{self.prefix}-REC-{pk:08d}',
+                'supplier_id': self._pick(rng, self.suppliers, skew=2), 'receipt_date': date,
+                'created_by_id': self._pick(rng, self.users),
+                'status': self._status(rng, {'PENDING': 10, 'RECEIVED': 85, 'CANCELLED': 5}),
+                'total': _money(total),
+            }
+
+        def item(document, line):
+            product, quantity, cents = line
+            return {
+                'receipt_note_id': document, 'product_id': product, 'quantity': quantity,
+                'unit_price': _money(cents), 'subtotal': _money(quantity * cents),
+            }
+
+        return self._documents(ReceptionNote, ReceptionItem, 'reception_notes', header, item)
+
+    def _return_notes(self):
+        dispatches = self.documents['DISPATCH']
+
+        def header(rng, pk, date, lines, total):
+            status = self._status(rng, {'PENDING': 20, 'RETURNED': 70, 'CANCELLED': 10})
+            return {
+                'id': pk, 'return_number': f'{self.prefix}-DEV-{pk:08d}',
+                'dispatch_note_id': self._pick(rng, dispatches),
+                'client_id': self._pick(rng, self.clients, skew=2), 'return_date': date,
+                'processed_date': date + datetime.timedelta(hours=rng.randint(1, 72)) if status == 'RETURNED' else None,
+                'created_by_id': self._pick(rng, self.users), 'status': status,
+            }
+
+        def item(document, line):
+            product, quantity, _ = line
+            return {'return_note_id': document, 'product_id': product, 'quantity': quantity}
+
+        return self._documents(ReturnNote, ReturnItem, 'return_notes', header, item)
+
+    def _orders(self):
+        statuses = {}
+
+        def header(rng, pk, date, lines, total):
+            status = self._status(rng, {'PENDING': 15, 'APPROVED': 15, 'PARTIAL': 10, 'DELIVERED': 55, 'CANCELLED': 5})
+            statuses[pk] = status
+            return {
+                'id': pk, 'order_number': f'{self.prefix}-ORD-{pk:08d}',
+                'supplier_id': self._pick(rng, self.suppliers, skew=2), 'order_date': date,
+                'delivery_date': (date + datetime.timedelta(days=rng.randint(3, 30))).date(),
+                'created_by_id': self._pick(rng, self.users), 'status': status, 'total': _money(total),
+                'created_at': date, 'updated_at': date,
+            }
+
+        def item(document, line):
+            product, quantity, cents = line
+            received = {'DELIVERED': quantity, 'PARTIAL': quantity // 2}.get(statuses[document], 0)
+            return {
+                'order_id': document, 'product_id': product, 'quantity': quantity,
+                'unit_price': _money(cents), 'subtotal': _money(quantity * cents), 'received_quantity': received,
+            }
+
+        return self._documents(Order, OrderItem, 'orders', header, item)
+
+    def _quotations(self):
+        if not self.clients:
+            self.stdout.write(self.style.WARNING('Sin clientes no se generan cotizaciones.'))
+            return range(0)
+
+        def header(rng, pk, date, lines, total):
+            status = self._status(rng, {'DRAFT': 15, 'SENT': 30, 'APPROVED': 20, 'REJECTED': 15, 'CONVERTED': 20})
+            sent = date + datetime.timedelta(hours=rng.randint(1, 48)) if status != 'DRAFT' else None
+            approved = sent + datetime.timedelta(days=rng.randint(1, 10)) if status in ('APPROVED', 'CONVERTED') else None
+            return {
+                'id': pk, 'quotation_number': f'{self.prefix}-COT-{pk:08d}',
+                'client_id': self._pick(rng, self.clients, skew=2), 'date_created': date,
+                'date_sent': sent, 'date_approved': approved,
+                'valid_until': (date + datetime.timedelta(days=30)).date(), 'total': _money(total),
+                'status': status, 'created_by_id': self._pick(rng, self.users),
+            }
+
+        def item(document, line):
+            product, quantity, cents = line
+            return {
+                'quotation_id': document, 'product_id': product, 'quantity': quantity,
+                'unit_price': _money(cents), 'subtotal': _money(quantity * cents),
+            }
+
+        return self._documents(Quotation, QuotationItem, 'quotations', header, item)
+
+    # --- movimientos ----------------------------------------------------
+
+    def _movements(self):
+        rng = self._rng('movements')
+        if is_partitioned():
+            month = month_start(self.start)
+            while month <= self.end.date():
+                create_partition(month)
+                month = add_months(month, 1)
+
+        sources = ['MANUAL', 'DISPATCH', 'RECEPTION', 'ORDER', 'RETURN']
+        source_weights = [40, 25, 20, 10, 5]
+        entries = {'RECEPTION', 'ORDER', 'RETURN'}
+
+        def rows(first):
+            for index, date in enumerate(self._dates(rng, self.options['movements'])):
+                position = min(int(len(self.products) * rng.random() ** 3), len(self.products) - 1)
+                source = rng.choices(sources, weights=source_weights)[0]
+                if source == 'MANUAL':
+                    movement_type = 'IN' if rng.random() < 0.55 else 'OUT'
+                else:
+                    movement_type = 'IN' if source in entries else 'OUT'
+                document = self._pick(rng, self.documents.get(source, ()))
+                yield {
+                    'id': first + index, 'product_id': self.products[position], 'movement_type': movement_type,
+                    'quantity': self._quantity(rng), 'unit_price': _money(self.prices[position]), 'date': date,
+                    'created_by_id': self._pick(rng, self.users),
+                    'delivered_to': self._person(rng) if movement_type == 'OUT' else None,
+                    'source_type': source, 'source_id': document,
+                    'reference': f'{self.prefix}-{source[:3]}-{document:08d}' if document else '',
+                }
+
+        return self._ids(Movement, rows)
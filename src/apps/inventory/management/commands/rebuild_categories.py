@@ -0,0 +1,15 @@
+# apps/inventory/management/commands/rebuild_categories.py
+from django.core.management.base import BaseCommand
+
+from apps.inventory.categories import rebuild_categories
+from apps.inventory.models import Category
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula la dimensión de categorías (productos, unidades y valor del stock) desde los '
+        'productos; usar tras cargas masivas que no pasan por save()'
+    )
+
+    def handle(self, *args, **options):
+        rebuild_categories()
+        self.stdout.write(self.style.SUCCESS(f'{Category.objects.count()} categorías recalculadas.'))
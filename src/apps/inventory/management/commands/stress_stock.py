@@ -0,0 +1,103 @@
+# apps/inventory/management/commands/stress_stock.py
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from apps.inventory.models import Product
+from apps.inventory.stock import InsufficientStock, adjust_stock
+
+class Command(BaseCommand):
+    help = 'Prueba de estrés del stock con escritores concurrentes: verifica que no se pierdan actualizaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Hilos escritores en paralelo')
+        parser.add_argument('--operations', type=int, default=200, help='Operaciones por hilo')
+        parser.add_argument('--products', type=int, default=5, help='Productos compartidos entre los hilos')
+        parser.add_argument('--batch', type=int, default=3, help='Líneas por operación (documento)')
+        parser.add_argument('--initial-stock', type=int, default=500)
+        parser.add_argument(
+            '--mode', choices=['service', 'legacy'], default='service',
+            help='service: apps.inventory.stock; legacy: lectura-modificación-escritura como antes',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='No borrar los productos de prueba')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor == 'sqlite':
+            raise CommandError('SQLite serializa las escrituras; ejecute la prueba contra PostgreSQL.')
+
+        Product.objects.filter(product_code__startswith='STRESS-').delete()
+        products = Product.objects.bulk_create([
+            Product(
+                product_code=f'STRESS-{i:03d}', description=f'Producto de estrés {i}', unit='UND',
+                unit_price=1, current_stock=options['initial_stock'],
+            )
+            for i in range(options['products'])
+        ])
+        ids = [product.pk for product in products]
+        operation = self.service_operation if options['mode'] == 'service' else self.legacy_operation
+
+        def worker(index):
+            rng = random.Random(options['seed'] + index)
+            applied, rejected = {pk: 0 for pk in ids}, 0
+            try:
+                for _ in range(options['operations']):
+                    deltas = {}
+                    for pk in rng.sample(ids, min(options['batch'], len(ids))):
+                        deltas[pk] = rng.choice([-1, 1]) * rng.randint(1, 20)
+                    if operation(deltas):
+                        for pk, delta in deltas.items():
+                            applied[pk] += delta
+                    else:
+                        rejected += 1
+            finally:
+                connections.close_all()
+            return applied, rejected
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(worker, range(options['workers'])))
+        elapsed = time.perf_counter() - started
+
+        expected = {pk: options['initial_stock'] for pk in ids}
+        rejected = 0
+        for applied, worker_rejected in results:
+            rejected += worker_rejected
+            for pk, delta in applied.items():
+                expected[pk] += delta
+
+        actual = dict(Product.objects.filter(pk__in=ids).values_list('pk', 'current_stock'))
+        lost = {pk: expected[pk] - actual[pk] for pk in ids if expected[pk] != actual[pk]}
+
+        total = options['workers'] * options['operations']
+        self.stdout.write(f'Modo: {options["mode"]}')
+        self.stdout.write(f'Operaciones: {total} ({rejected} rechazadas por stock insuficiente)')
+        self.stdout.write(f'Tiempo: {elapsed:.2f}s  ->  {total / elapsed:.0f} operaciones/s')
+
+        if not options['keep']:
+            Product.objects.filter(pk__in=ids).delete()
+
+        if lost:
+            raise CommandError(f'Actualizaciones perdidas (esperado - real): {lost}')
+        self.stdout.write(self.style.SUCCESS('Sin actualizaciones perdidas ni stock negativo.'))
+
+    def service_operation(self, deltas):
+        try:
+            adjust_stock(deltas)
+        except InsufficientStock:
+            return False
+        return True
+
+    def legacy_operation(self, deltas):
+        # Reproduce el patrón anterior: leer, validar en Python y escribir el valor calculado
+        with transaction.atomic():
+            products = [Product.objects.get(pk=pk) for pk in deltas]
+            if any(product.current_stock + deltas[product.pk] < 0 for product in products):
+                return False
+            for product in products:
+                product.current_stock += deltas[product.pk]
+                product.save(update_fields=['current_stock'])
+        return True
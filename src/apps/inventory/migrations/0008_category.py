@@ -0,0 +1,54 @@
+# Generated by Django 4.2 on 2026-10-19 02:53
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def populate_categories(apps, schema_editor):
+    # Una fila por cada valor de Product.category con sus totales actuales
+    Category = apps.get_model('inventory', 'Category')
+    Product = apps.get_model('inventory', 'Product')
+    rows = (
+        Product.objects.exclude(category='')
+        .values('category')
+        .annotate(
+            count=Count('pk'),
+            units=Sum('current_stock'),
+            value=Sum(F('current_stock') * F('unit_price')),
+        )
+        .order_by()
+    )
+    Category.objects.bulk_create([
+        Category(
+            name=row['category'], product_count=row['count'],
+            stock_units=row['units'] or 0, stock_value=row['value'] or 0,
+        )
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_product_product_description_lower_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Nombre')),
+                ('product_count', models.IntegerField(default=0, verbose_name='Productos')),
+                ('stock_units', models.BigIntegerField(default=0, verbose_name='Unidades en stock')),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Valor del stock')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Categoría',
+                'verbose_name_plural': 'Categorías',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(populate_categories, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 # src/apps/inventory/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 class Client(models.Model):
@@ -37,6 +39,26 @@ class Warehouse(models.Model):
     def __str__(self):
         return self.name
 
+class Category(models.Model):
+    """
+    Dimensión de ``Product.category`` con totales mantenidos por
+    ``apps.inventory.categories`` al guardar productos y mover stock.
+    Filtros, panel y reportes la leen en lugar de recorrer los productos.
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name="Nombre")
+    product_count = models.IntegerField(default=0, verbose_name="Productos")
+    stock_units = models.BigIntegerField(default=0, verbose_name="Unidades en stock")
+    stock_value = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name="Valor del stock")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Categoría"
+        verbose_name_plural = "Categorías"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 class Product(models.Model):
     product_code = models.CharField(max_length=50, unique=True)
     description = models.TextField()  # Mantener como TextField
@@ -57,10 +79,28 @@ class Product(models.Model):
         verbose_name = "Producto"
         verbose_name_plural = "Productos"
         ordering = ['product_code']
+        indexes = [
+            # ProductListView ordena por Lower('description')
+            models.Index(Lower('description'), name='product_description_lower_idx'),
+            models.Index(fields=['category'], name='product_category_idx'),
+            # Alertas de stock: current_stock <= min_stock / current_stock = 0
+            models.Index(fields=['current_stock'], name='product_low_stock_idx',
+                         condition=Q(current_stock__lte=F('min_stock'))),
+            models.Index(fields=['product_code'], name='product_out_of_stock_idx',
+                         condition=Q(current_stock=0)),
+            models.Index(fields=['product_code'], name='product_active_idx',
+                         condition=Q(is_active=True)),
+        ]
 
     def __str__(self):
         return f"{self.product_code} - {self.description[:50]}"
 
+    def save(self, *args, **kwargs):
+        # Las señales de apps.inventory.categories bloquean la fila anterior
+        # hasta el commit: dos guardados concurrentes no aplican el mismo delta
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     # Método helper para compatibilidad
     def get_short_description(self):
         """Retorna una descripción corta para interfaces que esperan CharField"""
@@ -0,0 +1,211 @@
+# src/apps/inventory/snapshot.py
+"""
+Instantánea de stock en memoria para ``StockAPIView``.
+
+Cada proceso mantiene una tabla compacta ``(id, código, stock, mínimo)`` en
+arrays, ordenada por código, y el listado completo ya serializado en JSON
+(y comprimido con gzip bajo demanda). Una petición no hace trabajo de ORM:
+
+* si el bus de invalidación (``apps.httpcache.bus``) está escuchando y la
+  última versión de ``inventory.product`` que anunció es la de la
+  instantánea, se sirven los bytes guardados; sin bus, lo mismo si pasó
+  menos de ``STOCK_SNAPSHOT_REFRESH_INTERVAL`` desde la última comprobación;
+* si no, se lee el contador de versión de ``inventory.product``
+  (``apps.httpcache``); si no cambió, tampoco hay nada que hacer;
+* si cambió, se leen solo los productos con ``updated_at`` reciente (el
+  servicio de stock lo actualiza) y se vuelven a serializar únicamente los
+  bloques afectados. Las altas, bajas o cambios de código, o el paso de
+  ``STOCK_SNAPSHOT_FULL_REFRESH`` segundos, reconstruyen la tabla completa.
+"""
+import gzip
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.httpcache.bus import get_bus
+from apps.httpcache.versions import get_versions, model_label
+from core.json import dumps
+
+from .models import Product
+
+BLOCK_SIZE = 4096
+
+
+class StockSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+        self.built_at = 0.0
+        self.watermark = None
+
+        self.ids = array('q')
+        self.codes = []
+        self.stocks = array('q')
+        self.mins = array('q')
+        # Índice id -> posición: ids ordenados y su posición en la tabla
+        self._sorted_ids = array('q')
+        self._positions = array('q')
+
+        self._blocks = []
+        self.body = b'[]'
+        self._gzip = None
+
+    @property
+    def etag(self):
+        return f'"stock-{self.version}"'
+
+    def __len__(self):
+        return len(self.ids)
+
+    def current(self):
+        """
+        ``(etag, cuerpo)`` de la instantánea. La versión se lee antes que el
+        cuerpo: durante un refresco se puede obtener un ETag anterior con el
+        cuerpo nuevo (el cliente solo pierde un 304), nunca al revés.
+        """
+        etag = self.etag
+        return etag, self.body
+
+    def gzipped(self, body):
+        """``body`` comprimido; se guarda el último resultado para no recomprimir."""
+        compressed = self._gzip
+        if compressed is None or compressed[0] is not body:
+            compressed = (body, gzip.compress(body, compresslevel=1))
+            self._gzip = compressed
+        return compressed[1]
+
+    # --- refresco -------------------------------------------------------
+
+    def _fresh(self, now):
+        if self.version is None:
+            return False
+        bus = get_bus()
+        bus.start()
+        announced = bus.version(model_label(Product))
+        if announced is not None:
+            return announced == self.version and now - self.built_at < settings.STOCK_SNAPSHOT_FULL_REFRESH
+        return now - self.checked_at < settings.STOCK_SNAPSHOT_REFRESH_INTERVAL
+
+    def expire(self):
+        """La próxima petición comprueba la versión."""
+        self.checked_at = 0.0
+
+    def refresh(self, force=False):
+        """Actualiza la instantánea si corresponde; devuelve ``self``."""
+        now = time.monotonic()
+        if not force and self._fresh(now):
+            return self
+
+        with self._lock:
+            if not force and self._fresh(now):
+                return self  # Otro hilo la refrescó mientras se esperaba el bloqueo
+            label = model_label(Product)
+            version = get_versions([label])[label][0]
+            full = force or self.version is None or now - self.built_at >= settings.STOCK_SNAPSHOT_FULL_REFRESH
+            if full:
+                self._build(version)
+            elif version != self.version:
+                if not self._apply_changes():
+                    self._build(version)
+                self.version = version
+            self.checked_at = time.monotonic()
+        return self
+
+    def _build(self, version):
+        started_at = timezone.now()
+        ids, codes, stocks, mins = array('q'), [], array('q'), array('q')
+        rows = (
+            Product.objects.order_by('product_code')
+            .values_list('id', 'product_code', 'current_stock', 'min_stock')
+            .iterator(chunk_size=10000)
+        )
+        for pk, code, stock, minimum in rows:
+            ids.append(pk)
+            codes.append(code)
+            stocks.append(stock)
+            mins.append(minimum)
+
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        self.ids, self.codes, self.stocks, self.mins = ids, codes, stocks, mins
+        self._sorted_ids = array('q', (ids[i] for i in order))
+        self._positions = array('q', order)
+        self._blocks = [self._serialize_block(start) for start in range(0, len(ids), BLOCK_SIZE)]
+        self._join()
+
+        self.version = version
+        self.watermark = started_at
+        self.built_at = time.monotonic()
+
+    def _position(self, pk):
+        index = bisect_left(self._sorted_ids, pk)
+        if index < len(self._sorted_ids) and self._sorted_ids[index] == pk:
+            return self._positions[index]
+        return None
+
+    def _apply_changes(self):
+        """
+        Aplica en su lugar los productos modificados desde la última lectura.
+        Devuelve ``False`` si hace falta reconstruir la tabla (altas, bajas o
+        cambios de código, que alteran el orden).
+        """
+        started_at = timezone.now()
+        since = self.watermark - timedelta(seconds=settings.STOCK_SNAPSHOT_MARGIN)
+        changed = list(
+            Product.objects.filter(updated_at__gte=since)
+            .values_list('id', 'product_code', 'current_stock', 'min_stock')
+        )
+        if Product.objects.count() != len(self.ids):
+            return False
+
+        dirty = set()
+        for pk, code, stock, minimum in changed:
+            position = self._position(pk)
+            if position is None or self.codes[position] != code:
+                return False
+            if self.stocks[position] != stock or self.mins[position] != minimum:
+                self.stocks[position] = stock
+                self.mins[position] = minimum
+                dirty.add(position // BLOCK_SIZE)
+
+        for block in dirty:
+            self._blocks[block] = self._serialize_block(block * BLOCK_SIZE)
+        if dirty:
+            self._join()
+        self.watermark = started_at
+        return True
+
+    def _serialize_block(self, start):
+        end = min(start + BLOCK_SIZE, len(self.ids))
+        rows = [
+            {
+                'id': self.ids[i],
+                'product_code': self.codes[i],
+                'current_stock': self.stocks[i],
+                'min_stock': self.mins[i],
+                'status': 'OK' if self.stocks[i] > self.mins[i] else 'LOW STOCK',
+            }
+            for i in range(start, end)
+        ]
+        return dumps(rows)[1:-1]
+
+    def _join(self):
+        self.body = b'[' + b','.join(self._blocks) + b']'
+
+
+_snapshot = StockSnapshot()
+
+
+def get_stock_snapshot():
+    """Instantánea del proceso, refrescada si corresponde."""
+    return _snapshot.refresh()
+
+
+def expire_stock_snapshot(ids, version):
+    """Manejador del bus de invalidación para ``inventory.Product``."""
+    _snapshot.expire()
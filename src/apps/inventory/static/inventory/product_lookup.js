@@ -0,0 +1,107 @@
+// apps/inventory/static/inventory/product_lookup.js
+//
+// Cliente de la API de consulta de productos (/api/inventario/productos/consulta/).
+// Las peticiones hechas en el mismo ciclo de eventos se agrupan en una sola
+// llamada con ?ids=..., y los productos ya obtenidos se reutilizan.
+//
+//   ProductLookup.configure({url: '...', fields: ['unit_price', 'current_stock']});
+//   ProductLookup.prefetch([1, 2, 3]);          // una llamada para todo el formulario
+//   ProductLookup.get(2).then(product => ...);  // null si no existe
+(function (window) {
+    'use strict';
+
+    const MAX_IDS = 500;
+    const cache = new Map();
+    let pending = new Map();
+    let scheduled = false;
+    let options = {url: '/api/inventario/productos/consulta/', fields: null};
+
+    function configure(opts) {
+        options = Object.assign({}, options, opts);
+        cache.clear();
+    }
+
+    function request(ids) {
+        const params = new URLSearchParams({ids: ids.join(',')});
+        if (options.fields) {
+            params.set('fields', options.fields.join(','));
+        }
+        return fetch(`${options.url}?${params}`, {
+            headers: {'Accept': 'application/json'},
+            credentials: 'same-origin',
+        }).then(response => {
+            if (!response.ok) {
+                throw new Error(`Error ${response.status} al consultar productos`);
+            }
+            return response.json();
+        });
+    }
+
+    function flush() {
+        scheduled = false;
+        const batch = pending;
+        pending = new Map();
+        const ids = Array.from(batch.keys());
+
+        for (let start = 0; start < ids.length; start += MAX_IDS) {
+            const chunk = ids.slice(start, start + MAX_IDS);
+            request(chunk)
+                .then(data => {
+                    chunk.forEach(id => {
+                        const product = data.products[id] || null;
+                        cache.set(id, product);
+                        batch.get(id).forEach(({resolve}) => resolve(product));
+                    });
+                })
+                .catch(error => {
+                    chunk.forEach(id => batch.get(id).forEach(({reject}) => reject(error)));
+                });
+        }
+    }
+
+    function get(id) {
+        id = String(id);
+        if (cache.has(id)) {
+            return Promise.resolve(cache.get(id));
+        }
+        return new Promise((resolve, reject) => {
+            if (!pending.has(id)) {
+                pending.set(id, []);
+            }
+            pending.get(id).push({resolve, reject});
+            if (!scheduled) {
+                scheduled = true;
+                setTimeout(flush, 0);
+            }
+        });
+    }
+
+    function prefetch(ids) {
+        return Promise.all(ids.filter(Boolean).map(get));
+    }
+
+    // Guarda un producto obtenido por otra vía (p. ej. la búsqueda por texto)
+    function prime(product) {
+        cache.set(String(product.id), product);
+    }
+
+    // Actualiza campos de un producto ya obtenido (p. ej. desde el canal de cambios)
+    function update(id, fields) {
+        const product = cache.get(String(id));
+        if (product) {
+            Object.assign(product, fields);
+        }
+        return product || null;
+    }
+
+    // Sin id se descarta toda la caché
+    function invalidate(id) {
+        if (id === undefined) {
+            cache.clear();
+        } else {
+            cache.delete(String(id));
+        }
+    }
+
+    window.ProductLookup = {configure, get, prefetch, prime, update, invalidate};
+})(window);
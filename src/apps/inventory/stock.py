@@ -0,0 +1,114 @@
+# src/apps/inventory/stock.py
+"""
+Servicio único de mutación de stock.
+
+Todas las entradas y salidas de inventario (movimientos, despachos,
+recepciones, devoluciones, órdenes) deben pasar por aquí. Cada llamada:
+
+1. agrega las cantidades por producto,
+2. bloquea las filas afectadas en orden ascendente de id (mismo orden en
+   todos los flujos, así dos transacciones concurrentes no se bloquean
+   mutuamente en orden inverso), y
+3. aplica un único ``UPDATE ... WHERE current_stock + delta >= 0 RETURNING``
+   para todo el lote.
+
+Si algún producto no tiene stock suficiente se lanza ``InsufficientStock``
+y, como la operación corre dentro de ``transaction.atomic``, no se aplica
+ningún cambio.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.changefeed.events import publish_stock
+from apps.httpcache.versions import bump
+
+from .categories import apply_stock_deltas
+from .lookup import invalidate_products
+from .models import Product
+
+
+class InsufficientStock(ValidationError):
+    """Stock insuficiente para uno o más productos del lote."""
+
+    def __init__(self, shortages):
+        # shortages: [(product, disponible, solicitado), ...]
+        self.shortages = shortages
+        super().__init__([
+            f"Stock insuficiente para {product.description}. "
+            f"Stock actual: {available}, solicitado: {requested}"
+            for product, available, requested in shortages
+        ])
+
+
+def _aggregate(lines, sign):
+    deltas = defaultdict(int)
+    for product_id, quantity in lines:
+        deltas[getattr(product_id, 'pk', product_id)] += sign * quantity
+    return deltas
+
+
+def adjust_stock(deltas):
+    """
+    Aplica ``{product_id: delta}`` (delta positivo suma, negativo resta) y
+    devuelve ``{product_id: nuevo_stock}``.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+
+    ordered = sorted(deltas)
+    table = connection.ops.quote_name(Product._meta.db_table)
+    values = ', '.join(['(%s, %s)'] * len(ordered))
+    params = [value for pk in ordered for value in (pk, deltas[pk])]
+
+    with transaction.atomic():
+        if len(ordered) > 1:
+            # Orden de bloqueo consistente para evitar interbloqueos
+            list(Product.objects.select_for_update().filter(pk__in=ordered).order_by('pk').values_list('pk'))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH v (id, delta) AS (VALUES {values})
+                UPDATE {table}
+                SET current_stock = {table}.current_stock + v.delta, updated_at = %s
+                FROM v
+                WHERE {table}.id = v.id AND {table}.current_stock + v.delta >= 0
+                RETURNING {table}.id, {table}.current_stock, {table}.min_stock, {table}.warehouse_id,
+                          {table}.category, {table}.unit_price
+                """,
+                params + [timezone.now()],
+            )
+            rows = cursor.fetchall()
+            levels = {row[0]: row[1] for row in rows}
+
+        if len(levels) != len(ordered):
+            missing = [pk for pk in ordered if pk not in levels]
+            products = Product.objects.in_bulk(missing)
+            shortages = [
+                (products[pk], products[pk].current_stock, -deltas[pk])
+                for pk in missing if pk in products
+            ]
+            if len(shortages) != len(missing):
+                raise Product.DoesNotExist(f"Productos inexistentes: {sorted(set(missing) - set(products))}")
+            raise InsufficientStock(shortages)
+
+        apply_stock_deltas([(pk, category, price) for pk, _, _, _, category, price in rows], deltas)
+        invalidate_products(levels)
+        bump(Product, ids=levels)
+        publish_stock([row[:4] for row in rows])
+
+    return levels
+
+
+def add_stock(lines):
+    """Suma stock. ``lines``: iterable de ``(producto o id, cantidad)``."""
+    return adjust_stock(_aggregate(lines, 1))
+
+
+def remove_stock(lines):
+    """Descuenta stock; lanza ``InsufficientStock`` si alguna línea no alcanza."""
+    return adjust_stock(_aggregate(lines, -1))
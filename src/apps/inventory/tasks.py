@@ -0,0 +1,15 @@
+# src/apps/inventory/tasks.py
+from django.utils import timezone
+
+from apps.jobs.queue import task
+from core.db_router import use_replica
+
+@task('inventory.report_pdf')
+def report_pdf(job):
+    from .views import render_inventory_report_pdf
+
+    job.set_progress(10, 'Generando reporte de inventario')
+    with use_replica():
+        pdf = render_inventory_report_pdf()
+    url = job.save_file(f'inventory_report_{timezone.localdate():%Y%m%d}.pdf', pdf)
+    return {'file_url': url, 'redirect_url': url}
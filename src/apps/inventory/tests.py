@@ -1,3 +1,341 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import random
+import threading
+import unittest
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from apps.httpcache import bus
+from apps.httpcache.versions import bump
+from apps.movements.models import Movement
+from apps.quotations.models import Quotation
+
+from . import snapshot
+from .categories import rebuild_categories
+from .models import Category, Client, Product
+from .stock import InsufficientStock, add_stock, adjust_stock, remove_stock
+
+
+def make_product(code, stock=0, **fields):
+    fields.setdefault('unit_price', 10)
+    return Product.objects.create(
+        product_code=code, description=f'Producto {code}', unit='UND', current_stock=stock, **fields,
+    )
+
+
+class AdjustStockTests(TestCase):
+
+    def test_applies_aggregated_lines(self):
+        a, b = make_product('A', 10), make_product('B', 5)
+        levels = remove_stock([(a, 3), (a.pk, 2), (b, 5)])
+        self.assertEqual(levels, {a.pk: 5, b.pk: 0})
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.current_stock, b.current_stock), (5, 0))
+
+    def test_zero_delta_is_ignored(self):
+        a = make_product('A', 4)
+        self.assertEqual(add_stock([(a, 0)]), {})
+        a.refresh_from_db()
+        self.assertEqual(a.current_stock, 4)
+
+    def test_insufficient_stock_changes_nothing(self):
+        a, b = make_product('A', 10), make_product('B', 1)
+        with self.assertRaises(InsufficientStock) as raised:
+            remove_stock([(a, 4), (b, 2)])
+        self.assertEqual([(p.pk, available, requested) for p, available, requested in raised.exception.shortages],
+                         [(b.pk, 1, 2)])
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.current_stock, b.current_stock), (10, 1))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentStockTests(TransactionTestCase):
+    """Escritores en paralelo, cada uno con su conexión: no se pierde ninguna actualización."""
+
+    WORKERS = 8
+
+    def run_workers(self, target):
+        barrier = threading.Barrier(self.WORKERS)
+        errors = []
+
+        def run(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_parallel_adjustments_keep_exact_totals(self):
+        products = [make_product(f'C{i}', 50) for i in range(4)]
+        ids = [product.pk for product in products]
+        applied = Counter()
+        lock = threading.Lock()
+
+        def writer(index):
+            rng = random.Random(index)
+            for _ in range(50):
+                deltas = {pk: rng.randint(-8, 6) for pk in rng.sample(ids, 3)}
+                try:
+                    levels = adjust_stock(deltas)
+                except InsufficientStock:
+                    continue
+                assert all(level >= 0 for level in levels.values()), levels
+                with lock:
+                    applied.update(deltas)
+
+        self.run_workers(writer)
+        for product in Product.objects.filter(pk__in=ids):
+            self.assertGreaterEqual(product.current_stock, 0)
+            self.assertEqual(product.current_stock, 50 + applied[product.pk])
+
+    def test_parallel_removals_stop_at_zero(self):
+        product = make_product('D', 20)
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def writer(index):
+            for _ in range(5):
+                try:
+                    remove_stock([(product.pk, 1)])
+                    outcome = 'ok'
+                except InsufficientStock:
+                    outcome = 'short'
+                with lock:
+                    outcomes[outcome] += 1
+
+        self.run_workers(writer)
+        product.refresh_from_db()
+        self.assertEqual(product.current_stock, 0)
+        self.assertEqual(outcomes, {'ok': 20, 'short': self.WORKERS * 5 - 20})
+
+
+def category_totals():
+    """Totales por categoría, sin las filas que quedaron en cero."""
+    return {
+        name: (count, units, value)
+        for name, count, units, value in Category.objects.values_list(
+            'name', 'product_count', 'stock_units', 'stock_value')
+        if count or units or value
+    }
+
+
+class CategoryCounterTests(TestCase):
+
+    def assertMatchesRebuild(self):
+        incremental = category_totals()
+        rebuild_categories()
+        self.assertEqual(incremental, category_totals())
+
+    def test_counters_follow_product_changes(self):
+        a = make_product('A', 10, category='Ferretería', unit_price='2.50')
+        make_product('B', 3, category='Ferretería', unit_price='4.00')
+        self.assertEqual(category_totals()['Ferretería'], (2, 13, 37))
+        self.assertMatchesRebuild()
+
+        a.current_stock, a.unit_price = 7, '3.00'
+        a.save()
+        self.assertMatchesRebuild()
+
+        a.category = 'Pinturas'
+        a.save()
+        self.assertEqual(category_totals()['Pinturas'], (1, 7, 21))
+        self.assertMatchesRebuild()
+
+        # update_fields: los campos no guardados conservan el valor persistido
+        a.current_stock, a.category = 99, 'Otra'
+        a.save(update_fields=['current_stock'])
+        self.assertMatchesRebuild()
+
+        remove_stock([(a, 50)])
+        self.assertMatchesRebuild()
+
+        a.delete()
+        self.assertNotIn('Pinturas', category_totals())
+        self.assertMatchesRebuild()
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentCategoryCounterTests(TransactionTestCase):
+
+    def test_concurrent_saves_keep_counters_exact(self):
+        product = make_product('E', 5, category='A')
+        barrier = threading.Barrier(6)
+        errors = []
+
+        def writer(index):
+            rng = random.Random(index)
+            try:
+                barrier.wait()
+                for _ in range(15):
+                    # Cada guardado parte de una lectura propia, como dos formularios abiertos a la vez
+                    stale = Product.objects.get(pk=product.pk)
+                    stale.category = rng.choice('ABC')
+                    stale.unit_price = rng.randint(1, 9)
+                    stale.save()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(index,)) for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        incremental = category_totals()
+        rebuild_categories()
+        self.assertEqual(incremental, category_totals())
+
+
+class PopulateProductsTests(TestCase):
+    """Datos sintéticos con volúmenes mínimos: COPY en PostgreSQL, ``bulk_create`` en el resto."""
+
+    VOLUMES = {
+        'products': 30, 'movements': 60, 'documents': 8, 'suppliers': 3, 'clients': 12,
+        'warehouses': 2, 'users': 2, 'max_items': 4, 'days': 60,
+    }
+
+    def populate(self):
+        call_command('populate_products', until=datetime.date(2026, 1, 31), stdout=io.StringIO(), **self.VOLUMES)
+
+        self.assertEqual(Product.objects.filter(product_code__startswith='SYN-').count(), 30)
+        self.assertEqual(Movement.objects.count(), 60)
+        self.assertEqual(Quotation.objects.count(), 8)
+        # Los None se guardan como NULL y los textos vacíos como ''
+        self.assertFalse(User.objects.filter(username__startswith='syn_', last_login__isnull=False).exists())
+        self.assertTrue(Client.objects.filter(email__isnull=True).exists())
+        self.assertFalse(Quotation.objects.filter(dispatch_note__isnull=False).exists())
+        pending = Quotation.objects.exclude(status__in=['APPROVED', 'CONVERTED'])
+        self.assertTrue(pending.exists())
+        self.assertEqual(Quotation.objects.filter(date_approved__isnull=True).count(), pending.count())
+        self.assertTrue(Movement.objects.filter(source_id__isnull=True, reference='').exists())
+        self.assertFalse(Movement.objects.filter(reference__isnull=True).exists())
+        self.assertEqual(sum(Category.objects.values_list('product_count', flat=True)), 30)
+
+        # Las secuencias siguen a los ids explícitos
+        self.assertGreater(make_product('NUEVO').pk, Product.objects.exclude(product_code='NUEVO').latest('pk').pk)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'COPY solo existe en PostgreSQL')
+    def test_copy(self):
+        self.populate()
+
+    @unittest.skipIf(connection.vendor == 'postgresql', 'En PostgreSQL se usa COPY')
+    def test_bulk_create(self):
+        self.populate()
+
+
+class StockSnapshotTests(TestCase):
+    """El refresco incremental produce los mismos bytes que una reconstrucción completa."""
+
+    def setUp(self):
+        # Bus local (sin hilo de escucha) y bloques de 2 filas para tocar varios bloques
+        for patcher in (mock.patch.object(bus, '_bus', bus.LocalBus()), mock.patch.object(snapshot, 'BLOCK_SIZE', 2)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.products = {code: make_product(code, stock) for code, stock in zip('ABCDEFG', range(0, 70, 10))}
+        self.snapshot = snapshot.StockSnapshot().refresh(force=True)
+
+    def change(self, mutate):
+        """Aplica ``mutate`` (confirmando sus bumps) y compara ``refresh()`` con ``refresh(force=True)``."""
+        built_at = self.snapshot.built_at
+        with self.captureOnCommitCallbacks(execute=True):
+            mutate()
+        self.snapshot.expire()
+        etag, body = self.snapshot.refresh().current()
+
+        rebuilt = snapshot.StockSnapshot().refresh(force=True)
+        self.assertEqual(body, rebuilt.body)
+        self.assertEqual(etag, rebuilt.etag)
+        return self.snapshot.built_at != built_at
+
+    def test_stock_changes_update_blocks_in_place(self):
+        a, e = self.products['A'], self.products['E']
+        etag = self.snapshot.etag
+        self.assertFalse(self.change(lambda: adjust_stock({a.pk: 5, e.pk: -40})))
+        self.assertNotEqual(self.snapshot.etag, etag)
+
+        def lower_minimum():
+            e.refresh_from_db()
+            e.min_stock = 50
+            e.save()
+
+        self.assertFalse(self.change(lower_minimum))
+        self.assertIn(b'"LOW STOCK"', self.snapshot.body)
+
+    def test_inserts_deletes_and_code_changes_rebuild(self):
+        self.assertTrue(self.change(lambda: make_product('AA', 3)))
+        self.assertTrue(self.change(lambda: self.products['C'].delete()))
+
+        def rename():
+            product = self.products['B']
+            product.product_code = 'Z'
+            product.save()
+
+        self.assertTrue(self.change(rename))
+        self.assertEqual([row['product_code'] for row in json.loads(self.snapshot.body)],
+                         ['A', 'AA', 'D', 'E', 'F', 'G', 'Z'])
+
+    def test_late_commit_within_margin_is_applied(self):
+        # Transacción que empezó antes de la última lectura y confirmó después
+        g = self.products['G']
+        late = self.snapshot.watermark - timedelta(seconds=1)
+
+        def late_update():
+            Product.objects.filter(pk=g.pk).update(current_stock=1, updated_at=late)
+            bump(Product, ids=[g.pk])
+
+        self.assertFalse(self.change(late_update))
+
+    def test_unchanged_version_keeps_body(self):
+        body = self.snapshot.body
+        self.snapshot.expire()
+        self.assertIs(self.snapshot.refresh().body, body)
+
+
+class StockAPIViewTests(TestCase):
+    url = '/api/inventario/stock/'
+
+    def setUp(self):
+        for patcher in (mock.patch.object(bus, '_bus', bus.LocalBus()),
+                        mock.patch.object(snapshot, '_snapshot', snapshot.StockSnapshot())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.product = make_product('A', 5)
+        self.client.force_login(User.objects.create_user('almacen'))
+
+    def test_etag_revalidation(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['current_stock'], 5)
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            add_stock([(self.product, 2)])
+        snapshot._snapshot.expire()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['current_stock'], 7)
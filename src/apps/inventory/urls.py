@@ -15,5 +15,4 @@ urlpatterns = [
     path('reporte/', views.InventoryReportView.as_view(), name='report'),
     path('solicitar/<int:pk>/', views.request_replenishment, name='request'),
     path('reporte-pdf/', InventoryReportPDFView.as_view(), name='inventory_report_pdf'),
-    path('products/<int:pk>/', views.product_detail_api, name='product-detail-api'),
 ]
\ No newline at end of file
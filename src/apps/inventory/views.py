@@ -2,7 +2,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
-from .models import Product, Supplier, Warehouse  # <-- AÑADE Supplier y Warehouse AQUÍ
+from .models import Category, Product, Supplier, Warehouse  # <-- AÑADE Supplier y Warehouse AQUÍ
 from .forms import ProductForm
 from django.db.models import F, Sum, Avg, Count, Q  # <-- Simplifica los imports
 from django.contrib import messages
@@ -10,10 +10,13 @@ from django.db.models.functions import Lower
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
-from django.template.loader import render_to_string
-from weasyprint import HTML
 from django.views import View
+from apps.jobs.queue import enqueue
+from apps.jobs.views import async_requested, job_accepted
+from apps.httpcache.decorators import ConditionalMixin
+from core.db_router import ReplicaReadMixin, replica_reads
 
+@replica_reads
 def dashboard_view(request):
     # Estadísticas básicas
     total_products = Product.objects.count()
@@ -33,9 +36,7 @@ def dashboard_view(request):
         avg=Avg('current_stock')
     )['avg'] or 0
     
-    categories_count = Product.objects.exclude(
-        Q(category__isnull=True) | Q(category='')
-    ).values('category').distinct().count()
+    categories_count = Category.objects.filter(product_count__gt=0).count()
     
     suppliers_count = Supplier.objects.count()  # <-- Ahora funciona
     warehouses_count = Warehouse.objects.count()  # <-- Ahora funciona
@@ -68,8 +69,9 @@ def dashboard_view(request):
     }
     return render(request, 'inventory/dashboard.html', context)
 
-class ProductListView(LoginRequiredMixin, ListView):
+class ProductListView(LoginRequiredMixin, ReplicaReadMixin, ConditionalMixin, ListView):
     model = Product
+    cache_models = ('inventory.Product',)
     template_name = 'inventory/product_list.html'
     context_object_name = 'products'
     paginate_by = 25
@@ -110,13 +112,14 @@ class ProductListView(LoginRequiredMixin, ListView):
         )['total'] or 0
         context['total_value'] = total_value
         
-        # Categorías únicas para el filtro
-        context['categories'] = Product.objects.exclude(category='').values_list('category', flat=True).distinct()
+        # Categorías para el filtro (dimensión Category, sin recorrer los productos)
+        context['categories'] = Category.objects.filter(product_count__gt=0).values_list('name', flat=True)
         
         return context
 
-class ProductDetailView(LoginRequiredMixin, DetailView):
+class ProductDetailView(LoginRequiredMixin, ConditionalMixin, DetailView):
     model = Product
+    cache_models = ('inventory.Product', 'inventory.Supplier', 'inventory.Warehouse')
     template_name = 'inventory/product_detail.html'
     context_object_name = 'product'
 
@@ -137,21 +140,39 @@ class ProductDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'inventory/product_confirm_delete.html'
     success_url = reverse_lazy('inventory:list')
 
-class InventoryReportView(LoginRequiredMixin, TemplateView):
+class InventoryReportView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     template_name = 'inventory/report.html'
 
-class InventoryReportPDFView(LoginRequiredMixin, View):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Resumen por categoría desde la dimensión Category: O(categorías)
+        context['categories'] = Category.objects.filter(product_count__gt=0)
+        return context
+
+def render_inventory_report_pdf():
+    """Genera el PDF del reporte de inventario (vista y tarea en segundo plano)."""
+    from core.pdf import render_pdf
+
+    return render_pdf(
+        'inventory/report_pdf.html',
+        {
+            'products': Product.objects.all(),
+            'categories': Category.objects.filter(product_count__gt=0),
+        },
+        stylesheets=['inventory/pdf/report.css'],
+    )
+
+
+class InventoryReportPDFView(LoginRequiredMixin, ReplicaReadMixin, View):
     """Vista básica para reporte PDF"""
     
     def get(self, request, *args, **kwargs):
-        products = Product.objects.all()
-        
-        html_string = render_to_string('inventory/report_pdf.html', {
-            'products': products
-        })
-        
-        html = HTML(string=html_string)
-        pdf = html.write_pdf()
+        # Con muchos productos el reporte es lento: ?async=1 lo genera en el worker
+        if async_requested(request):
+            job = enqueue('inventory.report_pdf', user=request.user)
+            return job_accepted(request, job, 'Generando el reporte de inventario...')
+
+        pdf = render_inventory_report_pdf()
         
         response = HttpResponse(pdf, content_type='application/pdf')
         response['Content-Disposition'] = 'filename="inventory_report.pdf"'
@@ -175,24 +196,3 @@ def request_replenishment(request, pk):
         messages.error(request, f'Error al enviar la solicitud: {str(e)}')
     
     return redirect('inventory:detail', pk=product.pk)
-
-from django.http import JsonResponse
-from django.shortcuts import get_object_or_404
-from .models import Product
-
-def product_detail_api(request, pk):
-    """
-    Vista de API que devuelve los detalles de un producto en formato JSON.
-    Se utiliza para cargar dinámicamente la información del producto en el formulario de movimiento.
-    """
-    if request.method == 'GET':
-        product = get_object_or_404(Product, pk=pk)
-        data = {
-            'current_stock': product.current_stock,
-            'min_stock': product.min_stock,
-            'location': product.location,
-        }
-        return JsonResponse(data)
-    else:
-        # Si no es una solicitud GET, devuelve un error 405 (Método no permitido)
-        return JsonResponse({'error': 'Método no permitido'}, status=405)
\ No newline at end of file
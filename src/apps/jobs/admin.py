@@ -0,0 +1,19 @@
+# src/apps/jobs/admin.py
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'queue', 'status', 'progress', 'attempts', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'queue', 'task')
+    search_fields = ('task', 'error')
+    readonly_fields = [field.name for field in Job._meta.fields]
+    actions = ['retry_jobs']
+
+    @admin.action(description='Reintentar los trabajos seleccionados')
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.filter(status='FAILED').update(
+            status='QUEUED', attempts=0, run_after=timezone.now(), error='', finished_at=None,
+        )
+        self.message_user(request, f'{updated} trabajos devueltos a la cola.')
@@ -0,0 +1,8 @@
+# src/apps/jobs/apps.py
+from django.apps import AppConfig
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+    label = 'jobs'
+    verbose_name = 'Tareas en segundo plano'
@@ -0,0 +1,103 @@
+# apps/jobs/management/commands/bench_settings.py
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ('development', 'production')
+
+# Proceso nuevo con el perfil de DJANGO_ENV: mismas páginas, mismo usuario
+CHILD = '''
+import json, resource, sys, time
+import django
+django.setup()
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+
+requests, paths, username = int(sys.argv[1]), sys.argv[2].split(','), sys.argv[3]
+host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'localhost')
+users = get_user_model().objects.filter(is_active=True)
+user = users.get(username=username) if username else users.order_by('pk').first()
+client = Client(HTTP_HOST=host)
+client.force_login(user)
+
+counts = {'queries': 0, 'session_writes': 0}
+def count(execute, sql, params, many, context):
+    counts['queries'] += 1
+    if 'django_session' in sql and sql.lstrip().upper().startswith(('UPDATE', 'INSERT')):
+        counts['session_writes'] += 1
+    return execute(sql, params, many, context)
+
+for path in paths:
+    client.get(path)  # Calentamiento: conexión, plantillas, cachés del proceso
+
+timings, statuses = [], set()
+with connection.execute_wrapper(count):
+    for i in range(requests):
+        started = time.perf_counter()
+        response = client.get(paths[i % len(paths)])
+        timings.append(time.perf_counter() - started)
+        statuses.add(response.status_code)
+
+print(json.dumps({
+    'debug': settings.DEBUG, 'timings': timings, 'statuses': sorted(statuses), **counts,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+'''
+
+class Command(BaseCommand):
+    help = (
+        'Costo por petición con el perfil de desarrollo y con el de producción (DJANGO_ENV=production): '
+        'latencia, consultas y escrituras de sesión. El perfil de producción requiere collectstatic. '
+        'Las peticiones pasan por el cliente de pruebas (WSGI, un solo hilo) y no por core.asgi: no miden '
+        'el servidor ASGI con el que se despliega, donde cada petición abre su propia conexión a la base '
+        'de datos (CONN_MAX_AGE no la reutiliza).'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones medidas por perfil')
+        parser.add_argument('--paths', default='/inventario/dashboard/,/notas-despacho/,/panel/',
+                            help='Rutas separadas por comas, recorridas en orden')
+        parser.add_argument('--user', default='', help='Usuario de la sesión (por defecto, el primero activo)')
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in PROFILES:
+            env = {**os.environ, 'DJANGO_ENV': profile}
+            # Solo para este proceso de medición; en producción la clave viene del entorno
+            env.setdefault('DJANGO_SECRET_KEY', secrets.token_urlsafe(50))
+            process = subprocess.run(
+                [sys.executable, '-c', CHILD, str(options['requests']), options['paths'], options['user']],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if process.returncode:
+                raise CommandError(f'El perfil {profile} falló:\n{process.stderr[-2000:]}')
+            results[profile] = json.loads(process.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(f"{options['requests']} peticiones por perfil sobre {options['paths']}")
+        self.stdout.write(f"{'perfil':<12} {'DEBUG':>5} {'p50 ms':>8} {'p95 ms':>8} {'consultas':>10} {'ses. escr.':>10} {'RSS MB':>8}")
+        for profile, result in results.items():
+            timings = sorted(result['timings'])
+            total = len(timings)
+            self.stdout.write(
+                f"{profile:<12} {str(result['debug']):>5} "
+                f'{statistics.median(timings) * 1000:8.2f} {timings[int(total * 0.95) - 1] * 1000:8.2f} '
+                f"{result['queries'] / total:10.2f} {result['session_writes'] / total:10.2f} {result['rss_mb']:8.1f}"
+            )
+            if result['statuses'] != [200]:
+                self.stdout.write(self.style.WARNING(f"  {profile}: respuestas {result['statuses']}"))
+
+        development = statistics.median(results['development']['timings'])
+        production = statistics.median(results['production']['timings'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Producción: {(production - development) * 1000:+.2f} ms por petición '
+            f'({development / production:.2f}x la velocidad de desarrollo)'
+        ))
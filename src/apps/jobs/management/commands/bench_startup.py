@@ -0,0 +1,72 @@
+# apps/jobs/management/commands/bench_startup.py
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Proceso nuevo: arranque de la aplicación WSGI y primera petición, con las fases medidas
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+client = Client(HTTP_HOST=sys.argv[2])
+application = get_wsgi_application()
+ready = time.perf_counter()
+response = client.get(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({
+    'status': response.status_code,
+    'setup': setup - started, 'wsgi': ready - setup, 'first_request': done - ready,
+    'weasyprint': 'weasyprint' in sys.modules,
+}))
+'''
+
+class Command(BaseCommand):
+    help = 'Benchmark de arranque: tiempo desde el inicio del intérprete hasta responder la primera petición'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Procesos nuevos a medir')
+        parser.add_argument('--path', default='/', help='Ruta de la primera petición')
+        parser.add_argument('--check', action='store_true',
+                            help='Falla si la mediana supera STARTUP_FIRST_REQUEST_BUDGET_MS')
+
+    def handle(self, *args, **options):
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        totals, phases = [], {'setup': [], 'wsgi': [], 'first_request': []}
+        for _ in range(max(1, options['runs'])):
+            started = time.perf_counter()
+            process = subprocess.run(
+                [sys.executable, '-c', CHILD, options['path'], host],
+                cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+            total = time.perf_counter() - started
+            if process.returncode:
+                raise CommandError(f'El proceso de arranque falló:\n{process.stderr[-2000:]}')
+            result = json.loads(process.stdout.strip().splitlines()[-1])
+            totals.append(total)
+            for name in phases:
+                phases[name].append(result[name])
+
+        median_ms = statistics.median(totals) * 1000
+        self.stdout.write(
+            f"{len(totals)} arranques, GET {options['path']} -> {result['status']}: "
+            f'mediana {median_ms:.0f} ms, mínimo {min(totals) * 1000:.0f} ms'
+        )
+        for name, values in phases.items():
+            self.stdout.write(f'  {name:<14} {statistics.median(values) * 1000:8.1f} ms')
+        if result['weasyprint']:
+            self.stdout.write(self.style.WARNING('  WeasyPrint se cargó antes de necesitarlo'))
+
+        budget_ms = settings.STARTUP_FIRST_REQUEST_BUDGET_MS
+        if options['check'] and median_ms > budget_ms:
+            raise CommandError(f'Arranque hasta la primera petición: {median_ms:.0f} ms > {budget_ms} ms')
+        self.stdout.write(self.style.SUCCESS(f'Arranque hasta la primera petición: {median_ms:.0f} / {budget_ms} ms'))
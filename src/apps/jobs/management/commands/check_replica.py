@@ -0,0 +1,55 @@
+# apps/jobs/management/commands/check_replica.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from apps.inventory.models import Product
+from core.db_router import PRIMARY, REPLICA, replica_configured, replica_lag, replica_usable, routing, use_replica
+
+class Command(BaseCommand):
+    help = (
+        'Estado de la réplica de lectura: retraso, tiempo hasta que aplica una escritura del primario '
+        'y a qué base envía core.db_router las lecturas en cada caso'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=float, default=10, help='Segundos máximos de espera a la réplica')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No hay réplica configurada (DB_REPLICA_HOST).')
+
+        lag = replica_lag()
+        if lag is None:
+            raise CommandError('La réplica no responde o no ha aplicado ninguna transacción.')
+        self.stdout.write(f'Retraso: {lag:.3f} s (límite {settings.DATABASE_REPLICA_MAX_LAG:g} s)')
+
+        # Un mensaje en el WAL (sin tocar tablas) y espera a que la réplica lo aplique
+        with connections[PRIMARY].cursor() as cursor:
+            cursor.execute("SELECT pg_logical_emit_message(false, 'check_replica', '')")
+            (lsn,) = cursor.fetchone()
+        started = time.perf_counter()
+        with connections[REPLICA].cursor() as cursor:
+            while True:
+                cursor.execute('SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn', [lsn])
+                if cursor.fetchone()[0]:
+                    break
+                if time.perf_counter() - started > options['timeout']:
+                    raise CommandError(f"La réplica no aplicó {lsn} en {options['timeout']:g} s.")
+                time.sleep(0.01)
+        self.stdout.write(f'Escritura visible en la réplica en {(time.perf_counter() - started) * 1000:.1f} ms')
+
+        with routing() as state:
+            self.stdout.write(f'Petición sin marcar:        {router.db_for_read(Product)}')
+            state.replica = True
+            self.stdout.write(f'Vista de solo lectura:      {router.db_for_read(Product)}')
+            router.db_for_write(Product)
+            self.stdout.write(f'Tras escribir:              {router.db_for_read(Product)}')
+        with use_replica():
+            self.stdout.write(f'Reporte o exportación:      {router.db_for_read(Product)}')
+
+        if not replica_usable():
+            raise CommandError('La réplica supera el retraso permitido: las lecturas van al primario.')
+        self.stdout.write(self.style.SUCCESS('Réplica en uso'))
@@ -0,0 +1,76 @@
+# apps/jobs/management/commands/profile_imports.py
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+SETUP = 'import django; django.setup()'
+URLS = 'from django.urls import get_resolver; get_resolver().url_patterns'
+
+class Command(BaseCommand):
+    help = (
+        'Perfil de importación al arrancar (resumen de python -X importtime): paquetes y módulos más '
+        'costosos, y comprobación del presupuesto STARTUP_IMPORT_BUDGET_MS y de STARTUP_FORBIDDEN_IMPORTS'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urls', action='store_true',
+                            help='Incluir la carga de las URLs (vistas y admin), como en la primera petición')
+        parser.add_argument('--top', type=int, default=15, help='Filas de cada tabla')
+        parser.add_argument('--check', action='store_true',
+                            help='Falla si se supera el presupuesto o se importa un módulo prohibido')
+
+    def handle(self, *args, **options):
+        code = f'{SETUP}; {URLS}' if options['urls'] else SETUP
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(f'El proceso de perfilado falló:\n{process.stderr[-2000:]}')
+
+        modules = []  # (módulo, propio µs, acumulado µs, nivel)
+        for line in process.stderr.splitlines():
+            match = IMPORTTIME.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+
+        packages = Counter()
+        for name, self_us, _, _ in modules:
+            packages[name.split('.')[0]] += self_us
+        total_ms = sum(packages.values()) / 1000
+        top = options['top']
+
+        self.stdout.write(f"Importaciones en {'django.setup() + URLs' if options['urls'] else 'django.setup()'}: "
+                          f'{len(modules)} módulos, {total_ms:.1f} ms')
+        self.stdout.write('\nPaquetes (tiempo propio de sus módulos):')
+        for package, self_us in packages.most_common(top):
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {package}')
+        self.stdout.write('\nMódulos (tiempo acumulado, importados directamente desde el arranque):')
+        for name, _, cumulative_us, _ in sorted(
+            (module for module in modules if module[3] == 0), key=lambda module: -module[2],
+        )[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+
+        loaded = {name for name, _, _, _ in modules}
+        forbidden = [] if options['urls'] else [
+            name for name in settings.STARTUP_FORBIDDEN_IMPORTS
+            if name in loaded or any(module.startswith(name + '.') for module in loaded)
+        ]
+        if forbidden:
+            self.stdout.write(self.style.WARNING(f"\nImportados al arrancar (deben ser diferidos): {', '.join(forbidden)}"))
+
+        budget_ms = settings.STARTUP_IMPORT_BUDGET_MS['urls' if options['urls'] else 'setup']
+        over_budget = total_ms > budget_ms
+        if over_budget:
+            self.stdout.write(self.style.WARNING(f'\nPresupuesto superado: {total_ms:.1f} ms > {budget_ms} ms'))
+        if options['check'] and (forbidden or over_budget):
+            raise CommandError('El arranque no cumple el presupuesto de importación.')
+        self.stdout.write(self.style.SUCCESS(f'\nPresupuesto de importación: {total_ms:.1f} / {budget_ms} ms'))
@@ -0,0 +1,73 @@
+# apps/jobs/management/commands/run_worker.py
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.jobs.queue import discover_tasks
+from apps.jobs.worker import run_worker
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos encolados (PDFs, conversiones, entregas) con un pool de hilos o procesos'
+    # Las comprobaciones del sistema cargan las URLs (y con ellas el admin);
+    # se ejecutan en el despliegue con ``manage.py check``, no en cada arranque
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOBS_CONCURRENCY,
+                            help='Cantidad de workers en paralelo')
+        parser.add_argument('--pool', choices=['thread', 'process'], default=settings.JOBS_POOL,
+                            help='thread: hilos en este proceso; process: un proceso por worker')
+        parser.add_argument('--queue', action='append', dest='queues',
+                            help='Cola a atender (repetible). Por defecto: default')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+                            help='Segundos de espera cuando la cola está vacía')
+        parser.add_argument('--burst', action='store_true', help='Terminar cuando la cola quede vacía')
+        parser.add_argument('--max-jobs', type=int, help='Trabajos por worker antes de terminar')
+
+    def handle(self, *args, **options):
+        # Importar las tareas antes de crear hilos o procesos hijos
+        discover_tasks()
+
+        worker_options = {
+            'queues': options['queues'] or ['default'],
+            'poll_interval': options['poll_interval'],
+            'burst': options['burst'],
+            'max_jobs': options['max_jobs'],
+        }
+        concurrency = max(1, options['concurrency'])
+
+        if options['pool'] == 'process':
+            context = multiprocessing.get_context('fork')
+            stop_event = context.Event()
+            # Las conexiones abiertas no deben compartirse con los procesos hijos
+            connections.close_all()
+            workers = [
+                context.Process(target=run_worker, args=(stop_event,), kwargs={'index': i, **worker_options})
+                for i in range(concurrency)
+            ]
+        else:
+            stop_event = threading.Event()
+            workers = [
+                threading.Thread(target=run_worker, args=(stop_event,), kwargs={'index': i, **worker_options})
+                for i in range(concurrency)
+            ]
+
+        def shutdown(signum, frame):
+            self.stdout.write('Deteniendo workers al terminar los trabajos en curso...')
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(
+            f'Iniciando {concurrency} worker(s) ({options["pool"]}) en las colas: {", ".join(worker_options["queues"])}'
+        )
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS('Workers detenidos.'))
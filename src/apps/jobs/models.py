@@ -0,0 +1,111 @@
+# src/apps/jobs/models.py
+import os
+
+from django.db import models
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from core.downloads import private_storage
+
+class Job(models.Model):
+    """
+    Trabajo encolado en la base de datos y ejecutado por ``manage.py run_worker``.
+
+    ``payload`` son los argumentos (JSON) de la tarea registrada en ``task``;
+    ``result`` lo que la tarea devolvió. Si ``result`` trae ``redirect_url``,
+    la página de la tarea enlaza ahí al terminar (PDF generado, documento
+    creado, etc.).
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'En cola'),
+        ('RUNNING', 'En ejecución'),
+        ('SUCCEEDED', 'Completada'),
+        ('FAILED', 'Fallida'),
+    ]
+
+    task = models.CharField(max_length=100, verbose_name="Tarea")
+    queue = models.CharField(max_length=50, default='default', verbose_name="Cola")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Argumentos")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED', verbose_name="Estado")
+    priority = models.SmallIntegerField(default=0, verbose_name="Prioridad")  # menor = antes
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Intentos")
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name="Intentos máximos")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Ejecutar después de")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Progreso (%)")
+    progress_message = models.CharField(max_length=255, blank=True, verbose_name="Mensaje de progreso")
+    result = models.JSONField(null=True, blank=True, verbose_name="Resultado")
+    error = models.TextField(blank=True, verbose_name="Error")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Creado por")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado en")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Iniciado en")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Último latido")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finalizado en")
+
+    class Meta:
+        verbose_name = "Tarea"
+        verbose_name_plural = "Tareas"
+        ordering = ['-created_at']
+        indexes = [
+            # Búsqueda del siguiente trabajo listo (run_worker)
+            models.Index(fields=['queue', 'priority', 'run_after'], name='job_ready_idx',
+                         condition=Q(status='QUEUED')),
+            # Recuperación de trabajos de workers caídos
+            models.Index(fields=['heartbeat_at'], name='job_running_idx',
+                         condition=Q(status='RUNNING')),
+            models.Index(fields=['created_by', '-created_at'], name='job_created_by_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.task} ({self.get_status_display()})'
+
+    @property
+    def is_finished(self):
+        return self.status in ('SUCCEEDED', 'FAILED')
+
+    @property
+    def error_summary(self):
+        """Última línea del error (sin el traceback completo)."""
+        lines = self.error.strip().splitlines()
+        return lines[-1] if lines else ''
+
+    def set_progress(self, percent, message=''):
+        """
+        Publica el avance de la tarea. Se escribe con un UPDATE directo para
+        que sea visible aunque la tarea todavía no haya terminado.
+        """
+        self.progress = max(0, min(100, int(percent)))
+        self.progress_message = message[:255]
+        self.heartbeat_at = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progress=self.progress, progress_message=self.progress_message, heartbeat_at=self.heartbeat_at,
+        )
+
+    def save_file(self, filename, content):
+        """
+        Guarda un archivo generado por la tarea en PRIVATE_MEDIA_ROOT/jobs/<id>/
+        y devuelve la URL de descarga protegida (``jobs:download``): solo el
+        usuario que creó la tarea, o el personal, puede obtenerlo.
+        """
+        path = private_storage.save(f'jobs/{self.pk}/{filename}', ContentFile(content))
+        return reverse('jobs:download', args=[self.pk, os.path.basename(path)])
+
+    def to_dict(self):
+        return {
+            'id': self.pk,
+            'task': self.task,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': self.result,
+            'error': self.error_summary,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'redirect_url': (self.result or {}).get('redirect_url') if isinstance(self.result, dict) else None,
+        }
@@ -0,0 +1,165 @@
+# src/apps/jobs/queue.py
+"""
+Cola de trabajos respaldada por la base de datos.
+
+Cada app declara sus tareas en un módulo ``tasks.py``::
+
+    from apps.jobs.queue import task
+
+    @task('dispatch_notes.render_pdf')
+    def render_pdf(job, dispatch_note_id):
+        ...
+        job.set_progress(50, 'Generando PDF')
+        return {'redirect_url': url}
+
+Las vistas llaman a ``enqueue('dispatch_notes.render_pdf', dispatch_note_id=7)``
+y responden de inmediato; ``manage.py run_worker`` reclama los trabajos con
+``SELECT ... FOR UPDATE SKIP LOCKED`` (varios workers no toman el mismo) y
+los reintenta con espera exponencial si fallan. Una tarea que no debe
+reintentarse lanza ``JobFailed``.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_discovered = False
+
+
+class JobFailed(Exception):
+    """Error definitivo: la tarea no se reintenta y el mensaje se muestra al usuario."""
+
+
+class Task:
+    def __init__(self, name, func, queue, max_attempts):
+        self.name = name
+        self.func = func
+        self.queue = queue
+        self.max_attempts = max_attempts
+
+    def __call__(self, job, **payload):
+        return self.func(job, **payload)
+
+
+def task(name, queue='default', max_attempts=None):
+    """Registra ``func(job, **payload)`` como tarea encolable con el nombre ``name``."""
+    def decorator(func):
+        _registry[name] = Task(name, func, queue, max_attempts)
+        return func
+    return decorator
+
+
+def discover_tasks():
+    """Importa el módulo ``tasks`` de cada app instalada (una sola vez)."""
+    global _discovered
+    if not _discovered:
+        autodiscover_modules('tasks')
+        _discovered = True
+    return _registry
+
+
+def get_task(name):
+    return discover_tasks()[name]
+
+
+def enqueue(name, *, user=None, queue=None, priority=0, delay=None, max_attempts=None, **payload):
+    """
+    Encola la tarea ``name`` con ``payload`` (debe ser serializable a JSON) y
+    devuelve el ``Job``. Si se llama dentro de una transacción, el worker solo
+    lo verá cuando esta confirme.
+    """
+    spec = get_task(name)
+    return Job.objects.create(
+        task=name,
+        queue=queue or spec.queue,
+        payload=payload,
+        priority=priority,
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or spec.max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim(worker_name, queues=('default',)):
+    """Reclama el siguiente trabajo listo de ``queues`` y lo marca RUNNING."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED', queue__in=list(queues), run_after__lte=now)
+            .order_by('priority', 'run_after', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'RUNNING'
+        job.attempts += 1
+        job.worker = worker_name
+        job.started_at = job.heartbeat_at = now
+        job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def execute(job):
+    """Ejecuta un trabajo ya reclamado y registra el resultado o el reintento."""
+    try:
+        spec = get_task(job.task)
+    except KeyError:
+        _finish(job, 'FAILED', error=f'Tarea no registrada: {job.task}')
+        return False
+
+    try:
+        result = spec(job, **job.payload)
+    except JobFailed as exc:
+        _finish(job, 'FAILED', error=str(exc))
+        return False
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Falló el trabajo %s (%s), intento %s/%s', job.pk, job.task, job.attempts, job.max_attempts)
+        if job.attempts < job.max_attempts:
+            backoff = settings.JOBS_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status='QUEUED', run_after=timezone.now() + timedelta(seconds=backoff), error=error, worker='',
+            )
+        else:
+            _finish(job, 'FAILED', error=error)
+        return False
+
+    _finish(job, 'SUCCEEDED', result=result)
+    return True
+
+
+def _finish(job, status, result=None, error=''):
+    fields = {'status': status, 'finished_at': timezone.now(), 'error': error}
+    if status == 'SUCCEEDED':
+        fields.update(result=result, progress=100)
+    Job.objects.filter(pk=job.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def requeue_stale(stale_after=None):
+    """
+    Devuelve a la cola los trabajos RUNNING sin latido reciente (worker caído).
+    Cuentan como intento consumido; si ya no quedan intentos se marcan FAILED.
+    """
+    stale_after = stale_after or settings.JOBS_STALE_AFTER
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = Job.objects.filter(status='RUNNING', heartbeat_at__lt=cutoff)
+    error = 'El worker dejó de responder durante la ejecución.'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED', finished_at=timezone.now(), error=error,
+    )
+    requeued = stale.update(status='QUEUED', run_after=timezone.now(), worker='', error=error)
+    return requeued, failed
+
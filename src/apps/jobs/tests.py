@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.downloads import private_storage
+
+from .management.commands.profile_imports import IMPORTTIME, SETUP, URLS
+from .models import Job
+
+
+class JobFileTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(PRIVATE_MEDIA_ROOT=self.root, SENDFILE_BACKEND='django')
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.owner = User.objects.create_user('duenio', password='x')
+        self.job = Job.objects.create(task='inventory.report_pdf', created_by=self.owner)
+
+    def test_file_is_stored_outside_media_root(self):
+        url = self.job.save_file('reporte.pdf', b'%PDF-1.4')
+
+        self.assertEqual(url, f'/tareas/{self.job.pk}/descargar/reporte.pdf')
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'jobs', str(self.job.pk), 'reporte.pdf')))
+        self.assertFalse(os.path.exists(os.path.join(settings.MEDIA_ROOT, 'jobs', str(self.job.pk))))
+        with self.assertRaises(ValueError):
+            private_storage.url(f'jobs/{self.job.pk}/reporte.pdf')
+
+    def test_download_requires_owner_or_staff(self):
+        url = self.job.save_file('reporte.pdf', b'%PDF-1.4')
+
+        self.assertEqual(self.client.get(url).status_code, 302)
+        User.objects.create_user('otro', password='x')
+        self.client.login(username='otro', password='x')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.login(username='duenio', password='x')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=0')
+
+
+class StartupImportTests(SimpleTestCase):
+    """Arranque en un proceso nuevo: presupuesto de importación y módulos diferidos."""
+
+    RUNS = 3
+
+    def start(self, code):
+        """Ejecuta ``code`` con ``-X importtime``; devuelve (ms de importación, módulos cargados)."""
+        code += '; import json, sys; print(json.dumps(sorted(sys.modules)))'
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        self.assertEqual(process.returncode, 0, process.stderr[-2000:])
+        total_us = sum(
+            int(match.group(1)) for match in map(IMPORTTIME.match, process.stderr.splitlines()) if match
+        )
+        return total_us / 1000, set(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    def best_of(self, code):
+        # El mínimo de varios arranques descarta el ruido de una máquina cargada
+        runs = [self.start(code) for _ in range(self.RUNS)]
+        return min(total_ms for total_ms, _ in runs), runs[0][1]
+
+    def test_setup_skips_forbidden_imports(self):
+        _, loaded = self.start(SETUP)
+        forbidden = [
+            name for name in settings.STARTUP_FORBIDDEN_IMPORTS
+            if name in loaded or any(module.startswith(name + '.') for module in loaded)
+        ]
+        self.assertEqual(forbidden, [])
+
+    def test_setup_within_budget(self):
+        total_ms, _ = self.best_of(SETUP)
+        self.assertLessEqual(total_ms, settings.STARTUP_IMPORT_BUDGET_MS['setup'])
+
+    def test_urls_within_budget(self):
+        total_ms, _ = self.best_of(f'{SETUP}; {URLS}')
+        self.assertLessEqual(total_ms, settings.STARTUP_IMPORT_BUDGET_MS['urls'])
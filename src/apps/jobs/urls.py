@@ -0,0 +1,11 @@
+# src/apps/jobs/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('<int:pk>/', views.job_detail, name='detail'),
+    path('<int:pk>/estado/', views.job_status, name='status'),
+    path('<int:pk>/descargar/<str:filename>', views.job_download, name='download'),
+]
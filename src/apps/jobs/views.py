@@ -0,0 +1,53 @@
+# src/apps/jobs/views.py
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+
+from core.downloads import protected_file_response
+from core.json import FastJsonResponse
+from .models import Job
+
+
+def async_requested(request):
+    """La vista pesada debe encolarse si llega ``async=1`` por GET o POST."""
+    value = request.POST.get('async') or request.GET.get('async') or ''
+    return value.lower() in ('1', 'true', 'on', 'yes')
+
+
+def job_accepted(request, job, message=None):
+    """
+    Respuesta inmediata tras encolar ``job``: 202 con el estado en JSON para
+    clientes AJAX, o redirección a la página de seguimiento de la tarea.
+    """
+    status_url = reverse('jobs:status', args=[job.pk])
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'application/json' in request.headers.get('Accept', ''):
+        response = FastJsonResponse({**job.to_dict(), 'status_url': status_url}, status=202)
+        response['Content-Location'] = status_url
+        return response
+    messages.info(request, message or 'La operación se está procesando en segundo plano.')
+    return redirect('jobs:detail', pk=job.pk)
+
+
+def _get_job(request, pk):
+    queryset = Job.objects.all() if request.user.is_staff else Job.objects.filter(created_by=request.user)
+    return get_object_or_404(queryset, pk=pk)
+
+
+@login_required
+def job_detail(request, pk):
+    job = _get_job(request, pk)
+    return render(request, 'jobs/job_detail.html', {'job': job})
+
+
+@login_required
+def job_status(request, pk):
+    job = _get_job(request, pk)
+    return FastJsonResponse(job.to_dict())
+
+
+@login_required
+def job_download(request, pk, filename):
+    """Archivo generado por la tarea; lo entrega nginx (``X-Accel-Redirect``) o ``FileResponse``."""
+    job = _get_job(request, pk)
+    return protected_file_response(f'jobs/{job.pk}/{filename}')
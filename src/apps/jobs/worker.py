@@ -0,0 +1,79 @@
+# src/apps/jobs/worker.py
+"""Bucle de ejecución de ``manage.py run_worker`` (un hilo o proceso por instancia)."""
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from core.log import log_context, timed
+
+from .models import Job
+from .queue import claim, execute, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def heartbeat(job, interval):
+    """Actualiza ``heartbeat_at`` en segundo plano mientras la tarea se ejecuta."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                Job.objects.filter(pk=job.pk, status='RUNNING').update(heartbeat_at=timezone.now())
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'heartbeat-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class Worker:
+    def __init__(self, index=0, queues=('default',), poll_interval=None, burst=False, max_jobs=None,
+                 stop_event=None):
+        self.name = f'{socket.gethostname()}:{os.getpid()}:{index}'
+        self.queues = tuple(queues)
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        self.burst = burst
+        self.max_jobs = max_jobs
+        self.stop_event = stop_event or threading.Event()
+
+    def run(self):
+        processed = 0
+        try:
+            requeue_stale()
+            while not self.stop_event.is_set():
+                job = claim(self.name, self.queues)
+                if job is None:
+                    if self.burst:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                # Los registros de la tarea se correlacionan por el id del trabajo
+                with log_context(f'job-{job.pk}'), \
+                        timed(logger, 'job.execute', job_id=job.pk, task=job.task, worker=self.name):
+                    with heartbeat(job, settings.JOBS_HEARTBEAT_INTERVAL):
+                        execute(job)
+                processed += 1
+                if self.max_jobs and processed >= self.max_jobs:
+                    break
+        finally:
+            connections.close_all()
+        return processed
+
+
+def run_worker(stop_event, **options):
+    """Punto de entrada para hilos y procesos hijos."""
+    return Worker(stop_event=stop_event, **options).run()
@@ -1,7 +1,23 @@
 # src/apps/movements/apps.py
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class MovementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.movements'
-    label = 'movements'
\ No newline at end of file
+    label = 'movements'
+
+    def ready(self):
+        post_migrate.connect(create_upcoming_partitions, sender=self)
+
+
+def create_upcoming_partitions(using='default', **kwargs):
+    """Crea las particiones mensuales próximas después de cada migrate."""
+    from django.conf import settings
+    from django.db import connections
+    from .partitions import ensure_partitions
+
+    ensure_partitions(
+        months_ahead=settings.MOVEMENT_PARTITION_MONTHS_AHEAD,
+        connection=connections[using],
+    )
@@ -0,0 +1,21 @@
+# src/apps/movements/hot_queries.py
+from django.utils import timezone
+
+from core.hot_queries import register
+from .models import Movement
+
+
+@register('movements.list')
+def latest():
+    return Movement.objects.select_related('product', 'created_by').order_by('-date')[:20]
+
+
+@register('movements.entries')
+def entries():
+    return Movement.objects.filter(movement_type='IN').order_by('-date')[:20]
+
+
+@register('movements.current_month')
+def current_month():
+    today = timezone.localdate()
+    return Movement.objects.in_period(today.replace(day=1), today).order_by('date')
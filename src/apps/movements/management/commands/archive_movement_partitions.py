@@ -0,0 +1,34 @@
+# apps/movements/management/commands/archive_movement_partitions.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.movements.partitions import ARCHIVE_SCHEMA, detach_partition, expired_partitions, is_partitioned
+
+class Command(BaseCommand):
+    help = 'Separa (archiva) las particiones de movimientos más antiguas que la ventana de retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months', type=int, default=settings.MOVEMENT_PARTITION_RETENTION_MONTHS,
+            help='Meses completos que se mantienen en la tabla activa',
+        )
+        parser.add_argument(
+            '--drop', action='store_true',
+            help=f'Eliminar las particiones en lugar de moverlas al esquema "{ARCHIVE_SCHEMA}"',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Solo mostrar lo que se haría')
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            self.stdout.write(self.style.WARNING('La tabla de movimientos no está particionada; nada que hacer.'))
+            return
+
+        expired = expired_partitions(options['retention_months'])
+        for name, start in expired:
+            action = 'eliminar' if options['drop'] else f'archivar en {ARCHIVE_SCHEMA}'
+            self.stdout.write(f'  - {name} ({start:%Y-%m}): {action}')
+            if not options['dry_run']:
+                detach_partition(name, drop=options['drop'])
+
+        verb = 'a procesar' if options['dry_run'] else 'procesadas'
+        self.stdout.write(self.style.SUCCESS(f'{len(expired)} particiones {verb}.'))
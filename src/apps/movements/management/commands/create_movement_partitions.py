@@ -0,0 +1,24 @@
+# apps/movements/management/commands/create_movement_partitions.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.movements.partitions import ensure_partitions, is_partitioned
+
+class Command(BaseCommand):
+    help = 'Crea las particiones mensuales futuras de la tabla de movimientos (ejecutar por cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=settings.MOVEMENT_PARTITION_MONTHS_AHEAD,
+            help='Cantidad de meses futuros a preparar además del actual',
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            self.stdout.write(self.style.WARNING('La tabla de movimientos no está particionada; nada que hacer.'))
+            return
+
+        created = ensure_partitions(months_ahead=options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'  + {name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(created)} particiones creadas.'))
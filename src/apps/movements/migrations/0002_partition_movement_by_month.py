@@ -0,0 +1,118 @@
+# Convierte movements_movement en una tabla particionada por rango mensual
+# sobre la columna ``date`` (solo PostgreSQL; en otros motores no hace nada).
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations
+
+TABLE = 'movements_movement'
+LEGACY_TABLE = 'movements_movement_legacy'
+SHADOW_TABLE = 'movements_movement_partitioned'
+SEQUENCE = 'movements_movement_ledger_id_seq'
+MONTHS_AHEAD = 3
+
+
+def _month_range(first, last):
+    current = datetime.date(first.year, first.month, 1)
+    while current <= last:
+        if current.month == 12:
+            following = datetime.date(current.year + 1, 1, 1)
+        else:
+            following = datetime.date(current.year, current.month + 1, 1)
+        yield current, following
+        current = following
+
+
+def _related_tables(apps):
+    product = apps.get_model('inventory', 'Product')
+    user = apps.get_model(settings.AUTH_USER_MODEL)
+    return product._meta.db_table, user._meta.db_table
+
+
+def _add_relations(cursor, qn, table, apps):
+    product_table, user_table = _related_tables(apps)
+    cursor.execute(f'CREATE INDEX {qn(TABLE + "_product_date_idx")} ON {qn(table)} (product_id, date)')
+    cursor.execute(f'CREATE INDEX {qn(TABLE + "_created_by_idx")} ON {qn(table)} (created_by_id)')
+    cursor.execute(f'CREATE INDEX {qn(TABLE + "_date_idx")} ON {qn(table)} (date)')
+    cursor.execute(
+        f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(TABLE + "_product_fk")} '
+        f'FOREIGN KEY (product_id) REFERENCES {qn(product_table)} (id) DEFERRABLE INITIALLY DEFERRED'
+    )
+    cursor.execute(
+        f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(TABLE + "_created_by_fk")} '
+        f'FOREIGN KEY (created_by_id) REFERENCES {qn(user_table)} (id) DEFERRABLE INITIALLY DEFERRED'
+    )
+
+
+def partition_movements(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    qn = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} RENAME TO {qn(LEGACY_TABLE)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(TABLE)} (LIKE {qn(LEGACY_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (date)'
+        )
+        # Las columnas identity no se admiten en tablas particionadas en
+        # PostgreSQL < 17, así que el id pasa a usar una secuencia propia.
+        cursor.execute(f'CREATE SEQUENCE {qn(SEQUENCE)}')
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+        cursor.execute(f'ALTER SEQUENCE {qn(SEQUENCE)} OWNED BY {qn(TABLE)}.id')
+        # Toda restricción única de una tabla particionada debe incluir la clave de partición.
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(TABLE + "_id_date_pk")} PRIMARY KEY (id, date)')
+        _add_relations(cursor, qn, TABLE, apps)
+
+        cursor.execute(f'SELECT MIN(date) FROM {qn(LEGACY_TABLE)}')
+        oldest = cursor.fetchone()[0]
+        today = datetime.date.today()
+        first = oldest.date() if oldest else today
+        last = datetime.date(today.year + (today.month + MONTHS_AHEAD - 1) // 12,
+                             (today.month + MONTHS_AHEAD - 1) % 12 + 1, 1)
+        for start, end in _month_range(first, last):
+            name = f'{TABLE}_y{start.year:04d}m{start.month:02d}'
+            cursor.execute(
+                f'CREATE TABLE {qn(name)} PARTITION OF {qn(TABLE)} FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+        cursor.execute(f'CREATE TABLE {qn(TABLE + "_default")} PARTITION OF {qn(TABLE)} DEFAULT')
+
+        cursor.execute(f'INSERT INTO {qn(TABLE)} SELECT * FROM {qn(LEGACY_TABLE)}')
+        cursor.execute(f'SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {qn(TABLE)}), 0) + 1, false)', [SEQUENCE])
+        cursor.execute(f'DROP TABLE {qn(LEGACY_TABLE)}')
+
+
+def unpartition_movements(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    qn = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} RENAME TO {qn(SHADOW_TABLE)}')
+        for suffix in ('_product_date_idx', '_created_by_idx', '_date_idx'):
+            cursor.execute(f'DROP INDEX {qn(TABLE + suffix)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(TABLE)} (LIKE {qn(SHADOW_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(f'ALTER SEQUENCE {qn(SEQUENCE)} OWNED BY {qn(TABLE)}.id')
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(TABLE + "_pkey")} PRIMARY KEY (id)')
+        cursor.execute(f'INSERT INTO {qn(TABLE)} SELECT * FROM {qn(SHADOW_TABLE)}')
+        cursor.execute(f'DROP TABLE {qn(SHADOW_TABLE)} CASCADE')
+        _add_relations(cursor, qn, TABLE, apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventory', '0006_alter_client_options_remove_client_address_and_more'),
+        ('movements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_movements, unpartition_movements),
+    ]
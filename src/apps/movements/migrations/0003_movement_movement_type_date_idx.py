@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movements', '0002_partition_movement_by_month'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['movement_type', '-date'], name='movement_type_date_idx'),
+        ),
+    ]
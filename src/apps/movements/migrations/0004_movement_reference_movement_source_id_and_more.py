@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movements', '0003_movement_movement_type_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movement',
+            name='reference',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Referencia'),
+        ),
+        migrations.AddField(
+            model_name='movement',
+            name='source_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='ID del documento de origen'),
+        ),
+        migrations.AddField(
+            model_name='movement',
+            name='source_type',
+            field=models.CharField(choices=[('MANUAL', 'Manual'), ('ORDER', 'Orden de compra'), ('DISPATCH', 'Nota de despacho'), ('RECEPTION', 'Nota de recepción'), ('RETURN', 'Devolución')], default='MANUAL', max_length=10, verbose_name='Origen'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['source_type', 'source_id'], name='movement_source_idx'),
+        ),
+    ]
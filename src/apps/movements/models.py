@@ -1,17 +1,53 @@
 # apps/movements/models.py
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from apps.inventory.models import Product
+from apps.inventory.stock import add_stock, remove_stock
 from django.contrib.auth.models import User
-from django.db.models import F
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
+import datetime
+
+
+def _period_bound(value, next_day=False):
+    """Convierte una fecha (date o 'YYYY-MM-DD') en un datetime consciente de zona horaria."""
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        return value
+    if next_day:
+        value = value + datetime.timedelta(days=1)
+    return timezone.make_aware(datetime.datetime.combine(value, datetime.time.min))
+
+
+class MovementQuerySet(models.QuerySet):
+    def in_period(self, start=None, end=None):
+        """
+        Filtra por el rango semiabierto [start, end) usando comparaciones
+        directas sobre ``date`` (sin ``__date``), de forma que PostgreSQL pueda
+        descartar las particiones mensuales que quedan fuera del rango.
+        Si ``end`` es una fecha (no un datetime), se incluye el día completo.
+        """
+        queryset = self
+        if start:
+            queryset = queryset.filter(date__gte=_period_bound(start))
+        if end:
+            queryset = queryset.filter(date__lt=_period_bound(end, next_day=True))
+        return queryset
+
 
 class Movement(models.Model):
     MOVEMENT_TYPES = [
         ('IN', 'Entrada'),
         ('OUT', 'Salida'),
     ]
+    SOURCE_TYPES = [
+        ('MANUAL', 'Manual'),
+        ('ORDER', 'Orden de compra'),
+        ('DISPATCH', 'Nota de despacho'),
+        ('RECEPTION', 'Nota de recepción'),
+        ('RETURN', 'Devolución'),
+    ]
 
     product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name="Producto")
     movement_type = models.CharField(max_length=3, choices=MOVEMENT_TYPES, verbose_name="Tipo de Movimiento")
@@ -26,6 +62,20 @@ class Movement(models.Model):
     observations = models.TextField(blank=True, verbose_name="Observaciones")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Creado por")
     delivered_to = models.CharField(max_length=255, null=True, blank=True, verbose_name="Entregado a")
+    # Documento que originó el movimiento (orden de compra, despacho, ...)
+    source_type = models.CharField(max_length=10, choices=SOURCE_TYPES, default='MANUAL', verbose_name="Origen")
+    source_id = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="ID del documento de origen")
+    reference = models.CharField(max_length=50, blank=True, verbose_name="Referencia")
+
+    objects = MovementQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # EntryListView / ExitListView: movement_type = X ORDER BY date DESC
+            models.Index(fields=['movement_type', '-date'], name='movement_type_date_idx'),
+            # Movimientos de un documento (entregas parciales de una orden, etc.)
+            models.Index(fields=['source_type', 'source_id'], name='movement_source_idx'),
+        ]
 
     def __str__(self):
         return f'{self.product.description} - {self.get_movement_type_display()}'
@@ -49,34 +99,19 @@ class Movement(models.Model):
     
     def save(self, *args, **kwargs):
         """
-        Sobrescribir save para validar antes de guardar y actualizar stock de forma segura
+        Sobrescribir save para validar antes de guardar y actualizar stock de forma segura.
+        El stock se ajusta con el servicio de stock (UPDATE condicional) en la misma
+        transacción que el INSERT, así que si no alcanza no queda ningún movimiento.
         """
-        # Validar antes de guardar
+        # Validar antes de guardar (mensaje rápido con el stock ya cargado)
         self.clean()
-        
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        # Actualizar stock del producto de forma segura
-        if is_new:
-            product = self.product
-            if self.movement_type == 'IN':
-                # Usar F() expression para actualización atómica
-                Product.objects.filter(pk=product.pk).update(
-                    current_stock=F('current_stock') + self.quantity
-                )
-            elif self.movement_type == 'OUT':
-                # Verificar nuevamente antes de actualizar (doble verificación)
-                product.refresh_from_db()
-                if self.quantity <= product.current_stock:
-                    Product.objects.filter(pk=product.pk).update(
-                        current_stock=F('current_stock') - self.quantity
-                    )
-                else:
-                    # Revertir el movimiento si no hay suficiente stock
-                    self.delete()
-                    raise ValidationError(
-                        f"Stock insuficiente después de validación. "
-                        f"Stock actual: {product.current_stock}, "
-                        f"Intenta sacar: {self.quantity}"
-                    )
\ No newline at end of file
+
+        if self.pk is not None:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            line = [(self.product_id, self.quantity)]
+            levels = add_stock(line) if self.movement_type == 'IN' else remove_stock(line)
+            super().save(*args, **kwargs)
+        # Cantidad 0: el servicio no toca el producto y no devuelve su nivel
+        self.product.current_stock = levels.get(self.product_id, self.product.current_stock)
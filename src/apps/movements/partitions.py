@@ -0,0 +1,177 @@
+# src/apps/movements/partitions.py
+"""
+Particionado por rango mensual de la tabla de movimientos (PostgreSQL).
+
+La tabla ``movements_movement`` se declara como ``PARTITION BY RANGE (date)``
+en la migración 0002. Este módulo crea las particiones mensuales futuras,
+lista las existentes y separa (archiva) las que quedan fuera de la ventana de
+retención. En otros motores de base de datos todas las funciones son no-op.
+"""
+import datetime
+import re
+
+from django.db import connection as default_connection, transaction
+
+PARENT_TABLE = 'movements_movement'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+ARCHIVE_SCHEMA = 'archive'
+
+_PARTITION_RE = re.compile(rf'^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$')
+
+
+def month_start(value):
+    """Primer día del mes de ``value`` (date o datetime)."""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Suma ``months`` meses a un primer-día-de-mes."""
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start):
+    return f'{PARENT_TABLE}_y{start.year:04d}m{start.month:02d}'
+
+
+def supports_partitioning(connection=None):
+    connection = connection or default_connection
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(connection=None):
+    """Indica si la tabla padre ya fue convertida a tabla particionada."""
+    connection = connection or default_connection
+    if not supports_partitioning(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection=None):
+    """
+    Devuelve ``[(nombre, inicio_de_mes), ...]`` de las particiones mensuales
+    adjuntas, ordenadas por fecha. La partición DEFAULT no se incluye.
+    """
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+            """,
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, datetime.date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def create_partition(start, connection=None):
+    """
+    Crea la partición del mes que comienza en ``start`` si no existe.
+
+    Si la partición DEFAULT ya contiene filas de ese rango, se separa
+    temporalmente, se mueven las filas a la nueva partición y se vuelve a
+    adjuntar; PostgreSQL no permite crear la partición en otro caso.
+    """
+    connection = connection or default_connection
+    start = month_start(start)
+    end = add_months(start, 1)
+    name = partition_name(start)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+
+        cursor.execute('SELECT to_regclass(%s)', [DEFAULT_PARTITION])
+        has_default = cursor.fetchone()[0] is not None
+        moved = False
+        if has_default:
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM {qn(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s)',
+                [start, end],
+            )
+            moved = cursor.fetchone()[0]
+
+        if moved:
+            cursor.execute(f'ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(DEFAULT_PARTITION)}')
+
+        cursor.execute(
+            f'CREATE TABLE {qn(name)} PARTITION OF {qn(PARENT_TABLE)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+
+        if moved:
+            cursor.execute(
+                f'INSERT INTO {qn(name)} SELECT * FROM {qn(DEFAULT_PARTITION)} '
+                f'WHERE date >= %s AND date < %s',
+                [start, end],
+            )
+            cursor.execute(
+                f'DELETE FROM {qn(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s',
+                [start, end],
+            )
+            cursor.execute(f'ALTER TABLE {qn(PARENT_TABLE)} ATTACH PARTITION {qn(DEFAULT_PARTITION)} DEFAULT')
+    return True
+
+
+def ensure_partitions(months_ahead=3, today=None, connection=None):
+    """
+    Garantiza que existan las particiones desde el mes actual hasta
+    ``months_ahead`` meses en el futuro. Devuelve los nombres creados.
+    """
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return []
+    first = month_start(today or datetime.date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        start = add_months(first, offset)
+        if create_partition(start, connection=connection):
+            created.append(partition_name(start))
+    return created
+
+
+def expired_partitions(retention_months, today=None, connection=None):
+    """Particiones cuyo mes completo es anterior a la ventana de retención."""
+    cutoff = add_months(month_start(today or datetime.date.today()), -retention_months)
+    return [(name, start) for name, start in list_partitions(connection) if start < cutoff]
+
+
+def detach_partition(name, drop=False, connection=None):
+    """
+    Separa la partición ``name`` de la tabla de movimientos.
+
+    Por defecto la tabla separada se mueve al esquema ``archive`` para poder
+    consultarla o exportarla después; con ``drop=True`` se elimina.
+    """
+    connection = connection or default_connection
+    qn = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(name)}')
+        if drop:
+            cursor.execute(f'DROP TABLE {qn(name)}')
+        else:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {qn(ARCHIVE_SCHEMA)}')
+            cursor.execute(f'ALTER TABLE {qn(name)} SET SCHEMA {qn(ARCHIVE_SCHEMA)}')
@@ -1,3 +1,26 @@
 from django.test import TestCase
 
-# Create your tests here.
+from apps.inventory.models import Product
+
+from .models import Movement
+
+
+class MovementSaveTests(TestCase):
+
+    def setUp(self):
+        self.product = Product.objects.create(
+            product_code='M1', description='Producto M1', unit='UND', unit_price=5, current_stock=8,
+        )
+
+    def test_movement_adjusts_stock(self):
+        Movement.objects.create(product=self.product, movement_type='OUT', quantity=3, unit_price=5)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 5)
+
+    def test_zero_quantity_keeps_stock(self):
+        for movement_type in ('IN', 'OUT'):
+            movement = Movement.objects.create(product=self.product, movement_type=movement_type, quantity=0,
+                                               unit_price=5)
+            self.assertEqual(movement.product.current_stock, 8)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 8)
@@ -14,7 +14,5 @@ urlpatterns = [
     # Vistas específicas
     path('entradas/', views.EntryListView.as_view(), name='entry_list'),
     path('salidas/', views.ExitListView.as_view(), name='exit_list'),
-    
-    # API para información de productos
-    path('api/product/<int:product_id>/', views.product_info_api, name='product_info_api'),
+    path('reporte-mensual/', views.MovementMonthlyReportView.as_view(), name='monthly_report'),
 ]
\ No newline at end of file
@@ -6,13 +6,16 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.db.models import Sum, Q
-from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+import datetime
 
 # Solo importa Movement
+from core.db_router import ReplicaReadMixin
 from .models import Movement
 from .forms import MovementForm
 
-class MovementListView(LoginRequiredMixin, ListView):
+class MovementListView(LoginRequiredMixin, ReplicaReadMixin, ListView):
     model = Movement
     template_name = 'movements/movement_list.html'
     context_object_name = 'movements'
@@ -34,13 +37,10 @@ class MovementListView(LoginRequiredMixin, ListView):
                 Q(delivered_to__icontains=search_query)
             )
             
-        # Filtro por fecha
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-        if start_date:
-            queryset = queryset.filter(date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(date__lte=end_date)
+        # Filtro por fecha (rango sobre `date` para aprovechar las particiones)
+        start_date = parse_date(self.request.GET.get('start_date') or '')
+        end_date = parse_date(self.request.GET.get('end_date') or '')
+        queryset = queryset.in_period(start_date, end_date)
             
         return queryset
     
@@ -139,7 +139,7 @@ class MovementDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 # Vistas específicas para entradas y salidas
-class EntryListView(LoginRequiredMixin, ListView):
+class EntryListView(LoginRequiredMixin, ReplicaReadMixin, ListView):
     """Vista para listar solo entradas"""
     model = Movement
     template_name = 'movements/entry_list.html'
@@ -175,7 +175,7 @@ class EntryListView(LoginRequiredMixin, ListView):
         
         return context
 
-class ExitListView(LoginRequiredMixin, ListView):
+class ExitListView(LoginRequiredMixin, ReplicaReadMixin, ListView):
     """Vista para listar solo salidas"""
     model = Movement
     template_name = 'movements/exit_list.html'
@@ -212,47 +212,30 @@ class ExitListView(LoginRequiredMixin, ListView):
         
         return context
 
-# Vista para API de información de producto
-def product_info_api(request, product_id):
-    """API para obtener información del producto"""
-    try:
-        from apps.inventory.models import Product
-        product = Product.objects.get(pk=product_id)
-        
-        return JsonResponse({
-            'success': True,
-            'current_stock': product.current_stock,
-            'min_stock': product.min_stock,
-            'location': product.location or '',
-            'description': product.description
-        })
-    except Product.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'error': 'Producto no encontrado'
-        }, status=404)
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=500)
+class MovementMonthlyReportView(LoginRequiredMixin, ReplicaReadMixin, ListView):
+    """Reporte de movimientos de un mes (?month=YYYY-MM, por defecto el actual)"""
+    model = Movement
+    template_name = 'movements/monthly_report.html'
+    context_object_name = 'movements'
 
-def product_detail_api(request, pk):
-    """
-    Vista de API para obtener los detalles de un producto en formato JSON.
-    """
-    if request.method == 'GET':
+    def get_period(self):
+        today = timezone.localdate()
         try:
-            product = get_object_or_404(Product, pk=pk)
-            data = {
-                'current_stock': product.current_stock,
-                'min_stock': product.min_stock,
-                'location': product.location,
-            }
-            return JsonResponse(data)
-        except Exception as e:
-            # Manejo de errores en caso de que algo salga mal en la base de datos o el modelo
-            return JsonResponse({'error': str(e)}, status=500)
-    else:
-        # Devuelve un error si no es un método GET
-        return JsonResponse({'error': 'Método no permitido'}, status=405)
\ No newline at end of file
+            year, month = (int(part) for part in self.request.GET.get('month', '').split('-'))
+            start = datetime.date(year, month, 1)
+        except ValueError:
+            start = today.replace(day=1)
+        following = (start + datetime.timedelta(days=32)).replace(day=1)
+        return start, following - datetime.timedelta(days=1)
+
+    def get_queryset(self):
+        self.start_date, self.end_date = self.get_period()
+        return Movement.objects.in_period(self.start_date, self.end_date)\
+            .select_related('product')\
+            .order_by('date')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['start_date'] = self.start_date
+        context['end_date'] = self.end_date
+        return context
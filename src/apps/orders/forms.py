@@ -2,6 +2,7 @@
 from django import forms
 from .models import Order, OrderItem
 from django.forms import inlineformset_factory
+from apps.inventory.formsets import BatchedInlineFormSet, BatchedLineForm, PrefetchedModelChoiceField
 from apps.inventory.models import Product
 
 class OrderForm(forms.ModelForm):
@@ -38,10 +39,11 @@ class OrderForm(forms.ModelForm):
         self.fields['client'].queryset = self.fields['client'].queryset.order_by('name')
         self.fields['supplier'].queryset = self.fields['supplier'].queryset.order_by('name')
 
-class OrderItemForm(forms.ModelForm):
+class OrderItemForm(BatchedLineForm):
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity', 'unit_price']
+        field_classes = {'product': PrefetchedModelChoiceField}
         widgets = {
             'product': forms.Select(attrs={
                 'class': 'form-select product-select',
@@ -70,6 +72,7 @@ OrderItemFormSet = inlineformset_factory(
     Order,
     OrderItem,
     form=OrderItemForm,
+    formset=BatchedInlineFormSet,
     extra=1,
     can_delete=True,
     min_num=1,
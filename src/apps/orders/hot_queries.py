@@ -0,0 +1,13 @@
+# src/apps/orders/hot_queries.py
+from core.hot_queries import register
+from .models import Order
+
+
+@register('orders.pending')
+def pending():
+    return Order.objects.filter(status='PENDING').order_by('-order_date')
+
+
+@register('orders.list')
+def latest():
+    return Order.objects.order_by('-order_date')[:15]
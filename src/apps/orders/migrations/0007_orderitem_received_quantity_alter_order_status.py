@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 02:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_delivered_items_received(apps, schema_editor):
+    # Las órdenes entregadas antes de existir la columna se recibieron completas
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    OrderItem.objects.filter(order__status='DELIVERED').update(received_quantity=F('quantity'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='received_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Cantidad Recibida'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('PENDING', '🟡 Pendiente'), ('APPROVED', '🟢 Aprobado'), ('PARTIAL', '🟣 Entrega parcial'), ('DELIVERED', '🔵 Entregado'), ('CANCELLED', '🔴 Cancelado')], default='PENDING', max_length=20, verbose_name='Estado'),
+        ),
+        migrations.RunPython(mark_delivered_items_received, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,5 @@
 # src/apps/orders/models.py
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from apps.inventory.models import Product, Supplier, Client
@@ -9,6 +9,7 @@ class Order(models.Model):
     ORDER_STATUS_CHOICES = [
         ('PENDING', '🟡 Pendiente'),
         ('APPROVED', '🟢 Aprobado'),
+        ('PARTIAL', '🟣 Entrega parcial'),
         ('DELIVERED', '🔵 Entregado'),
         ('CANCELLED', '🔴 Cancelado'),
     ]
@@ -22,15 +23,25 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES, default='PENDING', verbose_name="Estado")
     notes = models.TextField(blank=True, verbose_name="Observaciones")
     total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False, verbose_name="Total")
+    version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Versión")
     
     # Campos de auditoría
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado en")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizado en")
 
+    # Estados desde los que se puede registrar mercadería recibida
+    RECEIVABLE_STATUSES = ['APPROVED', 'PARTIAL']
+
     class Meta:
         verbose_name = "Orden de Compra"
         verbose_name_plural = "Órdenes de Compra"
         ordering = ['-order_date']
+        indexes = [
+            models.Index(fields=['-order_date'], name='order_date_idx'),
+            models.Index(fields=['status', '-order_date'], name='order_status_date_idx'),
+            models.Index(fields=['-order_date'], name='order_pending_idx',
+                         condition=models.Q(status='PENDING')),
+        ]
 
     def __str__(self):
         return f'Orden #{self.order_number}'
@@ -73,17 +84,102 @@ class Order(models.Model):
             self.total = total
             super().save(update_fields=['total'])
 
+    def receive(self, user, quantities=None):
+        """
+        Registra la recepción de la orden (total o parcial) en un solo lote.
+
+        ``quantities`` es ``{item_id: cantidad_recibida}``; si se omite se
+        recibe todo lo pendiente. Se validan todas las líneas antes de escribir
+        nada; luego se insertan los movimientos con ``bulk_create``, se suma el
+        stock agregado por producto en un único UPDATE y se actualizan las
+        cantidades recibidas de cada línea. La orden pasa a ENTREGADA cuando no
+        queda nada pendiente, o a ENTREGA PARCIAL en otro caso.
+
+        Devuelve la lista de movimientos creados, o ``None`` si la orden no
+        está en un estado que admita recepciones (o si otra petición la
+        modificó primero). Lanza ``ValidationError`` si alguna cantidad no es
+        válida.
+        """
+        from apps.httpcache.versions import bump
+        from apps.inventory.stock import add_stock
+        from apps.movements.models import Movement
+        from apps.workflow.transitions import transition
+
+        with transaction.atomic():
+            # Releer estado y versión: el compare-and-swap de abajo falla si otra
+            # recepción se confirmó después de esta lectura
+            current = Order.objects.filter(pk=self.pk).values('status', 'version').first()
+            if current is None or current['status'] not in self.RECEIVABLE_STATUSES:
+                return None
+            self.status, self.version = current['status'], current['version']
+
+            items = list(self.items.all())
+            if quantities is None:
+                quantities = {item.pk: item.pending_quantity for item in items}
+
+            errors, lines = [], []
+            for item in items:
+                quantity = quantities.get(item.pk, 0)
+                if quantity < 0:
+                    errors.append(f'Línea {item.pk}: la cantidad recibida no puede ser negativa.')
+                elif quantity > item.pending_quantity:
+                    errors.append(
+                        f'Línea {item.pk}: se intentan recibir {quantity} y solo quedan {item.pending_quantity} pendientes.'
+                    )
+                elif quantity:
+                    lines.append((item, quantity))
+            unknown = set(quantities) - {item.pk for item in items}
+            if unknown:
+                errors.append(f'Líneas que no pertenecen a la orden: {sorted(unknown)}')
+            if errors:
+                raise ValidationError(errors)
+            if not lines:
+                raise ValidationError('Indique al menos una cantidad a recibir.')
+
+            for item, quantity in lines:
+                item.received_quantity += quantity
+            fully_received = all(item.pending_quantity == 0 for item in items)
+            if not transition(self, 'DELIVERED' if fully_received else 'PARTIAL', self.RECEIVABLE_STATUSES):
+                return None
+
+            now = timezone.now()
+            movements = Movement.objects.bulk_create([
+                Movement(
+                    product_id=item.product_id,
+                    movement_type='IN',  # Entrada por compra
+                    quantity=quantity,
+                    unit_price=item.unit_price,
+                    date=now,
+                    observations=f'Orden de compra #{self.order_number}',
+                    created_by=user,
+                    source_type='ORDER',
+                    source_id=self.pk,
+                    reference=self.order_number,
+                )
+                for item, quantity in lines
+            ])
+            add_stock((item.product_id, quantity) for item, quantity in lines)
+            OrderItem.objects.bulk_update([item for item, _ in lines], ['received_quantity'])
+            bump(Movement)
+        return movements
+
     @property
     def is_editable(self):
         """Determina si la orden puede ser editada"""
         return self.status in ['PENDING']
 
+    @property
+    def is_receivable(self):
+        """Determina si se puede registrar mercadería recibida"""
+        return self.status in self.RECEIVABLE_STATUSES
+
     @property
     def status_badge_class(self):
         """Retorna la clase CSS para el badge de estado"""
         status_classes = {
             'PENDING': 'bg-warning',
             'APPROVED': 'bg-success',
+            'PARTIAL': 'bg-primary',
             'DELIVERED': 'bg-info',
             'CANCELLED': 'bg-danger',
         }
@@ -95,6 +191,7 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField(default=1, verbose_name="Cantidad")
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Precio Unitario")
     subtotal = models.DecimalField(max_digits=10, decimal_places=2, editable=False, verbose_name="Subtotal")
+    received_quantity = models.PositiveIntegerField(default=0, editable=False, verbose_name="Cantidad Recibida")
 
     class Meta:
         verbose_name = "Ítem de Orden"
@@ -103,6 +200,10 @@ class OrderItem(models.Model):
     def __str__(self):
         return f'{self.product.name} - {self.quantity} x ${self.unit_price}'
 
+    @property
+    def pending_quantity(self):
+        return max(self.quantity - self.received_quantity, 0)
+
     def clean(self):
         if self.quantity <= 0:
             raise ValidationError({'quantity': 'La cantidad debe ser mayor a cero.'})
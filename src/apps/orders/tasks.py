@@ -0,0 +1,27 @@
+# src/apps/orders/tasks.py
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+from apps.jobs.queue import JobFailed, task
+from .models import Order
+
+@task('orders.deliver')
+def deliver(job, order_id, quantities=None):
+    order = Order.objects.filter(pk=order_id).first()
+    if order is None:
+        raise JobFailed('La orden ya no existe.')
+
+    job.set_progress(10, f'Registrando entrega de la orden #{order.order_number}')
+    user = User.objects.filter(pk=job.created_by_id).first()
+    if quantities is not None:
+        # Las claves JSON llegan como texto
+        quantities = {int(item_id): qty for item_id, qty in quantities.items()}
+    try:
+        movements = order.receive(user, quantities)
+    except ValidationError as e:
+        raise JobFailed(' '.join(e.messages))
+    if movements is None:
+        raise JobFailed('La orden debe estar aprobada para poder entregarse.')
+
+    return {'order_id': order.pk, 'movements': len(movements), 'redirect_url': reverse('orders:detail', args=[order.pk])}
@@ -1,3 +1,77 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from apps.inventory.models import Product
+from apps.movements.models import Movement
+
+from .models import Order, OrderItem
+
+
+class OrderReceiveTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('comprador')
+        self.a = Product.objects.create(product_code='A', description='Producto A', unit='UND', unit_price=2,
+                                        current_stock=1)
+        self.b = Product.objects.create(product_code='B', description='Producto B', unit='UND', unit_price=3)
+        self.order = Order.objects.create(order_number='OC-1', status='APPROVED', created_by=self.user)
+        self.line_a = OrderItem.objects.create(order=self.order, product=self.a, quantity=10, unit_price=2)
+        self.line_b = OrderItem.objects.create(order=self.order, product=self.b, quantity=4, unit_price=3)
+
+    def stock(self):
+        return tuple(Product.objects.filter(pk__in=[self.a.pk, self.b.pk]).order_by('pk')
+                     .values_list('current_stock', flat=True))
+
+    def received(self):
+        return tuple(self.order.items.order_by('pk').values_list('received_quantity', flat=True))
+
+    def test_partial_receive_adds_only_received_quantities(self):
+        movements = self.order.receive(self.user, {self.line_a.pk: 6})
+
+        self.assertEqual(len(movements), 1)
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.version), ('PARTIAL', 1))
+        self.assertEqual(self.received(), (6, 0))
+        self.assertEqual(self.stock(), (7, 0))
+
+    def test_second_receive_completes_order(self):
+        self.order.receive(self.user, {self.line_a.pk: 6, self.line_b.pk: 1})
+        movements = self.order.receive(self.user)
+
+        self.assertEqual(sorted((m.product_id, m.quantity) for m in movements),
+                         [(self.a.pk, 4), (self.b.pk, 3)])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'DELIVERED')
+        self.assertEqual(self.received(), (10, 4))
+        self.assertEqual(self.stock(), (11, 4))
+        # Orden ya entregada: no admite más recepciones
+        self.assertIsNone(self.order.receive(self.user))
+
+    def test_over_receiving_is_rejected_before_any_write(self):
+        with self.assertRaises(ValidationError):
+            self.order.receive(self.user, {self.line_a.pk: 5, self.line_b.pk: 5})
+        with self.assertRaises(ValidationError):
+            self.order.receive(self.user, {self.line_a.pk: 1, self.line_b.pk + 100: 1})
+
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.version), ('APPROVED', 0))
+        self.assertEqual(self.received(), (0, 0))
+        self.assertEqual(self.stock(), (1, 0))
+        self.assertFalse(Movement.objects.exists())
+
+    def test_pending_order_is_not_receivable(self):
+        order = Order.objects.create(order_number='OC-2')
+        OrderItem.objects.create(order=order, product=self.a, quantity=1, unit_price=2)
+        self.assertIsNone(order.receive(self.user))
+        self.assertFalse(Movement.objects.exists())
+
+    def test_movements_reference_the_order(self):
+        self.order.receive(self.user)
+
+        movements = Movement.objects.order_by('product_id')
+        self.assertEqual(
+            [(m.product_id, m.movement_type, m.quantity, m.source_type, m.source_id, m.reference) for m in movements],
+            [(self.a.pk, 'IN', 10, 'ORDER', self.order.pk, 'OC-1'), (self.b.pk, 'IN', 4, 'ORDER', self.order.pk, 'OC-1')],
+        )
+        self.assertTrue(all(m.created_by_id == self.user.pk for m in movements))
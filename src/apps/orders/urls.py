@@ -9,7 +9,6 @@ from .views import (
     approve_order,
     deliver_order,
     cancel_order,
-    get_product_price
 )
 
 app_name = 'orders'
@@ -23,5 +22,4 @@ urlpatterns = [
     path('<int:pk>/aprobar/', approve_order, name='approve'),
     path('<int:pk>/entregar/', deliver_order, name='deliver'),
     path('<int:pk>/cancelar/', cancel_order, name='cancel'),
-    path('api/producto/<int:product_id>/precio/', get_product_price, name='get_product_price'),
 ]
\ No newline at end of file
@@ -5,15 +5,21 @@ from django.urls import reverse_lazy
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
 from django.forms import inlineformset_factory
 from .models import Order, OrderItem
 from .forms import OrderForm, OrderItemForm, OrderItemFormSet
 from apps.inventory.models import Product
-from apps.movements.models import Movement
-
-class OrderListView(LoginRequiredMixin, ListView):
+from apps.httpcache.decorators import ConditionalMixin
+from apps.jobs.queue import enqueue
+from apps.jobs.views import async_requested, job_accepted
+from apps.workflow.decorators import idempotent
+from apps.workflow.transitions import transition
+from core.db_router import ReplicaReadMixin
+
+class OrderListView(LoginRequiredMixin, ReplicaReadMixin, ConditionalMixin, ListView):
     model = Order
+    cache_models = ('orders.Order', 'inventory.Client', 'inventory.Supplier')
     template_name = 'orders/order_list.html'
     context_object_name = 'orders'
     paginate_by = 15
@@ -57,19 +63,16 @@ class OrderCreateView(LoginRequiredMixin, CreateView):
         context = self.get_context_data()
         formset = context['formset']
         
+        if not formset.is_valid():
+            return self.form_invalid(form)
+
         with transaction.atomic():
             self.object = form.save(commit=False)
             self.object.created_by = self.request.user
             self.object.save()
 
-            if formset.is_valid():
-                formset.instance = self.object
-                formset.save()
-                
-                # Calcular total
-                self.object.calculate_total()
-            else:
-                return self.form_invalid(form)
+            # Líneas en lote; el total se calcula en memoria
+            formset.save_lines(self.object)
 
         messages.success(self.request, f'✅ Orden #{self.object.order_number} creada exitosamente.')
         return redirect(self.get_success_url())
@@ -98,23 +101,21 @@ class OrderUpdateView(LoginRequiredMixin, UpdateView):
             messages.error(self.request, '❌ No se puede editar una orden que no está pendiente.')
             return redirect('orders:detail', pk=self.object.pk)
         
+        if not formset.is_valid():
+            return self.form_invalid(form)
+
         with transaction.atomic():
             self.object = form.save()
             
-            if formset.is_valid():
-                formset.instance = self.object
-                formset.save()
-                
-                # Recalcular total
-                self.object.calculate_total()
-            else:
-                return self.form_invalid(form)
+            # Altas, cambios y bajas de líneas en lote; el total se calcula en memoria
+            formset.save_lines(self.object)
 
         messages.success(self.request, f'✅ Orden #{self.object.order_number} actualizada exitosamente.')
         return redirect(self.get_success_url())
 
-class OrderDetailView(LoginRequiredMixin, DetailView):
+class OrderDetailView(LoginRequiredMixin, ConditionalMixin, DetailView):
     model = Order
+    cache_models = ('orders.Order', 'inventory.Client', 'inventory.Supplier', 'inventory.Product')
     template_name = 'orders/order_detail.html'
     context_object_name = 'order'
 
@@ -137,55 +138,58 @@ class OrderDeleteView(LoginRequiredMixin, DeleteView):
         messages.success(request, f'✅ Orden #{self.object.order_number} eliminada exitosamente.')
         return super().delete(request, *args, **kwargs)
 
+@idempotent('orders.approve')
 @transaction.atomic
 def approve_order(request, pk):
     order = get_object_or_404(Order, pk=pk)
-    if order.status == 'PENDING':
-        order.status = 'APPROVED'
-        order.save()
+    if transition(order, 'APPROVED', ['PENDING']):
         messages.success(request, f'✅ Orden #{order.order_number} aprobada exitosamente.')
     else:
         messages.error(request, '❌ La orden no puede ser aprobada en su estado actual.')
     return redirect('orders:detail', pk=pk)
 
+def _received_quantities(request):
+    """Cantidades ``received_<item_id>`` enviadas por el formulario de recepción parcial."""
+    quantities = {}
+    for name, value in request.POST.items():
+        if name.startswith('received_') and value.strip():
+            try:
+                quantities[int(name[len('received_'):])] = int(value)
+            except ValueError:
+                raise ValidationError(f'Cantidad no válida: {value}')
+    return quantities or None
+
+@idempotent('orders.deliver')
 @transaction.atomic
 def deliver_order(request, pk):
+    """Recibe todo lo pendiente de la orden, o las cantidades indicadas (entrega parcial)."""
     order = get_object_or_404(Order, pk=pk)
-    if order.status == 'APPROVED':
-        order.status = 'DELIVERED'
-        order.save()
-
-        # Registrar movimientos de inventario
-        for item in order.items.all():
-            Movement.objects.create(
-                product=item.product,
-                movement_type='IN',  # Entrada por compra
-                quantity=item.quantity,
-                unit_price=item.unit_price,
-                reference_number=order.order_number,
-                notes=f'Orden de compra #{order.order_number}',
-                created_by=request.user
-            )
-        messages.success(request, f'✅ Orden #{order.order_number} marcada como entregada y movimientos registrados.')
-    else:
+    try:
+        quantities = _received_quantities(request) if request.method == 'POST' else None
+        if async_requested(request) and order.status in Order.RECEIVABLE_STATUSES:
+            job = enqueue('orders.deliver', user=request.user, order_id=order.pk, quantities=quantities)
+            return job_accepted(request, job, f'Registrando la entrega de la orden #{order.order_number}...')
+
+        movements = order.receive(request.user, quantities)
+    except ValidationError as e:
+        for error in e.messages:
+            messages.error(request, f'❌ {error}')
+        return redirect('orders:detail', pk=pk)
+
+    if movements is None:
         messages.error(request, '❌ La orden debe estar aprobada para poder entregarse.')
+    elif order.status == 'DELIVERED':
+        messages.success(request, f'✅ Orden #{order.order_number} marcada como entregada y {len(movements)} movimientos registrados.')
+    else:
+        messages.success(request, f'✅ Entrega parcial de la orden #{order.order_number} registrada ({len(movements)} movimientos).')
     return redirect('orders:detail', pk=pk)
 
+@idempotent('orders.cancel')
 @transaction.atomic
 def cancel_order(request, pk):
     order = get_object_or_404(Order, pk=pk)
-    if order.status in ['PENDING', 'APPROVED']:
-        order.status = 'CANCELLED'
-        order.save()
+    if transition(order, 'CANCELLED', ['PENDING', 'APPROVED']):
         messages.success(request, f'✅ Orden #{order.order_number} cancelada exitosamente.')
     else:
         messages.error(request, '❌ No se puede cancelar una orden ya entregada.')
     return redirect('orders:detail', pk=pk)
-
-def get_product_price(request, product_id):
-    """API para obtener el precio de un producto"""
-    product = get_object_or_404(Product, id=product_id)
-    return JsonResponse({
-        'price': str(product.unit_price or 0),
-        'unit_measure': getattr(product, 'unit', '') or getattr(product, 'unit_measure', '') or 'unidad'
-    })
\ No newline at end of file
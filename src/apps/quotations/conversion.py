@@ -0,0 +1,136 @@
+# src/apps/quotations/conversion.py
+"""
+Conversión de cotizaciones aprobadas en notas de despacho, por lotes.
+
+``convert_quotations`` procesa cualquier cantidad de cotizaciones con un
+número fijo de consultas, independiente de la cantidad de líneas:
+
+1. bloquea las cotizaciones que siguen APROBADAS y sin despacho (las que otra
+   petición convirtió primero se omiten),
+2. lee todas sus líneas en una consulta,
+3. calcula subtotales y totales en memoria,
+4. crea las notas de despacho y todas sus líneas con dos ``bulk_create``, y
+5. marca las cotizaciones como CONVERTIDAS enlazando su despacho.
+
+El resultado incluye los tiempos de cada fase.
+"""
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.changefeed.events import publish_documents
+from apps.dispatch_notes.models import DispatchItem, DispatchNote
+from apps.httpcache.versions import bump
+from .models import Quotation, QuotationItem
+
+
+class ConversionResult:
+    def __init__(self):
+        self.dispatch_notes = {}  # quotation_id -> DispatchNote
+        self.skipped = []         # ids que ya no estaban aprobadas o ya tenían despacho
+        self.lines = 0
+        self.timings = {}
+
+    @property
+    def total_time(self):
+        return sum(self.timings.values())
+
+    def __repr__(self):
+        return f'<ConversionResult convertidas={len(self.dispatch_notes)} omitidas={len(self.skipped)} líneas={self.lines}>'
+
+
+class _Timer:
+    def __init__(self, timings):
+        self.timings = timings
+        self.started = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.timings[phase] = now - self.started
+        self.started = now
+
+
+def convert_quotations(quotations, user=None):
+    """
+    Convierte en notas de despacho las cotizaciones indicadas (instancias o
+    ids). Todo ocurre en una transacción: si falla algo no queda ninguna
+    conversión a medias.
+    """
+    ids = sorted({getattr(quotation, 'pk', quotation) for quotation in quotations})
+    result = ConversionResult()
+    timer = _Timer(result.timings)
+
+    with transaction.atomic():
+        # 1. Bloqueo en orden de id; las filas ya convertidas por otra transacción quedan fuera
+        locked = list(
+            Quotation.objects.select_for_update()
+            .filter(pk__in=ids, status='APPROVED', dispatch_note__isnull=True)
+            .order_by('pk')
+            .values('pk', 'quotation_number', 'client_id')
+        )
+        locked_ids = [row['pk'] for row in locked]
+        result.skipped = [pk for pk in ids if pk not in set(locked_ids)]
+        timer.lap('lock')
+        if not locked:
+            return result
+
+        # 2. Todas las líneas de todas las cotizaciones en una consulta
+        lines_by_quotation = defaultdict(list)
+        for line in (
+            QuotationItem.objects.filter(quotation_id__in=locked_ids)
+            .order_by('pk')
+            .values_list('quotation_id', 'product_id', 'quantity', 'unit_price')
+        ):
+            lines_by_quotation[line[0]].append(line[1:])
+        timer.lap('read_lines')
+
+        # 3-4. Notas de despacho con el total ya calculado
+        now = timezone.now()
+        numbers = DispatchNote.generate_dispatch_numbers(len(locked))
+        notes = []
+        for row, number in zip(locked, numbers):
+            total = sum((quantity * unit_price for _, quantity, unit_price in lines_by_quotation[row['pk']]),
+                        Decimal('0'))
+            notes.append(DispatchNote(
+                dispatch_number=number,
+                client_id=row['client_id'],
+                dispatch_date=now,
+                status='PENDING',
+                created_by=user,
+                notes=f'Generado desde cotización {row["quotation_number"]}',
+                total=total,
+            ))
+        notes = DispatchNote.objects.bulk_create(notes)
+        timer.lap('create_notes')
+
+        items = [
+            DispatchItem(
+                dispatch_note=note,
+                product_id=product_id,
+                quantity=quantity,
+                unit_price=unit_price,
+                subtotal=quantity * unit_price,
+            )
+            for row, note in zip(locked, notes)
+            for product_id, quantity, unit_price in lines_by_quotation[row['pk']]
+        ]
+        DispatchItem.objects.bulk_create(items, batch_size=1000)
+        result.lines = len(items)
+        timer.lap('create_items')
+
+        # 5. APROBADA -> CONVERTIDA (la versión sube para invalidar lecturas concurrentes)
+        converted = []
+        for row, note in zip(locked, notes):
+            converted.append(Quotation(pk=row['pk'], dispatch_note=note))
+            result.dispatch_notes[row['pk']] = note
+        Quotation.objects.bulk_update(converted, ['dispatch_note'], batch_size=1000)
+        Quotation.objects.filter(pk__in=locked_ids).update(status='CONVERTED', version=F('version') + 1)
+        bump(Quotation, DispatchNote)
+        publish_documents(Quotation, locked_ids, 'CONVERTED')
+        timer.lap('mark_converted')
+
+    return result
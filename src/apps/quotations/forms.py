@@ -3,6 +3,7 @@ from django import forms
 from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
 from .models import Quotation, QuotationItem
+from apps.inventory.formsets import BatchedInlineFormSet, BatchedLineForm, PrefetchedModelChoiceField
 from apps.inventory.models import Product
 
 class QuotationForm(forms.ModelForm):
@@ -31,10 +32,11 @@ class QuotationForm(forms.ModelForm):
             default_date = timezone.now().date() + timedelta(days=30)
             self.fields['valid_until'].initial = default_date
 
-class QuotationItemForm(forms.ModelForm):
+class QuotationItemForm(BatchedLineForm):
     class Meta:
         model = QuotationItem
         fields = ['product', 'quantity', 'unit_price']
+        field_classes = {'product': PrefetchedModelChoiceField}
         widgets = {
             'product': forms.Select(attrs={
                 'class': 'form-select product-select',
@@ -81,6 +83,7 @@ QuotationItemFormSet = inlineformset_factory(
     Quotation,
     QuotationItem,
     form=QuotationItemForm,
+    formset=BatchedInlineFormSet,
     extra=1,
     can_delete=True,
     can_delete_extra=True
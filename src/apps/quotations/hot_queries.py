@@ -0,0 +1,13 @@
+# src/apps/quotations/hot_queries.py
+from core.hot_queries import register
+from .models import Quotation
+
+
+@register('quotations.approved')
+def approved():
+    return Quotation.objects.filter(status='APPROVED').order_by('-date_created')
+
+
+@register('quotations.list')
+def latest():
+    return Quotation.objects.order_by('-date_created')[:15]
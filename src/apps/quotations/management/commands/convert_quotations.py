@@ -0,0 +1,47 @@
+# apps/quotations/management/commands/convert_quotations.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quotations.conversion import convert_quotations
+from apps.quotations.models import Quotation
+
+class Command(BaseCommand):
+    help = 'Convierte cotizaciones aprobadas en notas de despacho por lotes e informa los tiempos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Ids de cotizaciones (por defecto: todas las aprobadas)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Cotizaciones por transacción')
+        parser.add_argument('--user', help='Usuario que figura como creador de los despachos')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'Usuario inexistente: {options["user"]}')
+
+        ids = options['ids'] or list(
+            Quotation.objects.filter(status='APPROVED', dispatch_note__isnull=True)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        if not ids:
+            self.stdout.write('No hay cotizaciones aprobadas para convertir.')
+            return
+
+        converted = skipped = lines = 0
+        timings = {}
+        batch_size = max(1, options['batch_size'])
+        for start in range(0, len(ids), batch_size):
+            result = convert_quotations(ids[start:start + batch_size], user)
+            converted += len(result.dispatch_notes)
+            skipped += len(result.skipped)
+            lines += result.lines
+            for phase, seconds in result.timings.items():
+                timings[phase] = timings.get(phase, 0) + seconds
+
+        total = sum(timings.values())
+        self.stdout.write(f'Cotizaciones convertidas: {converted}  omitidas: {skipped}  líneas copiadas: {lines}')
+        for phase, seconds in timings.items():
+            self.stdout.write(f'  {phase:<15} {seconds * 1000:9.1f} ms')
+        self.stdout.write(f'  {"total":<15} {total * 1000:9.1f} ms')
+        self.stdout.write(self.style.SUCCESS('Conversión finalizada.'))
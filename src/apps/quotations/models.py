@@ -1,9 +1,12 @@
 # src/apps/quotations/models.py
-from django.db import models, transaction  # ✅ AGREGAR transaction AQUÍ
+from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from apps.inventory.models import Product, Client
 from apps.dispatch_notes.models import DispatchNote
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Quotation(models.Model):
     STATUS_CHOICES = [
@@ -13,6 +16,12 @@ class Quotation(models.Model):
         ('REJECTED', 'Rechazada'),
         ('CONVERTED', 'Convertida a Despacho'),
     ]
+    # Estados de origen permitidos para cada cambio manual de estado
+    STATUS_TRANSITIONS = {
+        'SENT': ['DRAFT'],
+        'APPROVED': ['DRAFT', 'SENT'],
+        'REJECTED': ['DRAFT', 'SENT'],
+    }
     
     quotation_number = models.CharField(max_length=50, unique=True)
     client = models.ForeignKey(Client, on_delete=models.CASCADE)
@@ -23,6 +32,7 @@ class Quotation(models.Model):
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='DRAFT')
     notes = models.TextField(blank=True)
+    version = models.PositiveIntegerField(default=0, editable=False)
     dispatch_note = models.OneToOneField(
         DispatchNote, 
         on_delete=models.SET_NULL, 
@@ -36,6 +46,10 @@ class Quotation(models.Model):
         verbose_name = "Cotización"
         verbose_name_plural = "Cotizaciones"
         ordering = ['-date_created']
+        indexes = [
+            models.Index(fields=['-date_created'], name='quotation_date_idx'),
+            models.Index(fields=['status', '-date_created'], name='quotation_status_date_idx'),
+        ]
 
     def __str__(self):
         return f'Cotización N° {self.quotation_number}'
@@ -82,56 +96,22 @@ class Quotation(models.Model):
         """Convierte la cotización en una nota de despacho"""
         if not self.can_convert_to_dispatch():
             return None
-        
-        from apps.dispatch_notes.models import DispatchNote, DispatchItem
-        
-        try:
-            # ✅ CORREGIDO: Usar transaction.atomic() directamente
-            with transaction.atomic():
-                # DEBUG
-                print("=== INICIANDO CONVERSIÓN ===")
-                print(f"Cliente: {self.client}")
-                print(f"Items: {self.items.count()}")
-                
-                # Crear la nota de despacho - el número se generará automáticamente
-                dispatch_note = DispatchNote(
-                    client=self.client,
-                    dispatch_date=timezone.now(),
-                    status='PENDING',
-                    created_by=user,
-                    notes=f'Generado desde cotización {self.quotation_number}'
-                )
-                dispatch_note.save()  # Esto generará el número automáticamente
-                
-                print(f"Despacho creado: {dispatch_note.dispatch_number}")
-                
-                # Crear los items del despacho
-                items_created = 0
-                for quotation_item in self.items.all():
-                    DispatchItem.objects.create(
-                        dispatch_note=dispatch_note,
-                        product=quotation_item.product,
-                        quantity=quotation_item.quantity,
-                        unit_price=quotation_item.unit_price
-                    )
-                    items_created += 1
-                
-                print(f"Items creados: {items_created}")
-                
-                # Actualizar la cotización
-                self.dispatch_note = dispatch_note
-                self.status = 'CONVERTED'
-                self.save()
-                
-                print("=== CONVERSIÓN EXITOSA ===")
-                return dispatch_note
-                
-        except Exception as e:
-            # Log del error para debug
-            print(f"Error al convertir cotización a despacho: {str(e)}")
-            import traceback
-            traceback.print_exc()
+
+        from .conversion import convert_quotations
+
+        result = convert_quotations([self], user)
+        logger.info('quotation.convert', extra={
+            'quotation_id': self.pk,
+            'lines': result.lines,
+            'duration_ms': round(result.total_time * 1000, 2),
+            'phases_ms': {phase: round(seconds * 1000, 2) for phase, seconds in result.timings.items()},
+        })
+        dispatch_note = result.dispatch_notes.get(self.pk)
+        if dispatch_note is None:
+            # Otra petición la convirtió primero
             return None
+        self.refresh_from_db(fields=['status', 'version', 'dispatch_note'])
+        return dispatch_note
 
 
 class QuotationItem(models.Model):
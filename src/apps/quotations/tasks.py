@@ -0,0 +1,42 @@
+# src/apps/quotations/tasks.py
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from apps.jobs.queue import JobFailed, task
+from .models import Quotation
+
+@task('quotations.convert_to_dispatch')
+def convert_to_dispatch(job, quotation_id):
+    quotation = Quotation.objects.select_related('client').filter(pk=quotation_id).first()
+    if quotation is None:
+        raise JobFailed('La cotización ya no existe.')
+    if not quotation.can_convert_to_dispatch():
+        raise JobFailed('La cotización no está aprobada o ya tiene un despacho asociado.')
+
+    job.set_progress(10, f'Convirtiendo cotización {quotation.quotation_number}')
+    user = User.objects.filter(pk=job.created_by_id).first()
+    dispatch_note = quotation.convert_to_dispatch_note(user)
+    if dispatch_note is None:
+        raise JobFailed('No se pudo crear el despacho a partir de la cotización.')
+
+    return {
+        'dispatch_note_id': dispatch_note.pk,
+        'dispatch_number': dispatch_note.dispatch_number,
+        'redirect_url': reverse('dispatch_notes:detail', args=[dispatch_note.pk]),
+    }
+
+
+@task('quotations.convert_batch')
+def convert_batch(job, quotation_ids):
+    from .conversion import convert_quotations
+
+    job.set_progress(5, f'Convirtiendo {len(quotation_ids)} cotizaciones')
+    user = User.objects.filter(pk=job.created_by_id).first()
+    result = convert_quotations(quotation_ids, user)
+    return {
+        'converted': {str(pk): note.dispatch_number for pk, note in result.dispatch_notes.items()},
+        'skipped': result.skipped,
+        'lines': result.lines,
+        'timings': result.timings,
+        'redirect_url': reverse('dispatch_notes:list'),
+    }
@@ -1,3 +1,71 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from apps.dispatch_notes.models import DispatchNote
+from apps.inventory.models import Client, Product
+from apps.jobs.models import Job
+from apps.jobs.queue import execute
+
+from .models import Quotation, QuotationItem
+
+
+class BatchConversionViewTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('vendedor', password='x')
+        self.client.login(username='vendedor', password='x')
+        customer = Client.objects.create(name='Cliente')
+        product = Product.objects.create(product_code='P1', description='Producto', unit='UND', unit_price=4)
+        self.quotations = []
+        for index, status in enumerate(['APPROVED', 'APPROVED', 'DRAFT']):
+            quotation = Quotation.objects.create(quotation_number=f'COT-{index}', client=customer, status=status)
+            QuotationItem.objects.create(quotation=quotation, product=product, quantity=index + 1, unit_price=4)
+            self.quotations.append(quotation)
+        self.url = reverse('quotations:convert_batch')
+
+    def ids(self):
+        return [quotation.pk for quotation in self.quotations]
+
+    def test_converts_selected_quotations(self):
+        response = self.client.post(self.url, {'quotation_ids': self.ids()})
+
+        self.assertRedirects(response, reverse('dispatch_notes:list'), fetch_redirect_response=False)
+        self.assertEqual(
+            sorted(Quotation.objects.values_list('quotation_number', 'status')),
+            [('COT-0', 'CONVERTED'), ('COT-1', 'CONVERTED'), ('COT-2', 'DRAFT')],
+        )
+        self.assertEqual(sorted(DispatchNote.objects.values_list('total', flat=True)), [4, 8])
+        self.assertFalse(Job.objects.exists())
+
+    def test_async_enqueues_batch_job(self):
+        response = self.client.post(self.url, {'quotation_ids': self.ids(), 'async': '1'})
+
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('jobs:detail', args=[job.pk]), fetch_redirect_response=False)
+        self.assertEqual((job.task, job.payload, job.created_by), ('quotations.convert_batch',
+                                                                   {'quotation_ids': self.ids()}, self.user))
+        self.assertFalse(DispatchNote.objects.exists())
+
+        execute(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'SUCCEEDED')
+        self.assertEqual(sorted(job.result['converted']), sorted(str(pk) for pk in self.ids()[:2]))
+        self.assertEqual(job.result['skipped'], [self.quotations[2].pk])
+        self.assertEqual(DispatchNote.objects.count(), 2)
+
+    @override_settings(QUOTATION_BATCH_CONVERT_SYNC_LIMIT=1)
+    def test_large_batch_is_enqueued(self):
+        self.client.post(self.url, {'quotation_ids': self.ids()})
+        self.assertEqual(Job.objects.get().task, 'quotations.convert_batch')
+
+    def test_requires_post_and_selection(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        response = self.client.post(self.url, {})
+        self.assertRedirects(response, reverse('quotations:list'), fetch_redirect_response=False)
+        self.assertEqual(self.client.post(self.url, {'quotation_ids': ['x']}).status_code, 400)
+
+    def test_list_offers_only_convertible_quotations(self):
+        response = self.client.get(reverse('quotations:list'))
+        self.assertContains(response, 'name="quotation_ids"', count=2)
+        self.assertContains(response, 'name="idempotency_key"', count=1)
@@ -7,7 +7,7 @@ from .views import (
     QuotationUpdateView,
     change_quotation_status,
     convert_to_dispatch,
-    get_product_price,
+    convert_batch_to_dispatch,
 )
 
 app_name = 'quotations'
@@ -19,5 +19,5 @@ urlpatterns = [
     path('editar/<int:pk>/', QuotationUpdateView.as_view(), name='update'),
     path('<int:pk>/estado/<str:status>/', change_quotation_status, name='change_status'),
     path('<int:pk>/convertir-despacho/', convert_to_dispatch, name='convert_to_dispatch'),
-    path('api/producto/<int:product_id>/precio/', get_product_price, name='get_product_price'),
+    path('convertir-despacho/', convert_batch_to_dispatch, name='convert_batch'),
 ]
\ No newline at end of file
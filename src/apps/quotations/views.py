@@ -1,18 +1,29 @@
 # src/apps/quotations/views.py
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
 from django.db import transaction
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render, redirect, get_object_or_404
+from django.views.decorators.http import require_POST
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.db import transaction
-from django.http import JsonResponse
 from django.utils import timezone  # ✅ AGREGAR ESTA IMPORTACIÓN
+from .conversion import convert_quotations
 from .models import Quotation, QuotationItem
 from .forms import QuotationForm, QuotationItemFormSet
+from apps.httpcache.decorators import ConditionalMixin
+from apps.jobs.queue import enqueue
+from apps.jobs.views import async_requested, job_accepted
+from apps.workflow.decorators import idempotent
+from apps.workflow.transitions import transition
+from core.db_router import ReplicaReadMixin
 
-class QuotationListView(LoginRequiredMixin, ListView):
+class QuotationListView(LoginRequiredMixin, ReplicaReadMixin, ConditionalMixin, ListView):
     model = Quotation
+    cache_models = ('quotations.Quotation', 'dispatch_notes.DispatchNote', 'inventory.Client')
     template_name = 'quotations/quotation_list.html'
     context_object_name = 'quotations'
     paginate_by = 20
@@ -39,8 +50,9 @@ class QuotationListView(LoginRequiredMixin, ListView):
         context['status_choices'] = Quotation.STATUS_CHOICES
         return context
 
-class QuotationDetailView(LoginRequiredMixin, DetailView):
+class QuotationDetailView(LoginRequiredMixin, ConditionalMixin, DetailView):
     model = Quotation
+    cache_models = ('quotations.Quotation', 'dispatch_notes.DispatchNote', 'inventory.Client', 'inventory.Product')
     template_name = 'quotations/quotation_detail.html'
     context_object_name = 'quotation'
     
@@ -67,6 +79,9 @@ class QuotationCreateView(LoginRequiredMixin, CreateView):
         context = self.get_context_data()
         formset = context['formset']
         
+        if not formset.is_valid():
+            return self.form_invalid(form)
+
         with transaction.atomic():
             # Asignar usuario creador
             self.object = form.save(commit=False)
@@ -75,23 +90,8 @@ class QuotationCreateView(LoginRequiredMixin, CreateView):
             # Guardar para generar número automático
             self.object.save()
             
-            if formset.is_valid():
-                # Filtrar forms vacíos
-                instances = formset.save(commit=False)
-                for instance in instances:
-                    # Solo guardar si tiene producto y cantidad
-                    if instance.product and instance.quantity > 0:
-                        instance.save()
-                
-                # Eliminar los marcados para borrar
-                for form in formset.deleted_forms:
-                    if form.instance.pk:
-                        form.instance.delete()
-                        
-                # Recalcular total
-                self.object.save()
-            else:
-                return self.form_invalid(form)
+            # Líneas en lote (los formularios vacíos se omiten); el total se calcula en memoria
+            formset.save_lines(self.object)
         
         messages.success(self.request, f'Cotización {self.object.quotation_number} creada exitosamente.')
         return redirect(self.get_success_url())
@@ -114,46 +114,38 @@ class QuotationUpdateView(LoginRequiredMixin, UpdateView):
         context = self.get_context_data()
         formset = context['formset']
         
+        if not formset.is_valid():
+            return self.form_invalid(form)
+
         with transaction.atomic():
             self.object = form.save()
             
-            if formset.is_valid():
-                instances = formset.save(commit=False)
-                for instance in instances:
-                    if instance.product and instance.quantity > 0:
-                        instance.save()
-                
-                for form in formset.deleted_forms:
-                    if form.instance.pk:
-                        form.instance.delete()
-                        
-                # Recalcular total
-                self.object.save()
-            else:
-                return self.form_invalid(form)
+            # Altas, cambios y bajas de líneas en lote; el total se calcula en memoria
+            formset.save_lines(self.object)
         
         messages.success(self.request, f'Cotización {self.object.quotation_number} actualizada exitosamente.')
         return redirect(self.get_success_url())
 
+@idempotent('quotations.change_status')
 def change_quotation_status(request, pk, status):
     """Vista para cambiar el estado de una cotización"""
     quotation = get_object_or_404(Quotation, pk=pk)
     
-    if status in ['SENT', 'APPROVED', 'REJECTED']:
-        quotation.status = status
-        
+    if status in Quotation.STATUS_TRANSITIONS:
+        changes = {}
         if status == 'SENT':
-            # ✅ timezone ya está importado globalmente
-            quotation.date_sent = timezone.now()
+            changes['date_sent'] = timezone.now()
         elif status == 'APPROVED':
-            # ✅ timezone ya está importado globalmente
-            quotation.date_approved = timezone.now()
+            changes['date_approved'] = timezone.now()
         
-        quotation.save()
-        messages.success(request, f'Estado de la cotización actualizado a {quotation.get_status_display()}.')
+        if transition(quotation, status, Quotation.STATUS_TRANSITIONS[status], **changes):
+            messages.success(request, f'Estado de la cotización actualizado a {quotation.get_status_display()}.')
+        else:
+            messages.error(request, 'La cotización cambió de estado mientras tanto; no se aplicó el cambio.')
     
     return redirect('quotations:detail', pk=pk)
 
+@idempotent('quotations.convert_to_dispatch')
 def convert_to_dispatch(request, pk):
     """Vista para convertir cotización en nota de despacho"""
     quotation = get_object_or_404(Quotation, pk=pk)
@@ -162,6 +154,10 @@ def convert_to_dispatch(request, pk):
         messages.error(request, 'No se puede convertir esta cotización en despacho. Verifica que esté aprobada y no tenga ya un despacho asociado.')
         return redirect('quotations:detail', pk=pk)
     
+    if async_requested(request):
+        job = enqueue('quotations.convert_to_dispatch', user=request.user, quotation_id=quotation.pk)
+        return job_accepted(request, job, f'Convirtiendo la cotización {quotation.quotation_number} en despacho...')
+
     try:
         dispatch_note = quotation.convert_to_dispatch_note(request.user)
         if dispatch_note:
@@ -174,28 +170,30 @@ def convert_to_dispatch(request, pk):
     
     return redirect('quotations:detail', pk=pk)
 
-def get_product_price(request, product_id):
-    """API para obtener el precio de un producto"""
-    from apps.inventory.models import Product
+@login_required
+@require_POST
+@idempotent('quotations.convert_batch')
+def convert_batch_to_dispatch(request):
+    """
+    Convierte en notas de despacho las cotizaciones marcadas en el listado
+    (``quotation_ids``). Con ``async=1``, o si son más de
+    ``QUOTATION_BATCH_CONVERT_SYNC_LIMIT``, se encola ``quotations.convert_batch``.
+    """
     try:
-        product = Product.objects.get(id=product_id)
-        
-        # Intentar diferentes nombres de campo de precio
-        price_fields = ['unit_price', 'price', 'sale_price', 'cost_price']
-        price = 0
-        
-        for field in price_fields:
-            if hasattr(product, field):
-                price = getattr(product, field)
-                break
-        
-        return JsonResponse({
-            'price': float(price),
-            'product_code': product.product_code,
-            'description': product.description
-        })
-        
-    except Product.DoesNotExist:
-        return JsonResponse({'error': 'Producto no encontrado'}, status=404)
-    except Exception as e:
-        return JsonResponse({'error': f'Error interno: {str(e)}'}, status=500)
\ No newline at end of file
+        ids = sorted({int(pk) for pk in request.POST.getlist('quotation_ids')})
+    except ValueError:
+        return HttpResponseBadRequest('Cotizaciones no válidas.')
+    if not ids:
+        messages.warning(request, 'Seleccione al menos una cotización aprobada.')
+        return redirect('quotations:list')
+
+    if async_requested(request) or len(ids) > settings.QUOTATION_BATCH_CONVERT_SYNC_LIMIT:
+        job = enqueue('quotations.convert_batch', user=request.user, quotation_ids=ids)
+        return job_accepted(request, job, f'Convirtiendo {len(ids)} cotizaciones en notas de despacho...')
+
+    result = convert_quotations(ids, request.user)
+    if result.dispatch_notes:
+        messages.success(request, f'{len(result.dispatch_notes)} cotizaciones convertidas en notas de despacho.')
+    if result.skipped:
+        messages.warning(request, f'{len(result.skipped)} cotizaciones no estaban aprobadas o ya tenían despacho.')
+    return redirect('dispatch_notes:list' if result.dispatch_notes else 'quotations:list')
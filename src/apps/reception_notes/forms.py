@@ -2,6 +2,7 @@
 from django import forms
 from django.forms import inlineformset_factory
 from .models import ReceptionNote, ReceptionItem
+from apps.inventory.formsets import BatchedInlineFormSet, BatchedLineForm, PrefetchedModelChoiceField
 
 class ReceptionNoteForm(forms.ModelForm):
     class Meta:
@@ -11,10 +12,11 @@ class ReceptionNoteForm(forms.ModelForm):
             'notes': forms.Textarea(attrs={'rows': 3, 'placeholder': 'Observaciones opcionales...'}),
         }
 
-class ReceptionItemForm(forms.ModelForm):
+class ReceptionItemForm(BatchedLineForm):
     class Meta:
         model = ReceptionItem
         fields = ['product', 'quantity', 'unit_price']
+        field_classes = {'product': PrefetchedModelChoiceField}
         widgets = {
             'quantity': forms.NumberInput(attrs={'min': 1, 'step': 1}),
             'unit_price': forms.NumberInput(attrs={'min': 0, 'step': '0.01'}),
@@ -24,6 +26,7 @@ ReceptionItemFormSet = inlineformset_factory(
     ReceptionNote,
     ReceptionItem,
     form=ReceptionItemForm,
+    formset=BatchedInlineFormSet,
     extra=1,
     can_delete=True
 )
\ No newline at end of file
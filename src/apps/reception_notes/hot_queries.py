@@ -0,0 +1,13 @@
+# src/apps/reception_notes/hot_queries.py
+from core.hot_queries import register
+from .models import ReceptionNote
+
+
+@register('reception_notes.pending')
+def pending():
+    return ReceptionNote.objects.filter(status='PENDING').order_by('-receipt_date')
+
+
+@register('reception_notes.list')
+def latest():
+    return ReceptionNote.objects.order_by('-receipt_date')[:15]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reception_notes', '0002_alter_receptionnote_receipt_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='receptionnote',
+            index=models.Index(fields=['-receipt_date'], name='reception_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receptionnote',
+            index=models.Index(fields=['status', '-receipt_date'], name='reception_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receptionnote',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-receipt_date'], name='reception_pending_idx'),
+        ),
+    ]
@@ -3,8 +3,9 @@ from django.db import models
 from django.utils import timezone
 from django.db.models import Max
 from apps.inventory.models import Product, Supplier
+from apps.inventory.stock import add_stock
 from django.contrib.auth.models import User
-from django.db.models import F
+from django.db.models import F, Q
 
 class ReceptionNote(models.Model):
     RECEIPT_STATUS_CHOICES = [
@@ -20,10 +21,17 @@ class ReceptionNote(models.Model):
     status = models.CharField(max_length=20, choices=RECEIPT_STATUS_CHOICES, default='PENDING', verbose_name="Estado")
     notes = models.TextField(blank=True, verbose_name="Observaciones")
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False, verbose_name="Total")
+    version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Versión")
 
     class Meta:
         verbose_name = "Nota de Recepción"
         verbose_name_plural = "Notas de Recepción"
+        indexes = [
+            models.Index(fields=['-receipt_date'], name='reception_date_idx'),
+            models.Index(fields=['status', '-receipt_date'], name='reception_status_date_idx'),
+            models.Index(fields=['-receipt_date'], name='reception_pending_idx',
+                         condition=Q(status='PENDING')),
+        ]
 
     def __str__(self):
         return f'Nota de Recepción #{self.receipt_number}'
@@ -72,6 +80,7 @@ class ReceptionItem(models.Model):
 
     def save(self, *args, **kwargs):
         self.subtotal = self.quantity * self.unit_price
+        is_new = self._state.adding
         super().save(*args, **kwargs)
         
         # Actualizar el total de la nota de recepción
@@ -79,6 +88,5 @@ class ReceptionItem(models.Model):
             self.receipt_note.update_total()
         
         # Actualizar stock al guardar un nuevo ítem de recepción (solo si la recepción está validada)
-        if self.pk is None and self.receipt_note.status == 'RECEIVED':
-            self.product.current_stock = F('current_stock') + self.quantity
-            self.product.save(update_fields=['current_stock'])
\ No newline at end of file
+        if is_new and self.receipt_note.status == 'RECEIVED':
+            add_stock([(self.product_id, self.quantity)])
@@ -4,12 +4,15 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db import transaction
-from django.db.models import F
+from django.contrib import messages
 from .models import ReceptionNote, ReceptionItem
 from .forms import ReceptionNoteForm, ReceptionItemFormSet
-from apps.inventory.models import Product
+from apps.inventory.stock import add_stock
+from apps.workflow.decorators import idempotent
+from apps.workflow.transitions import transition
+from core.db_router import ReplicaReadMixin
 
-class ReceptionNoteListView(LoginRequiredMixin, ListView):
+class ReceptionNoteListView(LoginRequiredMixin, ReplicaReadMixin, ListView):
     model = ReceptionNote
     template_name = 'reception_notes/reception_list.html'
     context_object_name = 'receptions'
@@ -35,20 +38,16 @@ class ReceptionNoteCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         context = self.get_context_data()
         formset = context['formset']
+        if not formset.is_valid():
+            return self.form_invalid(form)
         
         with transaction.atomic():
             # Asignar el usuario actual como creador
             form.instance.created_by = self.request.user
             self.object = form.save()
             
-            if formset.is_valid():
-                formset.instance = self.object
-                formset.save()
-                
-                # Actualizar el total después de guardar los items
-                self.object.update_total()
-            else:
-                return self.form_invalid(form)
+            # Líneas en lote; el total se calcula en memoria
+            formset.save_lines(self.object)
             
         return redirect(self.get_success_url())
 
@@ -79,37 +78,29 @@ class ReceptionNoteUpdateView(LoginRequiredMixin, UpdateView):
     def form_valid(self, form):
         context = self.get_context_data()
         formset = context['formset']
+        if not formset.is_valid():
+            return self.form_invalid(form)
         
         with transaction.atomic():
             self.object = form.save()
             
-            if formset.is_valid():
-                formset.instance = self.object
-                formset.save()
-                
-                # Actualizar el total después de guardar los items
-                self.object.update_total()
-            else:
-                return self.form_invalid(form)
+            # Líneas en lote; el total se calcula en memoria
+            created, _, _ = formset.save_lines(self.object)
+            
+            # Las líneas nuevas de una recepción ya validada suman stock
+            if created and self.object.status == 'RECEIVED':
+                add_stock((item.product_id, item.quantity) for item in created)
             
         return redirect(self.get_success_url())
 
+@idempotent('reception_notes.validate')
 @transaction.atomic
 def validate_reception_note(request, pk):
     reception_note = get_object_or_404(ReceptionNote, pk=pk)
-    if request.method == 'POST' and reception_note.status == 'PENDING':
-        # 1. Cambiar el estado de la nota a 'RECEIVED'
-        reception_note.status = 'RECEIVED'
-        reception_note.save()
-
-        # 2. Iterar sobre cada item y actualizar el inventario
-        for item in reception_note.items.all():
-            # Usar F() expression para evitar condiciones de carrera
-            item.product.current_stock = F('current_stock') + item.quantity
-            item.product.save(update_fields=['current_stock'])
-            
-            # Actualizar el producto para cargar el nuevo valor
-            item.product.refresh_from_db()
+    # 1. Cambiar el estado de la nota a 'RECEIVED' (compare-and-swap: solo una petición gana)
+    if request.method == 'POST' and transition(reception_note, 'RECEIVED', ['PENDING']):
+        # 2. Sumar al inventario todas las líneas en un solo UPDATE
+        add_stock(reception_note.items.values_list('product_id', 'quantity'))
 
         # Mensaje de éxito
         messages.success(request, f'Nota de recepción #{reception_note.receipt_number} validada correctamente. Inventario actualizado.')
@@ -0,0 +1,13 @@
+# src/apps/returns/hot_queries.py
+from core.hot_queries import register
+from .models import ReturnNote
+
+
+@register('returns.pending')
+def pending():
+    return ReturnNote.objects.filter(status='PENDING').order_by('-return_date')
+
+
+@register('returns.list')
+def latest():
+    return ReturnNote.objects.order_by('-return_date')[:15]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('returns', '0003_returnnote_processed_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='returnnote',
+            index=models.Index(fields=['-return_date'], name='return_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='returnnote',
+            index=models.Index(fields=['status', '-return_date'], name='return_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='returnnote',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-return_date'], name='return_pending_idx'),
+        ),
+    ]
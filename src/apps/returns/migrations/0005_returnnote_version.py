@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('returns', '0004_returnnote_return_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='returnnote',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Versión'),
+        ),
+    ]
@@ -5,7 +5,7 @@ from django.core.exceptions import ValidationError
 from apps.dispatch_notes.models import DispatchNote, DispatchItem
 from apps.inventory.models import Product, Client
 from django.contrib.auth.models import User
-from django.db.models import F
+from django.db.models import F, Q
 
 class ReturnNote(models.Model):
     RETURN_STATUS_CHOICES = [
@@ -22,10 +22,17 @@ class ReturnNote(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Creado por")
     status = models.CharField(max_length=20, choices=RETURN_STATUS_CHOICES, default='PENDING', verbose_name="Estado")
     notes = models.TextField(blank=True, verbose_name="Observaciones")
+    version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Versión")
 
     class Meta:
         verbose_name = "Nota de Devolución"
         verbose_name_plural = "Notas de Devolución"
+        indexes = [
+            models.Index(fields=['-return_date'], name='return_date_idx'),
+            models.Index(fields=['status', '-return_date'], name='return_status_date_idx'),
+            models.Index(fields=['-return_date'], name='return_pending_idx',
+                         condition=Q(status='PENDING')),
+        ]
 
     def __str__(self):
         return f'Nota de Devolución #{self.return_number}'
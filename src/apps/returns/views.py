@@ -11,6 +11,9 @@ from django.utils import timezone  # ¡IMPORTANTE: Agregar esta importación!
 from .models import ReturnNote, ReturnItem
 from .forms import ReturnNoteForm, ReturnItemFormSet
 from apps.dispatch_notes.models import DispatchNote
+from apps.inventory.stock import add_stock
+from apps.workflow.decorators import idempotent
+from apps.workflow.transitions import transition
 
 class ReturnNoteListView(LoginRequiredMixin, ListView):
     model = ReturnNote
@@ -147,27 +150,20 @@ class ReturnNoteDetailView(LoginRequiredMixin, DetailView):
         context['items'] = self.object.items.select_related('product')
         return context
 
-@transaction.atomic
+@idempotent('returns.process')
 def process_return_note(request, pk):
     return_note = get_object_or_404(ReturnNote, pk=pk)
     
-    # Verificar que la devolución esté pendiente
-    if return_note.status != 'PENDING':
-        messages.error(request, f'La devolución #{return_note.return_number} ya fue procesada anteriormente.')
-        return redirect('returns:detail', pk=return_note.pk)
-    
     if request.method == 'POST':
         try:
-            # Cambiar estado primero
-            return_note.status = 'RETURNED'
-            return_note.processed_date = timezone.now()  # ¡Ahora funciona!
-            return_note.save()
-            
-            # Actualizar stock para cada producto
-            for item in return_note.items.all():
-                product = item.product
-                product.current_stock += item.quantity
-                product.save(update_fields=['current_stock'])
+            with transaction.atomic():
+                # Cambiar estado primero (compare-and-swap: un doble envío no suma dos veces)
+                if not transition(return_note, 'RETURNED', ['PENDING'], processed_date=timezone.now()):
+                    messages.error(request, f'La devolución #{return_note.return_number} ya fue procesada anteriormente.')
+                    return redirect('returns:detail', pk=return_note.pk)
+                
+                # Actualizar stock de todos los productos en un solo UPDATE atómico
+                add_stock(return_note.items.values_list('product_id', 'quantity'))
                 
                 # Opcional: registrar el movimiento en un log
                 # create_stock_movement_log(product, item.quantity, 'RETURN', return_note)
@@ -176,8 +172,6 @@ def process_return_note(request, pk):
             
         except Exception as e:
             messages.error(request, f'Error al procesar la devolución: {str(e)}')
-            # El transaction.atomic hará rollback automáticamente
-        
-        return redirect('returns:detail', pk=return_note.pk)
+            # El transaction.atomic interno ya hizo rollback del estado y del stock
     
     return redirect('returns:detail', pk=return_note.pk)
\ No newline at end of file
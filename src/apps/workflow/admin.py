@@ -0,0 +1,10 @@
+# src/apps/workflow/admin.py
+from django.contrib import admin
+from .models import IdempotencyKey
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'key', 'user', 'response_status', 'created_at')
+    list_filter = ('scope',)
+    search_fields = ('key',)
+    readonly_fields = [field.name for field in IdempotencyKey._meta.fields]
@@ -0,0 +1,8 @@
+# src/apps/workflow/apps.py
+from django.apps import AppConfig
+
+class WorkflowConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.workflow'
+    label = 'workflow'
+    verbose_name = 'Flujo de documentos'
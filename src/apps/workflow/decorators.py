@@ -0,0 +1,113 @@
+# src/apps/workflow/decorators.py
+import hashlib
+from functools import wraps
+
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseRedirect
+
+from .models import IdempotencyKey
+
+
+def get_idempotency_key(request):
+    """Clave enviada por cabecera ``Idempotency-Key`` o campo/parámetro ``idempotency_key``."""
+    key = (
+        request.headers.get('Idempotency-Key')
+        or request.POST.get('idempotency_key')
+        or request.GET.get('idempotency_key')
+    )
+    return key[:64] if key else None
+
+
+# Campos del formulario que no forman parte de la operación
+IGNORED_FIELDS = {'idempotency_key', 'csrfmiddlewaretoken'}
+
+
+def request_hash(request):
+    """Huella de método, ruta, usuario y datos enviados (sin la clave ni el token CSRF)."""
+    fields = sorted((name, values) for name, values in request.POST.lists() if name not in IGNORED_FIELDS)
+    digest = hashlib.sha256()
+    digest.update(repr((request.method, request.path, request.user.pk, fields)).encode())
+    return digest.hexdigest()
+
+
+def _queued_errors(request):
+    storage = getattr(request, '_messages', None)
+    return [message for message in getattr(storage, '_queued_messages', ()) if message.level >= messages.ERROR]
+
+
+def _failed(request, response, errors_before):
+    """Respuesta de error, o redirección después de que la vista añadiera un ``messages.error``."""
+    return response.status_code >= 400 or len(_queued_errors(request)) > errors_before
+
+
+def _replay(request, record):
+    if record.response_location:
+        messages.info(request, 'Esta operación ya había sido procesada.')
+        return HttpResponseRedirect(record.response_location, status=record.response_status)
+    response = HttpResponse(
+        record.response_body,
+        status=record.response_status,
+        content_type=record.response_content_type or None,
+    )
+    response['Idempotent-Replay'] = 'true'
+    return response
+
+
+def idempotent(scope):
+    """
+    Hace idempotente una vista de transición de estado.
+
+    La clave se inserta en la misma transacción que el trabajo de la vista:
+    un reintento concurrente con la misma clave queda bloqueado por el índice
+    único hasta que la primera petición termina y luego recibe la respuesta
+    guardada. Sin clave, la vista se ejecuta normalmente (el compare-and-swap
+    de ``transition`` sigue evitando el doble procesamiento).
+
+    La misma clave con otra petición (otra ruta, usuario o datos) se rechaza
+    con 422. Si la vista falla (excepción, respuesta 4xx/5xx o un
+    ``messages.error``) la clave no se guarda y el reintento vuelve a
+    ejecutarla.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = get_idempotency_key(request)
+            if not key:
+                return view(request, *args, **kwargs)
+
+            fingerprint = request_hash(request)
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        record = IdempotencyKey.objects.create(
+                            key=key, scope=scope, response_status=0, request_hash=fingerprint,
+                            user=request.user if request.user.is_authenticated else None,
+                        )
+                except IntegrityError:
+                    record = IdempotencyKey.objects.get(key=key, scope=scope)
+                    if record.request_hash and record.request_hash != fingerprint:
+                        return HttpResponse(
+                            'La clave de idempotencia ya se usó con otra petición.', status=422,
+                            content_type='text/plain; charset=utf-8',
+                        )
+                    return _replay(request, record)
+
+                errors_before = len(_queued_errors(request))
+                response = view(request, *args, **kwargs)
+                if _failed(request, response, errors_before):
+                    record.delete()
+                    return response
+
+                record.response_status = response.status_code
+                if response.has_header('Location'):
+                    record.response_location = response['Location']
+                elif not response.streaming:
+                    record.response_body = response.content.decode(response.charset, 'replace')
+                    record.response_content_type = response.get('Content-Type', '')
+                record.save(update_fields=[
+                    'response_status', 'response_location', 'response_body', 'response_content_type',
+                ])
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,98 @@
+# apps/workflow/management/commands/bench_transitions.py
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from apps.dispatch_notes.models import DispatchItem, DispatchNote
+from apps.inventory.models import Product
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de contención: varios clientes confirman a la vez la misma nota de despacho '
+        'y se verifica que el stock se descuente una sola vez'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=50, help='Notas de despacho a confirmar')
+        parser.add_argument('--contenders', type=int, default=8, help='Peticiones simultáneas por nota')
+        parser.add_argument(
+            '--shared-key', action='store_true',
+            help='Todas las peticiones de una nota comparten Idempotency-Key (simula reintentos)',
+        )
+        parser.add_argument('--keep', action='store_true', help='No borrar los datos de prueba')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor == 'sqlite':
+            raise CommandError('SQLite serializa las escrituras; ejecute el benchmark contra PostgreSQL.')
+
+        notes_count, contenders = options['notes'], options['contenders']
+        user, _ = User.objects.get_or_create(username='bench_transitions', defaults={'is_staff': True})
+        product = Product.objects.create(
+            product_code=f'BENCH-{uuid.uuid4().hex[:8]}', description='Producto benchmark transiciones',
+            unit='UND', unit_price=1, current_stock=notes_count,
+        )
+        notes = []
+        for _ in range(notes_count):
+            note = DispatchNote.objects.create(created_by=user)
+            DispatchItem.objects.create(dispatch_note=note, product=product, quantity=1, unit_price=1)
+            notes.append(note)
+
+        latencies = []
+        lock = threading.Lock()
+
+        def race(note):
+            barrier = threading.Barrier(contenders)
+            key = uuid.uuid4().hex
+
+            def contender(_):
+                client = Client()
+                client.force_login(user)
+                headers = {'HTTP_IDEMPOTENCY_KEY': key if options['shared_key'] else uuid.uuid4().hex}
+                url = reverse('dispatch_notes:confirm_dispatch', args=[note.pk])
+                barrier.wait()
+                started = time.perf_counter()
+                try:
+                    client.post(url, **headers)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                    connections.close_all()
+
+            with ThreadPoolExecutor(max_workers=contenders) as pool:
+                list(pool.map(contender, range(contenders)))
+
+        started = time.perf_counter()
+        for note in notes:
+            race(note)
+        wall = time.perf_counter() - started
+
+        product.refresh_from_db()
+        dispatched = DispatchNote.objects.filter(pk__in=[n.pk for n in notes], status='DISPATCHED').count()
+        versions = set(DispatchNote.objects.filter(pk__in=[n.pk for n in notes]).values_list('version', flat=True))
+
+        total = len(latencies)
+        latencies.sort()
+        self.stdout.write(f'Peticiones: {total} ({contenders} simultáneas por nota)')
+        self.stdout.write(f'Tiempo total: {wall:.2f}s  ->  {total / wall:.0f} peticiones/s')
+        self.stdout.write(
+            f'Latencia p50: {statistics.median(latencies) * 1000:.1f} ms  '
+            f'p95: {latencies[int(total * 0.95) - 1] * 1000:.1f} ms'
+        )
+        self.stdout.write(f'Notas despachadas: {dispatched}/{notes_count}  stock final: {product.current_stock}')
+
+        ok = dispatched == notes_count and product.current_stock == 0 and versions == {1}
+        if not options['keep']:
+            DispatchNote.objects.filter(pk__in=[n.pk for n in notes]).delete()
+            product.delete()
+        if not ok:
+            raise CommandError('Se detectó doble procesamiento o transiciones perdidas.')
+        self.stdout.write(self.style.SUCCESS('Cada nota se despachó exactamente una vez.'))
@@ -0,0 +1,18 @@
+# apps/workflow/management/commands/purge_idempotency_keys.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.workflow.models import IdempotencyKey
+
+class Command(BaseCommand):
+    help = 'Elimina las claves de idempotencia más antiguas que la ventana indicada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Días que se conservan las claves')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} claves de idempotencia eliminadas.'))
@@ -0,0 +1,33 @@
+# src/apps/workflow/models.py
+from django.db import models
+from django.contrib.auth.models import User
+
+class IdempotencyKey(models.Model):
+    """
+    Resultado de una transición de estado ya ejecutada. Un reintento con la
+    misma clave y el mismo ``scope`` devuelve la respuesta guardada en lugar
+    de repetir el trabajo (descontar stock dos veces, etc.).
+    """
+    key = models.CharField(max_length=64, verbose_name="Clave")
+    scope = models.CharField(max_length=100, verbose_name="Operación")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Usuario")
+    # Huella de la petición original: la misma clave con otros datos se rechaza
+    request_hash = models.CharField(max_length=64, blank=True, verbose_name="Huella de la petición")
+    response_status = models.PositiveSmallIntegerField(verbose_name="Código de respuesta")
+    response_location = models.CharField(max_length=500, blank=True, verbose_name="Redirección")
+    response_body = models.TextField(blank=True, verbose_name="Cuerpo de la respuesta")
+    response_content_type = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado en")
+
+    class Meta:
+        verbose_name = "Clave de idempotencia"
+        verbose_name_plural = "Claves de idempotencia"
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_scope_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}:{self.key}'
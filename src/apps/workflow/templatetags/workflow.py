@@ -0,0 +1,19 @@
+# src/apps/workflow/templatetags/workflow.py
+import uuid
+
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_key():
+    """Genera una clave nueva por renderizado: ``{% idempotency_key as key %}``."""
+    return uuid.uuid4().hex
+
+
+@register.simple_tag
+def idempotency_field():
+    """Campo oculto con una clave nueva para formularios POST de transición."""
+    return format_html('<input type="hidden" name="idempotency_key" value="{}">', uuid.uuid4().hex)
@@ -0,0 +1,105 @@
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.test import RequestFactory, TestCase
+
+from apps.orders.models import Order
+
+from .decorators import idempotent
+from .models import IdempotencyKey
+from .transitions import transition
+
+
+class TransitionTests(TestCase):
+
+    def test_stale_version_is_rejected(self):
+        order = Order.objects.create(order_number='OC-1')
+        stale = Order.objects.get(pk=order.pk)
+
+        self.assertTrue(transition(order, 'APPROVED', ['PENDING']))
+        self.assertEqual(order.version, 1)
+        # Misma transición con la versión leída antes del cambio
+        self.assertFalse(transition(stale, 'CANCELLED', ['PENDING', 'APPROVED']))
+        self.assertEqual((stale.status, stale.version), ('PENDING', 0))
+
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.version), ('APPROVED', 1))
+
+    def test_unexpected_status_is_rejected(self):
+        order = Order.objects.create(order_number='OC-2', status='DELIVERED')
+        self.assertFalse(transition(order, 'CANCELLED', ['PENDING', 'APPROVED']))
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.version), ('DELIVERED', 0))
+
+
+class IdempotentTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user('operador')
+        self.calls = 0
+
+    def post(self, view, key='clave-1', path='/documentos/1/confirmar/', **data):
+        request = self.factory.post(path, data, HTTP_IDEMPOTENCY_KEY=key)
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        return view(request)
+
+    def counting_view(self, response_factory):
+        @idempotent('tests.operation')
+        def view(request):
+            self.calls += 1
+            return response_factory(request)
+        return view
+
+    def test_same_key_replays_stored_response(self):
+        view = self.counting_view(lambda request: HttpResponse(f'hecho {self.calls}', status=201))
+        first = self.post(view, quantity='3')
+        second = self.post(view, quantity='3')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((second.status_code, second.content), (201, first.content))
+        self.assertEqual(second['Idempotent-Replay'], 'true')
+
+    def test_same_key_replays_redirect(self):
+        view = self.counting_view(lambda request: redirect('/documentos/1/'))
+        self.post(view)
+        second = self.post(view)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((second.status_code, second['Location']), (302, '/documentos/1/'))
+
+    def test_same_key_with_other_request_is_rejected(self):
+        view = self.counting_view(lambda request: HttpResponse('hecho'))
+        self.post(view, quantity='3')
+
+        self.assertEqual(self.post(view, quantity='4').status_code, 422)
+        self.assertEqual(self.post(view, path='/documentos/2/confirmar/', quantity='3').status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_request_does_not_store_key(self):
+        def fail_with_message(request):
+            messages.error(request, 'Stock insuficiente.')
+            return redirect('/documentos/1/')
+
+        for response_factory in (lambda request: HttpResponse('error', status=409), fail_with_message):
+            view = self.counting_view(response_factory)
+            self.post(view)
+            self.post(view)
+            self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.calls, 4)
+
+    def test_exception_does_not_store_key(self):
+        def explode(request):
+            raise RuntimeError('fallo')
+
+        view = self.counting_view(explode)
+        with self.assertRaises(RuntimeError):
+            self.post(view)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        ok = self.counting_view(lambda request: HttpResponse('hecho'))
+        self.post(ok)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 200)
@@ -0,0 +1,47 @@
+# src/apps/workflow/transitions.py
+"""
+Transiciones de estado con compare-and-swap.
+
+Los documentos (despachos, recepciones, devoluciones, órdenes y cotizaciones)
+tienen una columna ``version``. Una transición es un único UPDATE
+condicionado al estado de origen y a la versión leída::
+
+    UPDATE ... SET status = 'DISPATCHED', version = version + 1
+    WHERE id = 7 AND status IN ('PENDING') AND version = 3
+
+Si dos peticiones compiten (doble clic, reintento), solo una actualiza la
+fila; la otra recibe ``False`` y no debe ejecutar los efectos (stock,
+movimientos). Llamar siempre dentro de la misma ``transaction.atomic`` que
+los efectos, para que un fallo posterior revierta también el estado.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from apps.changefeed.events import publish_documents
+from apps.httpcache.versions import bump
+
+
+def transition(instance, to_status, from_statuses, **changes):
+    """
+    Cambia ``instance.status`` a ``to_status`` si en la base de datos sigue en
+    uno de ``from_statuses`` y con la misma ``version`` con la que se leyó.
+    Devuelve ``True`` si esta llamada ganó la transición.
+    """
+    model = type(instance)
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            changes.setdefault(field.name, timezone.now())
+
+    updated = model.objects.filter(
+        pk=instance.pk, status__in=list(from_statuses), version=instance.version,
+    ).update(status=to_status, version=F('version') + 1, **changes)
+    if not updated:
+        return False
+    bump(model, ids=[instance.pk])
+    publish_documents(model, [instance.pk], to_status)
+
+    instance.status = to_status
+    instance.version += 1
+    for name, value in changes.items():
+        setattr(instance, name, value)
+    return True
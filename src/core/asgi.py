@@ -3,14 +3,69 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Es el punto de entrada del servidor (``uvicorn core.asgi:application``, ver
+docker-compose.yml). El canal de cambios (``/cambios/``, apps.changefeed)
+mantiene una conexión abierta por cliente; con ASGI cada conexión es una
+corrutina en lugar de un hilo del servidor. Con WSGI el canal responde 503
+salvo con ``CHANGEFEED_WSGI_STREAM=1``.
+
+Django 4.2 no lee ``receive()`` mientras envía una respuesta en streaming, así
+que no se entera de que el cliente cerró la conexión y el stream seguiría
+enviando pings para siempre. ``DisconnectMiddleware`` vigila
+``http.disconnect`` y cancela la respuesta en curso; al cancelarse, el
+generador del stream ejecuta su ``finally`` y da de baja la suscripción.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
+import asyncio
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+
+class DisconnectMiddleware:
+    """Cancela la petición HTTP en curso cuando llega ``http.disconnect``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        # La aplicación lee los mensajes desde esta cola; una plaza conserva la
+        # contrapresión al recibir el cuerpo de la petición
+        messages = asyncio.Queue(maxsize=1)
+        app_task = asyncio.ensure_future(self.app(scope, messages.get, send))
+        disconnected = False
+
+        async def watch():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message['type'] == 'http.disconnect':
+                    disconnected = True
+                    app_task.cancel()
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+        finally:
+            watcher.cancel()
+
+
+application = DisconnectMiddleware(get_asgi_application())
+
+# El hilo de escucha del broker arranca con el proceso y no con el primer cliente
+from apps.changefeed.brokers import get_broker  # noqa: E402
+
+get_broker().start()
@@ -0,0 +1,149 @@
+# src/core/db_router.py
+"""
+Lecturas en la réplica de PostgreSQL (alias ``replica``, configurado solo
+si existe ``DB_REPLICA_HOST``).
+
+Por defecto todo va al primario. Leen de la réplica:
+
+- las vistas marcadas con ``replica_reads`` o ``ReplicaReadMixin``
+  (listados, panel, reportes), solo en GET y HEAD; ``ReplicaMiddleware``
+  abre el contexto, que cubre también el renderizado de la plantilla;
+- las tareas de reportes y exportaciones, dentro de ``use_replica()``.
+
+Se vuelve al primario:
+
+- en cuanto la petición escribe, y dentro de ``transaction.atomic``;
+- durante ``DATABASE_REPLICA_MAX_LAG`` segundos después de una petición que
+  escribió (cookie de ``ReplicaMiddleware``): el GET que sigue a un
+  formulario ve lo que el usuario acaba de guardar;
+- si el retraso de la réplica supera ``DATABASE_REPLICA_MAX_LAG`` o no
+  responde. Se mide como mucho una vez cada
+  ``DATABASE_REPLICA_CHECK_INTERVAL`` segundos por proceso.
+"""
+import contextlib
+import contextvars
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+
+# 0 si la réplica aplicó todo lo recibido (o si el alias apunta a un
+# primario); si no, la antigüedad de la última transacción aplicada.
+# NULL mientras no haya aplicado ninguna: se trata como no disponible.
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+class Routing:
+    """Destino de las lecturas de la petición o tarea en curso."""
+    __slots__ = ('replica', 'pin_on_write', 'wrote')
+
+    def __init__(self, replica=False, pin_on_write=True):
+        self.replica = replica
+        self.pin_on_write = pin_on_write
+        self.wrote = False
+
+
+_routing = contextvars.ContextVar('db_routing', default=None)
+_health = {'checked': None, 'usable': False, 'lag': None}
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextlib.contextmanager
+def routing(replica=False, pin_on_write=True):
+    token = _routing.set(Routing(replica, pin_on_write))
+    try:
+        yield _routing.get()
+    finally:
+        _routing.reset(token)
+
+
+def use_replica():
+    """
+    Lecturas de un reporte o exportación en la réplica. Las escrituras del
+    bloque (el progreso del job) no devuelven las lecturas al primario.
+    """
+    return routing(replica=True, pin_on_write=False)
+
+
+def current_routing():
+    return _routing.get()
+
+
+def replica_reads(view):
+    """Marca una vista de función como de solo lectura (ver ``ReplicaMiddleware``)."""
+    view.replica_reads = True
+    return view
+
+
+class ReplicaReadMixin:
+    """Versión para vistas basadas en clases."""
+    replica_reads = True
+
+
+def replica_lag():
+    """Segundos de retraso de la réplica; ``None`` si no responde o no se puede medir."""
+    try:
+        with connections[REPLICA].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        logger.warning('db.replica_unavailable', exc_info=True)
+        return None
+    return float(lag) if lag is not None else None
+
+
+def replica_usable():
+    """Réplica configurada, accesible y con el retraso dentro del límite (resultado cacheado)."""
+    if not replica_configured():
+        return False
+    now = time.monotonic()
+    if _health['checked'] is None or now - _health['checked'] >= settings.DATABASE_REPLICA_CHECK_INTERVAL:
+        lag = replica_lag()
+        usable = lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG
+        if usable != _health['usable']:
+            logger.log(logging.INFO if usable else logging.WARNING,
+                       'db.replica_usable' if usable else 'db.replica_skipped', extra={'lag': lag})
+        _health.update(checked=now, usable=usable, lag=lag)
+    return _health['usable']
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or not state.replica or state.wrote:
+            return PRIMARY
+        # Dentro de una transacción del primario se lee lo que ella misma escribió
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return REPLICA if replica_usable() else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None and state.pin_on_write and model._meta.label not in settings.DATABASE_REPLICA_PIN_EXEMPT:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplica tienen los mismos datos
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,76 @@
+# src/core/downloads.py
+"""
+Descarga de archivos protegidos guardados en ``PRIVATE_MEDIA_ROOT``.
+
+Los archivos se guardan con ``private_storage``, fuera de ``MEDIA_ROOT``: ni
+nginx (``/media/``) ni ``runserver`` los sirven directamente y no tienen URL
+pública.
+
+La vista comprueba los permisos y responde con ``protected_file_response``:
+
+* ``SENDFILE_BACKEND = 'nginx'``: respuesta vacía con ``X-Accel-Redirect``
+  hacia la ubicación ``internal`` de nginx (``SENDFILE_NGINX_LOCATION``);
+  nginx envía el archivo desde el disco con ``sendfile`` y el worker de
+  Django queda libre en cuanto devuelve las cabeceras.
+* ``'django'`` (desarrollo, o sin nginx delante): ``FileResponse``, que el
+  servidor WSGI entrega con ``wsgi.file_wrapper`` (``sendfile`` en gunicorn)
+  sin leer el archivo entero en memoria.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.functional import cached_property
+from django.utils.http import content_disposition_header
+
+
+class PrivateStorage(FileSystemStorage):
+    """``FileSystemStorage`` en ``PRIVATE_MEDIA_ROOT``, sin URLs."""
+
+    @cached_property
+    def base_location(self):
+        return settings.PRIVATE_MEDIA_ROOT
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'PRIVATE_MEDIA_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+    def url(self, name):
+        raise ValueError('Los archivos privados no tienen URL pública; use una vista de descarga.')
+
+
+private_storage = PrivateStorage()
+
+
+def protected_file_response(name, filename=None, as_attachment=None):
+    """
+    Respuesta para el archivo ``name`` (ruta relativa a ``PRIVATE_MEDIA_ROOT``).
+    Por defecto los PDF se muestran en el navegador y el resto se descarga.
+    """
+    name = os.path.normpath(name).lstrip('/')
+    if name.startswith('..') or not private_storage.exists(name):
+        raise Http404('Archivo no encontrado.')
+
+    filename = filename or os.path.basename(name)
+    content_type, _ = mimetypes.guess_type(filename)
+    content_type = content_type or 'application/octet-stream'
+    if as_attachment is None:
+        as_attachment = content_type != 'application/pdf'
+
+    if settings.SENDFILE_BACKEND == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(settings.SENDFILE_NGINX_LOCATION + name)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    else:
+        response = FileResponse(
+            private_storage.open(name, 'rb'), as_attachment=as_attachment,
+            filename=filename, content_type=content_type,
+        )
+    # Archivos de un usuario: nunca en cachés compartidas
+    response['Cache-Control'] = 'private, max-age=0'
+    return response
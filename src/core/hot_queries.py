@@ -0,0 +1,32 @@
+# src/core/hot_queries.py
+"""
+Registro de consultas críticas ("hot queries").
+
+Cada app declara en su módulo ``hot_queries.py`` las consultas que ejecutan
+sus vistas más usadas, con la misma forma (filtros y orden) que en el código::
+
+    from core.hot_queries import register
+
+    @register('dispatch_notes.pending_count')
+    def pending_dispatches():
+        return DispatchNote.objects.filter(status='PENDING')
+
+El comando ``explain_hot_queries`` ejecuta EXPLAIN sobre todas ellas.
+"""
+from django.utils.module_loading import autodiscover_modules
+
+_registry = {}
+
+
+def register(name):
+    """Decorador que registra una función que devuelve un QuerySet."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_hot_queries():
+    """Devuelve ``{nombre: función}`` tras importar los ``hot_queries.py`` de cada app."""
+    autodiscover_modules('hot_queries')
+    return dict(sorted(_registry.items()))
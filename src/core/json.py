@@ -0,0 +1,49 @@
+# src/core/json.py
+"""
+Serialización JSON con orjson.
+
+``dumps`` produce lo mismo que ``JsonResponse`` con ``DjangoJSONEncoder``
+(los ``Decimal`` como texto exacto, fechas ISO 8601 con milisegundos y ``Z``,
+claves no textuales convertidas a texto), pero codificando en C los tipos
+básicos; solo fechas, ``Decimal`` y textos diferidos pasan por Python.
+
+``FastJsonResponse`` reemplaza a ``JsonResponse`` en las vistas de función y
+``core.renderers`` lo usa para DRF.
+"""
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encoder = DjangoJSONEncoder()
+
+
+def default(obj):
+    """Tipos que orjson no codifica (o no como Django): ``Decimal``, fechas, textos diferidos."""
+    return _encoder.default(obj)
+
+
+def dumps(data, indent=False):
+    """``data`` como JSON en bytes UTF-8 (sin escapar caracteres no ASCII)."""
+    return orjson.dumps(data, default=default, option=(OPTIONS | orjson.OPT_INDENT_2) if indent else OPTIONS)
+
+
+loads = orjson.loads
+JSONDecodeError = orjson.JSONDecodeError
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    Igual que ``JsonResponse`` (mismos argumentos ``safe`` y ``status``),
+    serializada con orjson. Con ``encoder`` o ``json_dumps_params``
+    conviene seguir usando ``JsonResponse``.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,164 @@
+# src/core/log.py
+"""
+Piezas del logging estructurado configurado en ``settings.LOGGING``.
+
+* ``RequestContextFilter`` añade ``request_id`` a cada registro (el id lo fija
+  ``core.middleware.RequestIdMiddleware`` por petición y el worker por trabajo).
+* ``DebugSamplingFilter`` deja pasar solo una fracción de los registros DEBUG.
+  La decisión se toma una vez por petición, así que una petición muestreada
+  conserva su traza completa.
+* ``JsonFormatter`` escribe un objeto JSON por línea, con los campos
+  ``extra`` del registro (``duration_ms``, ``count``...) al primer nivel.
+* ``QueuedStreamHandler`` encola los registros y los formatea y escribe en un
+  hilo aparte, de modo que la E/S del log no ocurre en el hilo de la petición.
+
+Uso en el código::
+
+    logger = logging.getLogger(__name__)
+
+    with timed(logger, 'product_search', mode='query') as fields:
+        ...
+        fields['count'] = len(results)
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+request_id_var = contextvars.ContextVar('request_id', default='-')
+debug_sampled_var = contextvars.ContextVar('debug_sampled', default=None)
+
+# Atributos propios de LogRecord; el resto son campos pasados en ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+def sample_debug():
+    """Decide si se registran las trazas DEBUG del contexto actual."""
+    rate = getattr(settings, 'LOG_DEBUG_SAMPLE_RATE', 1.0)
+    return rate >= 1 or random.random() < rate
+
+
+@contextmanager
+def log_context(request_id):
+    """Fija el ``request_id`` (y el muestreo DEBUG) mientras dura el bloque."""
+    id_token = request_id_var.set(request_id)
+    sample_token = debug_sampled_var.set(sample_debug())
+    try:
+        yield
+    finally:
+        request_id_var.reset(id_token)
+        debug_sampled_var.reset(sample_token)
+
+
+@contextmanager
+def timed(logger, event, level=logging.INFO, **fields):
+    """
+    Registra ``event`` al terminar el bloque con ``duration_ms`` y los campos
+    indicados. El diccionario devuelto admite campos adicionales; si el bloque
+    lanza una excepción se registra como error con su traza.
+    """
+    started = time.perf_counter()
+    try:
+        yield fields
+    except Exception:
+        fields['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        logger.exception(event, extra=fields)
+        raise
+    fields['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    logger.log(level, event, extra=fields)
+
+
+class RequestContextFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        sampled = debug_sampled_var.get()
+        return sample_debug() if sampled is None else sampled
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exc_info'] = record.exc_text
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class QueuedStreamHandler(QueueHandler):
+    """
+    ``QueueHandler`` con su propio ``QueueListener`` hacia un ``StreamHandler``.
+
+    El formatter configurado se aplica en el hilo del listener. Si la cola se
+    llena (stdout bloqueado) los registros se descartan en lugar de frenar las
+    peticiones; el número de descartados se informa en el siguiente registro.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self._start_listener()
+        atexit.register(self.close)
+
+    def _start_listener(self):
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Solo se resuelve el mensaje; el formato completo lo hace el listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if self.dropped:
+            record.dropped_records, self.dropped = self.dropped, 0
+        return record
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            # Proceso hijo (pool de procesos del worker): el hilo del listener no se hereda
+            self._start_listener()
+        super().emit(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener._thread is not None and self._pid == os.getpid():
+            self.listener.stop()
+        super().close()
@@ -0,0 +1,82 @@
+# src/core/middleware.py
+import logging
+import math
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import db_router
+from .log import log_context
+
+logger = logging.getLogger('core.requests')
+
+# Se acepta el X-Request-ID del proxy solo si tiene un formato razonable
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """
+    Asigna un id a cada petición (el ``X-Request-ID`` de nginx o uno nuevo),
+    lo pone a disposición del logging, lo devuelve en la respuesta y registra
+    una línea por petición con su duración.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+
+        started = time.perf_counter()
+        with log_context(request_id):
+            response = self.get_response(request)
+            logger.info('request', extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+        response['X-Request-ID'] = request_id
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Reparto de lecturas entre primario y réplica (``core.db_router``). Las
+    vistas marcadas como de solo lectura leen de la réplica en GET y HEAD;
+    una petición que escribe deja la cookie ``PIN_COOKIE`` para que las del
+    mismo navegador lean del primario hasta que la réplica se ponga al día.
+
+    Va antes de ``SessionMiddleware``: el contexto cubre la vista, el
+    renderizado de la plantilla y el guardado de la sesión.
+    """
+    PIN_COOKIE = 'db_primary'
+
+    def __init__(self, get_response):
+        if not db_router.replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with db_router.routing() as state:
+            response = self.get_response(request)
+        if state.wrote:
+            response.set_cookie(
+                self.PIN_COOKIE, '1', max_age=math.ceil(settings.DATABASE_REPLICA_MAX_LAG),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD') or self.PIN_COOKIE in request.COOKIES:
+            return None
+        view = getattr(view_func, 'view_class', view_func)
+        if getattr(view, 'replica_reads', False):
+            db_router.current_routing().replica = True
+        return None
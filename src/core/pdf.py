@@ -0,0 +1,147 @@
+# src/core/pdf.py
+"""
+Motor compartido de generación de PDF con WeasyPrint.
+
+* ``LocalURLFetcher`` resuelve ``/static/`` y ``/media/`` directamente desde
+  el disco (``STATIC_ROOT`` o los buscadores de staticfiles, ``MEDIA_ROOT``):
+  el worker no vuelve a entrar por nginx a la aplicación para descargar CSS,
+  logos o fuentes mientras renderiza.
+* Las hojas de estilo de los documentos son archivos estáticos que se
+  analizan una sola vez por proceso, con una ``FontConfiguration`` y una
+  caché de imágenes también compartidas.
+* Cada renderizado registra ``pdf.render`` con la duración de las fases
+  (plantilla, maquetación, escritura), páginas y tamaño.
+
+Cargar WeasyPrint (Pango, cairo, fontconfig) es costoso: los módulos que lo
+usan importan este módulo dentro de la función que genera el PDF.
+"""
+import logging
+import mimetypes
+import os
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import render_to_string
+from django.utils._os import safe_join
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+from weasyprint.urls import URLFetcher, URLFetcherResponse
+
+from .log import timed
+
+logger = logging.getLogger(__name__)
+
+# Base de las URLs relativas de las plantillas; nunca se resuelve por red
+BASE_URL = 'http://pdf.internal/'
+LOCAL_HOSTS = {'pdf.internal'}
+
+_lock = threading.Lock()
+_shared = {}
+
+
+@lru_cache(maxsize=256)
+def _static_path(relative):
+    # Con collectstatic los archivos están en STATIC_ROOT; en desarrollo, en las apps
+    try:
+        collected = safe_join(settings.STATIC_ROOT, relative)
+    except ValueError:
+        return None
+    if os.path.isfile(collected):
+        return collected
+    return finders.find(relative)
+
+
+def _local_path(path):
+    """Ruta en disco de ``/static/...`` o ``/media/...``; ``None`` si no corresponde."""
+    if path.startswith(settings.STATIC_URL):
+        return _static_path(path[len(settings.STATIC_URL):])
+    if path.startswith(settings.MEDIA_URL):
+        try:
+            return safe_join(settings.MEDIA_ROOT, path[len(settings.MEDIA_URL):])
+        except ValueError:
+            return None
+    return None
+
+
+class LocalURLFetcher(URLFetcher):
+    """
+    Lee del disco los estáticos y archivos subidos referidos con la base
+    interna o con un host propio (``ALLOWED_HOSTS``); el resto de URLs se
+    descargan como siempre.
+    """
+
+    def fetch(self, url, headers=None):
+        parts = urlsplit(url)
+        own_host = parts.hostname in LOCAL_HOSTS or parts.hostname in settings.ALLOWED_HOSTS
+        if parts.scheme in ('http', 'https') and own_host:
+            path = _local_path(unquote(parts.path))
+            if path and os.path.isfile(path):
+                mime_type, _ = mimetypes.guess_type(path)
+                return URLFetcherResponse(
+                    url, open(path, 'rb'), {'Content-Type': mime_type or 'application/octet-stream'},
+                )
+            if parts.hostname in LOCAL_HOSTS:
+                raise ValueError(f'Recurso no disponible para el PDF: {url}')
+        return super().fetch(url, headers)
+
+
+def _get_shared(name, factory):
+    if name not in _shared:
+        with _lock:
+            if name not in _shared:
+                _shared[name] = factory()
+    return _shared[name]
+
+
+def get_font_config():
+    """``FontConfiguration`` del proceso (las fuentes del sistema se cargan una vez)."""
+    return _get_shared('font_config', FontConfiguration)
+
+
+@lru_cache(maxsize=None)
+def get_stylesheet(static_path):
+    """Hoja de estilo estática (``'app/pdf/x.css'``) ya analizada, compartida por el proceso."""
+    path = _static_path(static_path)
+    if path is None:
+        raise FileNotFoundError(f'Hoja de estilo no encontrada: {static_path}')
+    return CSS(
+        filename=path, base_url=BASE_URL + settings.STATIC_URL.lstrip('/') + static_path,
+        font_config=get_font_config(), url_fetcher=LocalURLFetcher(),
+    )
+
+
+def render_document(html_string, stylesheets=()):
+    """Maqueta ``html_string``; devuelve el ``Document`` de WeasyPrint sin escribir el PDF."""
+    # Un fetcher por renderizado: URLFetcher guarda estado de la petición en curso
+    return HTML(string=html_string, base_url=BASE_URL, url_fetcher=LocalURLFetcher()).render(
+        font_config=get_font_config(),
+        stylesheets=[get_stylesheet(path) for path in stylesheets],
+        cache=_get_shared('image_cache', dict),
+    )
+
+
+def render_pdf(template_name, context, stylesheets=()):
+    """
+    Renderiza ``template_name`` con ``context`` y las hojas de estilo estáticas
+    ``stylesheets``; devuelve el PDF en bytes.
+    """
+    with timed(logger, 'pdf.render', template=template_name) as fields:
+        phases = {}
+        started = time.perf_counter()
+        html_string = render_to_string(template_name, context)
+        phases['template'] = round((time.perf_counter() - started) * 1000, 2)
+
+        started = time.perf_counter()
+        document = render_document(html_string, stylesheets)
+        phases['layout'] = round((time.perf_counter() - started) * 1000, 2)
+
+        started = time.perf_counter()
+        pdf = document.write_pdf()
+        phases['write'] = round((time.perf_counter() - started) * 1000, 2)
+
+        fields.update(phases_ms=phases, pages=len(document.pages), bytes=len(pdf))
+    return pdf
@@ -0,0 +1,45 @@
+# src/core/renderers.py
+"""
+Renderer y parser JSON de DRF con orjson (``core.json``).
+
+Los ``Decimal`` que lleguen sin convertir se escriben como texto exacto
+(``JSONRenderer`` los convertiría a ``float``); el resto de tipos que orjson
+no conoce (querysets, generadores) se delegan al codificador de DRF.
+"""
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import json
+
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj):
+    try:
+        return json.default(obj)
+    except TypeError:
+        return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # ``application/json; indent=4`` (o el navegador de la API) pide la salida indentada
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        option = (json.OPTIONS | orjson.OPT_INDENT_2) if indent else json.OPTIONS
+        return orjson.dumps(data, default=_default, option=option)
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return json.loads(stream.read() if stream is not None else b'')
+        except json.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
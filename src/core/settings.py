@@ -25,7 +25,9 @@ INSTALLED_APPS = [
     'jazzmin',
     'import_export',
     'django.contrib.humanize',
-    'django.contrib.admin',
+    # El admin (y con él import_export y sus formatos) se descubre al cargar
+    # las URLs (core/urls.py), no en cada django.setup()
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -46,10 +48,16 @@ INSTALLED_APPS = [
     'apps.reception_notes.apps.ReceptionNotesConfig',
     'apps.returns.apps.ReturnsConfig',
     'apps.users.apps.UsersConfig',
-    'apps.orders.apps.OrdersConfig', 
+    'apps.orders.apps.OrdersConfig',
+    'apps.workflow.apps.WorkflowConfig',
+    'apps.jobs.apps.JobsConfig',
+    'apps.httpcache.apps.HttpCacheConfig',
+    'apps.changefeed.apps.ChangefeedConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestIdMiddleware',
+    'core.middleware.ReplicaMiddleware',  # Solo activo con réplica configurada
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +101,12 @@ DATABASES = {
     }
 }
 
+# Lecturas de vistas de solo lectura y reportes en la réplica (core.db_router)
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', '5'))  # Segundos de retraso tolerados
+DATABASE_REPLICA_CHECK_INTERVAL = 2  # Segundos entre mediciones del retraso, por proceso
+DATABASE_REPLICA_PIN_EXEMPT = ['sessions.Session']  # Escrituras que no fijan la petición al primario
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,8 +146,19 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = '/app/static'  # Debe coincidir con el alias en Nginx
 
+# Estáticos propios del proyecto (librerías de terceros en static/lib, sin CDN)
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+# Variantes .gz/.br generadas por collectstatic en producción (core.staticfiles)
+STATIC_COMPRESS_EXTENSIONS = ['.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.ttf', '.eot', '.otf', '.ico']
+STATIC_COMPRESS_MIN_SIZE = 1024    # Bytes; los archivos más chicos se sirven tal cual
+STATIC_COMPRESS_MAX_RATIO = 0.95   # Se descarta la variante si no ahorra al menos un 5 %
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = '/app/media'
+# Archivos generados por las tareas (core.downloads.private_storage): fuera de
+# MEDIA_ROOT y sin URL pública, solo se entregan por vistas que comprueban permisos
+PRIVATE_MEDIA_ROOT = '/app/private'
 
 # Para cabeceras seguras detrás de proxy
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -154,6 +179,37 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Particionado mensual de movimientos (apps.movements.partitions)
+MOVEMENT_PARTITION_MONTHS_AHEAD = 3       # Particiones futuras que se crean por adelantado
+MOVEMENT_PARTITION_RETENTION_MONTHS = 36  # Meses que permanecen en la tabla activa
+
+# Cola de trabajos en segundo plano (apps.jobs, manage.py run_worker)
+JOBS_CONCURRENCY = 2           # Workers en paralelo por defecto
+JOBS_POOL = 'thread'           # 'thread' o 'process'
+JOBS_POLL_INTERVAL = 1.0       # Segundos de espera con la cola vacía
+JOBS_MAX_ATTEMPTS = 3          # Intentos por trabajo antes de marcarlo como fallido
+JOBS_RETRY_BACKOFF = 30        # Segundos antes del primer reintento (se duplica en cada intento)
+JOBS_HEARTBEAT_INTERVAL = 30   # Cada cuánto el worker marca el trabajo como vivo
+JOBS_STALE_AFTER = 300         # Segundos sin latido para reencolar un trabajo de un worker caído
+
+# Impresión por lotes de notas de despacho (apps.dispatch_notes.printing)
+DISPATCH_BATCH_PRINT_SYNC_LIMIT = 20  # Notas que se generan en la propia petición; más, se encolan
+DISPATCH_BATCH_PRINT_WORKERS = os.cpu_count() or 2  # Procesos que maquetan los PDF del lote
+
+# Conversión por lotes de cotizaciones en despachos (apps.quotations.conversion)
+QUOTATION_BATCH_CONVERT_SYNC_LIMIT = 50  # Cotizaciones que se convierten en la propia petición; más, se encolan
+
+# Descarga de archivos protegidos de PRIVATE_MEDIA_ROOT (core.downloads)
+SENDFILE_BACKEND = os.environ.get('SENDFILE_BACKEND', 'django')  # 'nginx' (X-Accel-Redirect) o 'django' (FileResponse)
+SENDFILE_NGINX_LOCATION = '/protected/'  # Ubicación internal de nginx con alias a PRIVATE_MEDIA_ROOT
+
+# Presupuesto de arranque (manage.py profile_imports --check, bench_startup --check)
+STARTUP_IMPORT_BUDGET_MS = {'setup': 400, 'urls': 900}  # Importaciones de django.setup() y de la carga de URLs
+STARTUP_FIRST_REQUEST_BUDGET_MS = 2000  # Proceso nuevo hasta responder la primera petición
+STARTUP_FORBIDDEN_IMPORTS = [           # Se cargan solo al usarse (PDF, importación/exportación)
+    'weasyprint', 'import_export.formats', 'openpyxl', 'tablib',
+]
+
 # Configuración de sesiones (opcional pero recomendado)
 SESSION_COOKIE_AGE = 1209600  # 2 semanas en segundos
 SESSION_SAVE_EVERY_REQUEST = True
@@ -204,4 +260,153 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+    # JSON con orjson (core.renderers); en producción sin el navegador de la API
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+# Caché de la consulta de productos por id (apps.inventory.lookup), en segundos
+PRODUCT_LOOKUP_CACHE_TIMEOUT = 300
+
+# Instantánea de stock en memoria (apps.inventory.snapshot), en segundos
+STOCK_SNAPSHOT_REFRESH_INTERVAL = 1.0   # Frecuencia máxima de comprobación de la versión de productos
+STOCK_SNAPSHOT_FULL_REFRESH = 300       # Reconstrucción completa periódica
+STOCK_SNAPSHOT_MARGIN = 60              # Margen sobre updated_at para transacciones que confirman tarde
+
+# Validadores HTTP (apps.httpcache): modelos con contador de versión y
+# identificador de la versión desplegada (invalida los ETag de HTML al desplegar)
+HTTP_CACHE_MODELS = [
+    'inventory.Product', 'inventory.Client', 'inventory.Supplier', 'inventory.Warehouse',
+    'dispatch_notes.DispatchNote', 'quotations.Quotation', 'orders.Order',
+    'reception_notes.ReceptionNote', 'returns.ReturnNote', 'movements.Movement',
+]
+HTTP_CACHE_RELEASE = os.environ.get('RELEASE', '')
+
+# Bus de invalidación de cachés en memoria entre procesos (apps.httpcache.bus)
+CACHE_BUS = os.environ.get('CACHE_BUS', 'postgres')  # 'postgres' (LISTEN/NOTIFY) o 'local' (un solo proceso)
+CACHE_BUS_CHANNEL = 'cache_invalidation'  # Canal de NOTIFY
+CACHE_BUS_POLL_INTERVAL = 5  # Segundos sin notificaciones tras los que se comparan las versiones
+
+# Canal de cambios en tiempo real (apps.changefeed, Server-Sent Events)
+CHANGEFEED_BROKER = os.environ.get('CHANGEFEED_BROKER', 'postgres')  # 'postgres' (LISTEN/NOTIFY entre procesos) o 'local' (un solo proceso)
+CHANGEFEED_CHANNEL = 'changefeed'  # Canal de NOTIFY
+CHANGEFEED_HEARTBEAT = 15  # Segundos entre comentarios de keep-alive
+CHANGEFEED_RETRY_MS = 3000  # Espera del navegador antes de reconectar
+CHANGEFEED_QUEUE_SIZE = 1000  # Eventos pendientes por cliente antes de pedirle un resync
+# Con WSGI cada cliente conectado ocupa un hilo del servidor: desactivado salvo para pruebas locales
+CHANGEFEED_WSGI_STREAM = os.environ.get('CHANGEFEED_WSGI_STREAM', '') == '1'
+
+# Panel de control (apps.dashboard)
+DASHBOARD_CACHE_TIMEOUT = 30  # Segundos que se reutilizan los indicadores y las búsquedas
+DASHBOARD_LATENCY_BUDGET_MS = 250  # Pasado este tiempo, las secciones pendientes se sirven desde la última copia
+
+# Logging estructurado (core.log): JSON por línea con request_id, escrito desde
+# un hilo aparte. Las trazas DEBUG se muestrean por petición.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0.01'))  # Fracción de peticiones con trazas DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {'()': 'core.log.RequestContextFilter'},
+        'debug_sampling': {'()': 'core.log.DebugSamplingFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'core.log.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'core.log.QueuedStreamHandler',
+            'formatter': 'json',
+            'filters': ['request_context', 'debug_sampling'],
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        # django.server ya registra cada petición de runserver; core.requests lo hace con request_id
+        'django.server': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+        'core': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'apps': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'apps.dispatch_notes': {'level': LOG_LEVEL},
+        'apps.quotations': {'level': LOG_LEVEL},
+        'apps.inventory': {'level': LOG_LEVEL},
+        'apps.jobs': {'level': LOG_LEVEL},
+    },
+}
+
+# Perfil de producción: DJANGO_ENV=production. Sin la variable se mantiene la
+# configuración de desarrollo de arriba. manage.py bench_settings compara el
+# costo por petición de ambos perfiles.
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'development')
+
+if DJANGO_ENV == 'production':
+    DEBUG = False  # Sin DEBUG tampoco se acumulan las consultas SQL de cada petición
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+    ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+    # Plantillas compiladas una vez por proceso (APP_DIRS no admite 'loaders')
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+    # Sesión leída de la caché y escrita solo cuando cambia
+    SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+    SESSION_SAVE_EVERY_REQUEST = False
+
+    # Nombres con hash del contenido (collectstatic genera staticfiles.json) y
+    # variantes .gz/.br precomprimidas; los originales se conservan para core.pdf
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage'},
+    }
+
+    DATABASES['default'].update({
+        'NAME': os.environ.get('POSTGRES_DB', DATABASES['default']['NAME']),
+        'USER': os.environ.get('POSTGRES_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('POSTGRES_HOST', DATABASES['default']['HOST']),
+        # Con core.asgi (uvicorn) el código síncrono de cada petición corre en un hilo
+        # nuevo con su propia conexión: una conexión persistente nunca se reutiliza y
+        # solo se acumula. 0 cierra la conexión al terminar la petición; la reutilización
+        # real entre peticiones la da un pool externo (pgbouncer en modo transacción).
+        # Valores > 0 solo tienen sentido con un servidor WSGI de hilos fijos.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,  # Se comprueba antes de reutilizarla (con DB_CONN_MAX_AGE > 0)
+        # Detrás de pgbouncer en modo transacción los cursores con nombre (iterator()) no sobreviven
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', '') == '1',
+        'OPTIONS': {
+            'connect_timeout': 5,
+            'keepalives': 1,
+            'keepalives_idle': 60,
+            'application_name': os.environ.get('DB_APPLICATION_NAME', 'inventory'),
+        },
+    })
+
+    SENDFILE_BACKEND = os.environ.get('SENDFILE_BACKEND', 'nginx')  # Producción siempre detrás de nginx
+
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['core.renderers.ORJSONRenderer']
+
+# Réplica en streaming del primario: misma configuración, otro host
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': int(os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT'])),
+        'OPTIONS': {**DATABASES['default'].get('OPTIONS', {}), 'connect_timeout': 2},
+        'TEST': {'MIRROR': 'default'},
+    }
@@ -0,0 +1,65 @@
+# src/core/staticfiles.py
+"""
+Almacenamiento de estáticos para producción.
+
+``collectstatic`` copia los archivos con el hash del contenido en el nombre
+(``ManifestStaticFilesStorage``) y, al terminar, deja junto a cada archivo
+de texto una variante ``.gz`` (y ``.br`` si está instalado ``brotli``). nginx
+sirve esas variantes con ``gzip_static``/``brotli_static`` sin comprimir en
+cada petición, y los nombres con hash se cachean como inmutables.
+"""
+import gzip
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Solo se generan las variantes .gz
+    brotli = None
+
+
+def _write_if_smaller(path, data, size):
+    # Una variante que no ahorra nada solo ocupa disco y una búsqueda de nginx
+    if len(data) < size * settings.STATIC_COMPRESS_MAX_RATIO:
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+    return False
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.compress_files()
+
+    def compress_files(self):
+        """
+        Genera ``.gz``/``.br`` de los archivos con hash (los que enlaza
+        ``{% static %}``) que sean comprimibles. El nombre incluye el hash del
+        contenido: si la variante existe, corresponde a ese contenido.
+        """
+        extensions = tuple(settings.STATIC_COMPRESS_EXTENSIONS)
+        targets = [('.gz', self._gzip)] + ([('.br', brotli.compress)] if brotli else [])
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.endswith(extensions):
+                continue
+            path = self.path(name)
+            size = os.path.getsize(path)
+            if size < settings.STATIC_COMPRESS_MIN_SIZE:
+                continue
+            pending = [(suffix, compress) for suffix, compress in targets if not os.path.exists(path + suffix)]
+            if not pending:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            for suffix, compress in pending:
+                _write_if_smaller(path + suffix, compress(data), size)
+
+    @staticmethod
+    def _gzip(data):
+        # mtime fijo: la misma entrada produce el mismo .gz en cada despliegue
+        return gzip.compress(data, compresslevel=9, mtime=0)
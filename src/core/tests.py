@@ -0,0 +1,183 @@
+import math
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings, skipIfDBFeature, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.views import View
+
+from apps.inventory.models import Product
+from apps.jobs.models import Job
+
+from . import db_router
+from .db_router import PRIMARY, REPLICA, ReplicaReadMixin, replica_lag, replica_reads, routing, use_replica
+from .middleware import ReplicaMiddleware
+
+
+class ReplicaTestCase(TransactionTestCase):
+    """
+    Alias ``replica`` espejo del primario (``TEST: {'MIRROR': 'default'}``),
+    como en producción con ``DB_REPLICA_HOST``: otra conexión a la misma base
+    de pruebas. Es un TransactionTestCase: en un TestCase todo corre dentro de
+    ``atomic`` y las lecturas nunca salen del primario.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Después de crear la base de pruebas: copia su nombre. connections.settings
+        # es el mismo diccionario que settings.DATABASES (replica_configured())
+        connections.settings[REPLICA] = {**connections.settings[PRIMARY], 'TEST': {'MIRROR': PRIMARY}}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        super().tearDownClass()
+
+    def setUp(self):
+        patcher = mock.patch.dict(db_router._health, {'checked': None, 'usable': False, 'lag': None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.lag = self.patch_lag(0.0)
+
+    def patch_lag(self, value):
+        patcher = mock.patch.object(db_router, 'replica_lag', return_value=value)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def read_db(self):
+        return Product.objects.all().db
+
+
+class ReplicaRouterTests(ReplicaTestCase):
+
+    def test_reads_use_primary_outside_a_routing_context(self):
+        self.assertEqual(self.read_db(), PRIMARY)
+        with routing():
+            self.assertEqual(self.read_db(), PRIMARY)
+
+    def test_replica_reads_run_on_the_replica(self):
+        with use_replica(), CaptureQueriesContext(connections[REPLICA]) as queries:
+            self.assertEqual(list(Product.objects.all()), [])
+        self.assertEqual(len(queries), 1)
+
+    def test_write_pins_reads_to_primary(self):
+        with routing(replica=True) as state:
+            self.assertEqual(self.read_db(), REPLICA)
+            Product.objects.create(product_code='A', description='Producto', unit='UND', unit_price=1)
+            self.assertTrue(state.wrote)
+            self.assertEqual(self.read_db(), PRIMARY)
+
+    def test_session_writes_do_not_pin(self):
+        with routing(replica=True) as state:
+            Session.objects.create(session_key='k' * 32, session_data='', expire_date=timezone.now())
+            self.assertFalse(state.wrote)
+            self.assertEqual(self.read_db(), REPLICA)
+
+    def test_use_replica_ignores_job_progress_writes(self):
+        job = Job.objects.create(task='inventory.report_pdf')
+        with use_replica() as state:
+            job.set_progress(50, 'Generando')
+            self.assertFalse(state.wrote)
+            self.assertEqual(self.read_db(), REPLICA)
+
+    def test_atomic_block_reads_from_primary(self):
+        with routing(replica=True):
+            with transaction.atomic():
+                self.assertEqual(self.read_db(), PRIMARY)
+            self.assertEqual(self.read_db(), REPLICA)
+
+    def test_lagging_or_unavailable_replica_falls_back(self):
+        for lag, expected in ((None, PRIMARY), (settings.DATABASE_REPLICA_MAX_LAG + 1, PRIMARY),
+                              (settings.DATABASE_REPLICA_MAX_LAG, REPLICA)):
+            with self.subTest(lag=lag), override_settings(DATABASE_REPLICA_CHECK_INTERVAL=0):
+                self.lag.return_value = lag
+                with use_replica():
+                    self.assertEqual(self.read_db(), expected)
+
+    def test_lag_is_checked_once_per_interval(self):
+        with override_settings(DATABASE_REPLICA_CHECK_INTERVAL=3600), use_replica():
+            for _ in range(3):
+                self.assertEqual(self.read_db(), REPLICA)
+            self.lag.return_value = None
+            self.assertEqual(self.read_db(), REPLICA)
+        self.assertEqual(self.lag.call_count, 1)
+
+        with override_settings(DATABASE_REPLICA_CHECK_INTERVAL=0), use_replica():
+            self.assertEqual(self.read_db(), PRIMARY)
+        self.assertEqual(self.lag.call_count, 2)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_lag_of_a_primary_is_zero(self):
+        self.assertEqual(replica_lag(), 0)
+
+    @skipIfDBFeature('has_select_for_update')
+    def test_unmeasurable_lag_is_unavailable(self):
+        # SQLite no tiene pg_is_in_recovery(): la medición falla y la réplica no se usa
+        with self.assertLogs('core.db_router', 'WARNING'):
+            self.assertIsNone(replica_lag())
+
+
+@replica_reads
+def marked_view(request):
+    return HttpResponse(Product.objects.all().db)
+
+
+def unmarked_view(request):
+    return HttpResponse(Product.objects.all().db)
+
+
+def writing_view(request):
+    Product.objects.create(product_code='W', description='Producto', unit='UND', unit_price=1)
+    return HttpResponse(Product.objects.all().db)
+
+
+class MarkedView(ReplicaReadMixin, View):
+
+    def get(self, request):
+        return HttpResponse(Product.objects.all().db)
+
+
+class ReplicaMiddlewareTests(ReplicaTestCase):
+
+    def request(self, view, method='get', cookies=None):
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+
+        def get_response(request):
+            return middleware.process_view(request, view, (), {}) or view(request)
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def test_marked_views_read_from_the_replica(self):
+        self.assertEqual(self.request(marked_view).content.decode(), REPLICA)
+        self.assertEqual(self.request(MarkedView.as_view()).content.decode(), REPLICA)
+        self.assertEqual(self.request(marked_view, 'head').status_code, 200)
+
+    def test_other_views_and_methods_read_from_the_primary(self):
+        self.assertEqual(self.request(unmarked_view).content.decode(), PRIMARY)
+        self.assertEqual(self.request(marked_view, 'post').content.decode(), PRIMARY)
+
+    def test_write_sets_pin_cookie(self):
+        response = self.request(writing_view, 'post')
+        cookie = response.cookies[ReplicaMiddleware.PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], math.ceil(settings.DATABASE_REPLICA_MAX_LAG))
+        self.assertTrue(cookie['httponly'])
+        self.assertNotIn(ReplicaMiddleware.PIN_COOKIE, self.request(marked_view).cookies)
+
+    def test_pin_cookie_keeps_reads_on_the_primary(self):
+        response = self.request(marked_view, cookies={ReplicaMiddleware.PIN_COOKIE: '1'})
+        self.assertEqual(response.content.decode(), PRIMARY)
+
+    def test_disabled_without_replica(self):
+        with mock.patch.object(db_router, 'replica_configured', return_value=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicaMiddleware(unmarked_view)
@@ -8,6 +8,10 @@ from django.contrib.auth import views as auth_views
 from apps.inventory import dashboard_views
 from . import views
 
+# INSTALLED_APPS usa SimpleAdminConfig: los admin.py se importan aquí, solo en
+# los procesos que cargan las URLs (peticiones, reverse), no en cada comando
+admin.autodiscover()
+
 urlpatterns = [
     # SOLO UNA RUTA PARA LA RAÍZ - ELIMINA LA DUPLICADA
     path('', views.home_redirect, name='home'),
@@ -36,6 +40,9 @@ urlpatterns = [
     path('accounts/', include('apps.users.urls')),
     path('notas-despacho/', include('apps.dispatch_notes.urls')),
     path('users/', include('apps.users.urls', namespace='users')),
+    path('tareas/', include('apps.jobs.urls')),
+    path('cambios/', include('apps.changefeed.urls')),
+    path('panel/', include('apps.dashboard.urls')),
     
     # URLs de utilidades y error
     path('404/', views.page_not_found, name='404'),